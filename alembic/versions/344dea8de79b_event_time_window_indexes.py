@@ -0,0 +1,32 @@
+"""event time window indexes
+
+Revision ID: 344dea8de79b
+Revises: da12b4995dbc
+Create Date: 2026-10-17 01:11:19.945752
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '344dea8de79b'
+down_revision: Union[str, Sequence[str], None] = 'da12b4995dbc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_start_time_end_time', 'events', ['start_time', 'end_time'], unique=False)
+    op.create_index('ix_events_location_start_time_end_time', 'events', ['location', 'start_time', 'end_time'], unique=False)
+    op.create_index('ix_events_duration', 'events', [sa.text('julianday(end_time) - julianday(start_time)')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_duration', table_name='events')
+    op.drop_index('ix_events_location_start_time_end_time', table_name='events')
+    op.drop_index('ix_events_start_time_end_time', table_name='events')
@@ -0,0 +1,40 @@
+"""event created_at
+
+Existing rows get the upgrade time: with no creation time on record, it is
+the latest time they are known to have been revised (the previous revision
+rewrote their times to UTC).
+
+Revision ID: 45cbe30d05e1
+Revises: a1df40e77344
+Create Date: 2026-10-17 03:01:25.151720
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '45cbe30d05e1'
+down_revision: Union[str, Sequence[str], None] = 'a1df40e77344'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A plain ADD COLUMN: a batch rebuild of events would drop the
+    # events_fts triggers.
+    op.add_column('events', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.add_column('events_archive', sa.Column('created_at', sa.DateTime(), nullable=True))
+    now = sa.bindparam('now', datetime.utcnow(), type_=sa.DateTime())
+    op.execute(sa.text('UPDATE events SET created_at = :now').bindparams(now))
+    op.execute(sa.text('UPDATE events_archive SET created_at = :now').bindparams(now))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('events_archive', 'created_at')
+    op.drop_column('events', 'created_at')
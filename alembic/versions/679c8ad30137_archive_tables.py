@@ -0,0 +1,51 @@
+"""archive tables
+
+Revision ID: 679c8ad30137
+Revises: 5b1cf2339678
+Create Date: 2026-10-17 01:29:09.320779
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '679c8ad30137'
+down_revision: Union[str, Sequence[str], None] = '5b1cf2339678'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('events_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('end_time', sa.DateTime(), nullable=False),
+    sa.Column('max_capacity', sa.Integer(), nullable=False),
+    sa.Column('registered_count', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_events_archive_end_time_id', 'events_archive', ['end_time', 'id'], unique=False)
+    op.create_table('attendees_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events_archive.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_attendees_archive_event_id_id', 'attendees_archive', ['event_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendees_archive_event_id_id', table_name='attendees_archive')
+    op.drop_table('attendees_archive')
+    op.drop_index('ix_events_archive_end_time_id', table_name='events_archive')
+    op.drop_table('events_archive')
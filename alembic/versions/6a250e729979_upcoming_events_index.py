@@ -0,0 +1,28 @@
+"""upcoming events index
+
+Revision ID: 6a250e729979
+Revises: 7ac9f460be76
+Create Date: 2026-10-17 13:05:52.774019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a250e729979'
+down_revision: Union[str, Sequence[str], None] = '7ac9f460be76'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_end_time_start_time_id', 'events', ['end_time', 'start_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_end_time_start_time_id', table_name='events')
@@ -0,0 +1,35 @@
+"""event registered_count
+
+Revision ID: 757fe6b1c2f7
+Revises: 8ee9473ef99e
+Create Date: 2026-10-17 10:02:11.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '757fe6b1c2f7'
+down_revision: Union[str, Sequence[str], None] = '8ee9473ef99e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.add_column(sa.Column('registered_count', sa.Integer(), nullable=False, server_default='0'))
+    # Backfill the counter from the existing attendee rows.
+    op.execute(
+        "UPDATE events SET registered_count = "
+        "(SELECT COUNT(*) FROM attendees WHERE attendees.event_id = events.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('registered_count')
@@ -0,0 +1,28 @@
+"""attendee event_id index
+
+Revision ID: 7ac9f460be76
+Revises: 757fe6b1c2f7
+Create Date: 2026-10-17 11:24:40.905112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7ac9f460be76'
+down_revision: Union[str, Sequence[str], None] = '757fe6b1c2f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_attendees_event_id_id', 'attendees', ['event_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendees_event_id_id', table_name='attendees')
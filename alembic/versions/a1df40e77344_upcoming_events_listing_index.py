@@ -0,0 +1,28 @@
+"""upcoming events listing index
+
+Revision ID: a1df40e77344
+Revises: f5bf7e3d0036
+Create Date: 2026-10-17 02:54:51.560782
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1df40e77344'
+down_revision: Union[str, Sequence[str], None] = 'f5bf7e3d0036'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_start_time_id_end_time', 'events', ['start_time', 'id', 'end_time'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_events_start_time_id_end_time', table_name='events')
@@ -0,0 +1,45 @@
+"""event registration stats
+
+Revision ID: a5dc39f347a4
+Revises: c2b4ae53ad9a
+Create Date: 2026-10-17 02:24:34.755304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5dc39f347a4'
+down_revision: Union[str, Sequence[str], None] = 'c2b4ae53ad9a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('event_stats_hourly',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('hour', sa.DateTime(), nullable=False),
+    sa.Column('registrations', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ),
+    sa.PrimaryKeyConstraint('event_id', 'hour'),
+    sqlite_with_rowid=False
+    )
+    # Existing attendees have no registration time, so there is nothing to
+    # bucket; the totals are events.registered_count.
+    with op.batch_alter_table('attendees') as batch_op:
+        batch_op.add_column(sa.Column('registered_at', sa.DateTime(), nullable=True))
+    with op.batch_alter_table('attendees_archive') as batch_op:
+        batch_op.add_column(sa.Column('registered_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('attendees_archive') as batch_op:
+        batch_op.drop_column('registered_at')
+    with op.batch_alter_table('attendees') as batch_op:
+        batch_op.drop_column('registered_at')
+    op.drop_table('event_stats_hourly')
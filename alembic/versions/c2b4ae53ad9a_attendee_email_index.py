@@ -0,0 +1,28 @@
+"""attendee email index
+
+Revision ID: c2b4ae53ad9a
+Revises: 679c8ad30137
+Create Date: 2026-10-17 02:17:14.672387
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2b4ae53ad9a'
+down_revision: Union[str, Sequence[str], None] = '679c8ad30137'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_attendees_email_event_id', 'attendees', ['email', 'event_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendees_email_event_id', table_name='attendees')
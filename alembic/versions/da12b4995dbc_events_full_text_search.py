@@ -0,0 +1,53 @@
+"""events full text search
+
+Revision ID: da12b4995dbc
+Revises: 6a250e729979
+Create Date: 2026-10-17 01:02:17.391645
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'da12b4995dbc'
+down_revision: Union[str, Sequence[str], None] = '6a250e729979'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE events_fts USING fts5("
+        "name, location, content='events', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER events_fts_insert AFTER INSERT ON events BEGIN "
+        "INSERT INTO events_fts(rowid, name, location) VALUES (new.id, new.name, new.location); END"
+    )
+    op.execute(
+        "CREATE TRIGGER events_fts_delete AFTER DELETE ON events BEGIN "
+        "INSERT INTO events_fts(events_fts, rowid, name, location) VALUES ('delete', old.id, old.name, old.location); END"
+    )
+    op.execute(
+        "CREATE TRIGGER events_fts_update AFTER UPDATE OF name, location ON events BEGIN "
+        "INSERT INTO events_fts(events_fts, rowid, name, location) VALUES ('delete', old.id, old.name, old.location); "
+        "INSERT INTO events_fts(rowid, name, location) VALUES (new.id, new.name, new.location); END"
+    )
+    # Index the events that already exist.
+    op.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TRIGGER IF EXISTS events_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS events_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS events_fts_insert")
+    op.execute("DROP TABLE IF EXISTS events_fts")
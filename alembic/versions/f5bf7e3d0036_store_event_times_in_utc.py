@@ -0,0 +1,75 @@
+"""store event times in utc
+
+Events used to be stored as wall-clock times in the zone they were posted
+with, which was not recorded. This converts them to UTC assuming one zone
+for every row: the API default, Asia/Kolkata, unless overridden with
+
+    alembic -x legacy_timezone=UTC upgrade head
+
+Revision ID: f5bf7e3d0036
+Revises: a5dc39f347a4
+Create Date: 2026-10-17 02:42:22.950708
+
+"""
+from typing import Sequence, Union
+
+import pytz
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5bf7e3d0036'
+down_revision: Union[str, Sequence[str], None] = 'a5dc39f347a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH_SIZE = 1000
+
+
+def _legacy_timezone():
+    return pytz.timezone(context.get_x_argument(as_dictionary=True).get("legacy_timezone", "Asia/Kolkata"))
+
+
+def _to_utc(dt, tz):
+    return tz.localize(dt).astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def _from_utc(dt, tz):
+    return pytz.utc.localize(dt).astimezone(tz).replace(tzinfo=None)
+
+
+def _convert(convert) -> None:
+    tz = _legacy_timezone()
+    bind = op.get_bind()
+    for name in ("events", "events_archive"):
+        table = sa.table(name, sa.column("id", sa.Integer), sa.column("start_time", sa.DateTime), sa.column("end_time", sa.DateTime))
+        statement = (
+            table.update()
+            .where(table.c.id == sa.bindparam("row_id"))
+            .values(start_time=sa.bindparam("new_start"), end_time=sa.bindparam("new_end"))
+        )
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(table.c.id, table.c.start_time, table.c.end_time)
+                .where(table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            bind.execute(statement, [
+                {"row_id": row.id, "new_start": convert(row.start_time, tz), "new_end": convert(row.end_time, tz)}
+                for row in rows
+            ])
+            last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _convert(_to_utc)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _convert(_from_utc)
@@ -0,0 +1,155 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Tuple
+
+from fastapi import HTTPException
+
+from .cache import TTLCache
+from .config import settings
+from .metrics import Collected, Counter, register
+
+# Admission control for the registration endpoints. SQLite runs one write
+# at a time, so beyond a few concurrent registrations extra requests only
+# wait on the database lock, holding pool connections and timing out
+# together, and the rest of the API slows down with them. Registrations
+# therefore need a slot: at most ADMISSION_MAX_CONCURRENCY in flight, and
+# at most ADMISSION_EVENT_CONCURRENCY per event, so one hot event cannot
+# take every slot. Requests without a slot wait in a bounded FIFO queue for
+# up to ADMISSION_QUEUE_TIMEOUT_MS; when the queue is full or the wait runs
+# out they get a 429 with Retry-After straight away.
+#
+# Events that came back full are remembered for ADMISSION_FULL_TTL_SECONDS,
+# and further registrations for them are refused from memory. Seats never
+# free up (there are no cancellations), so the TTL only bounds memory.
+
+REJECTED = register(Counter(
+    "admission_rejected_total", "Registrations refused with 429, by reason.", ("reason",),
+))
+KNOWN_FULL = register(Counter(
+    "admission_known_full_total", "Registrations refused from memory because the event is full.",
+))
+
+class AdmissionControl:
+    def __init__(self, max_concurrency: int = 8, event_concurrency: int = 4, queue_size: int = 256,
+                 queue_timeout: float = 1.0, full_ttl: float = 60.0, retry_after: int = 1):
+        self.max_concurrency = max_concurrency
+        self.event_concurrency = event_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.in_flight_by_event: Dict[int, int] = {}
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        self.full_events = TTLCache("full_events", maxsize=10000, ttl=full_ttl)
+
+    # Known-full events
+
+    def is_full(self, event_id: int) -> bool:
+        if self.full_events.get(event_id) is None:
+            return False
+        KNOWN_FULL.inc()
+        return True
+
+    def mark_full(self, event_id: int) -> None:
+        self.full_events.set(event_id, True)
+
+    # Slots
+
+    async def acquire(self, event_id: int) -> bool:
+        # True once the request holds a slot (release() it when done), False
+        # if it should be shed.
+        if self._has_room(event_id):
+            self._take(event_id)
+            return True
+        if len(self._waiters) >= self.queue_size:
+            REJECTED.inc(1, "queue_full")
+            return False
+        entry = (event_id, asyncio.get_running_loop().create_future())
+        self._waiters.append(entry)
+        try:
+            done, _ = await asyncio.wait((entry[1],), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        if not done:
+            self._abandon(entry)
+            REJECTED.inc(1, "timeout")
+            return False
+        return True
+
+    def release(self, event_id: int) -> None:
+        self.in_flight -= 1
+        remaining = self.in_flight_by_event[event_id] - 1
+        if remaining:
+            self.in_flight_by_event[event_id] = remaining
+        else:
+            del self.in_flight_by_event[event_id]
+        self._wake()
+
+    @asynccontextmanager
+    async def admit(self, event_id: int):
+        if not await self.acquire(event_id):
+            raise HTTPException(
+                status_code=429,
+                detail="Too many registrations in progress; retry shortly.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        try:
+            yield
+        finally:
+            self.release(event_id)
+
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    # Internals
+
+    def _has_room(self, event_id: int) -> bool:
+        return (self.in_flight < self.max_concurrency
+                and self.in_flight_by_event.get(event_id, 0) < self.event_concurrency)
+
+    def _take(self, event_id: int) -> None:
+        self.in_flight += 1
+        self.in_flight_by_event[event_id] = self.in_flight_by_event.get(event_id, 0) + 1
+
+    def _wake(self) -> None:
+        # Hands free slots to waiters in arrival order, skipping those whose
+        # event is still at its limit.
+        if not self._waiters or self.in_flight >= self.max_concurrency:
+            return
+        still_waiting = deque()
+        while self._waiters:
+            event_id, future = entry = self._waiters.popleft()
+            if future.done():
+                continue
+            if self._has_room(event_id):
+                self._take(event_id)
+                future.set_result(None)
+            else:
+                still_waiting.append(entry)
+        self._waiters = still_waiting
+
+    def _abandon(self, entry: Tuple[int, asyncio.Future]) -> None:
+        event_id, future = entry
+        if future.done() and not future.cancelled():
+            # The slot was granted just as the wait ended.
+            self.release(event_id)
+            return
+        future.cancel()
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+
+admission_control = AdmissionControl(
+    max_concurrency=settings.admission_max_concurrency,
+    event_concurrency=settings.admission_event_concurrency,
+    queue_size=settings.admission_queue_size,
+    queue_timeout=settings.admission_queue_timeout_ms / 1000,
+    full_ttl=settings.admission_full_ttl_seconds,
+    retry_after=settings.admission_retry_after_seconds,
+)
+
+register(Collected("admission_in_flight", "Registrations holding an admission slot.", (), lambda: {(): admission_control.in_flight}))
+register(Collected("admission_waiting", "Registrations queued for an admission slot.", (), lambda: {(): admission_control.waiting()}))
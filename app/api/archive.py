@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .. import schemas, crud, pagination, serialization, timezones
+from ..database import get_read_db
+
+# Read-only access to events moved out of the hot tables by app/archive.py.
+
+router = APIRouter(tags=["Archive"])
+
+@router.get(
+    "/archive/events",
+    response_model=schemas.EventPagination,
+    summary="List archived events",
+    description="Lists archived (ended) events, most recently ended first, with their final registered_count. Supports skip/limit or cursor pagination and timezone conversion.",
+)
+async def list_archived_events(
+    db: AsyncSession = Depends(get_read_db),
+    timezone: str = Query("UTC", description="Timezone, e.g. 'Asia/Kolkata'"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; overrides skip"),
+    include_total: bool = Query(True, description="Set to false to skip computing total (it is returned as null)"),
+):
+    if not timezones.is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
+    after = None
+    if cursor is not None:
+        try:
+            after = pagination.decode_event_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    data = await crud.get_archived_events(db, user_tz=timezone, skip=skip, limit=limit, after=after, include_total=include_total)
+    return Response(serialization.dumps(data), media_type="application/json")
+
+@router.get(
+    "/archive/events/{event_id}",
+    response_model=schemas.ArchivedEventOut,
+    summary="Get an archived event",
+    description="Returns one archived event. Times are in UTC.",
+)
+async def get_archived_event(event_id: int, db: AsyncSession = Depends(get_read_db)):
+    event = await crud.get_archived_event(db, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Archived event not found.")
+    return event
+
+@router.get(
+    "/archive/events/{event_id}/attendees",
+    response_model=schemas.AttendeePagination,
+    summary="List attendees of an archived event",
+    description="Returns the attendees an event had when it was archived, ordered by id. Supports skip/limit or cursor pagination and timezone conversion.",
+)
+async def get_archived_attendees(
+    event_id: int,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    timezone: str = Query("UTC", description="Timezone, e.g. 'Asia/Kolkata'"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; overrides skip"),
+    include_total: bool = Query(True, description="Set to false to skip computing total (it is returned as null)"),
+):
+    if not timezones.is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
+    after = None
+    if cursor is not None:
+        try:
+            after = pagination.decode_attendee_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    data = await crud.get_archived_attendees(db, event_id, skip=skip, limit=limit, user_tz=timezone, after=after, include_total=include_total)
+    return Response(serialization.dumps(data), media_type="application/json")
@@ -1,12 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import Response, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from pytz import all_timezones
-from .. import schemas, crud, models
-from ..database import get_db
+from datetime import date, datetime, time, timedelta
+from email.utils import formatdate
+from typing import List, NamedTuple, Optional
+import asyncio
+import hashlib
+from .. import schemas, availability, crud, export, ical, idempotency, pagination, serialization, timezones, writer
+from ..admission import admission_control
+from ..cache import events_cache, ics_cache, ics_event_cache
+from ..config import settings
+from ..holds import seat_holds
+from ..idempotency import idempotency_store
+from ..shared_seats import SHARED_HITS, shared_seats
+from ..database import get_db, get_read_db
 
 router = APIRouter(tags=["Events"])
 
+class CachedPage(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: str
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+MAX_BULK_REGISTRATIONS = 10000
+MAX_BULK_EVENTS = 10000
+MAX_CALENDAR_DAYS = 366
+MAX_STATS_HOURS = 24 * 31
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+def _drop_stale_listings() -> None:
+    # Under app.serve, cached listings go when any worker creates events.
+    if shared_seats is not None and shared_seats.events_changed():
+        events_cache.clear()
+        ics_cache.clear()
+
 @router.post(
     "/events",
     response_model=schemas.EventOut,
@@ -14,31 +45,215 @@ router = APIRouter(tags=["Events"])
     summary="Create a new event",
     description="Creates a new event with name, location, start/end time, and max capacity. Times are stored in UTC.",
 )
-async def create_event(event: schemas.EventCreate, db: AsyncSession = Depends(get_db)):
-    if event.timezone not in all_timezones:
+async def create_event(
+    event: schemas.EventCreate,
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, description="Retries with the same key replay the first response instead of creating the event again"),
+):
+    if idempotency_key is None:
+        return await _create_event(db, event)
+    return await idempotency_store.run(
+        idempotency_key, "POST /events", event.model_dump_json(),
+        lambda: idempotency.render(schemas.EventOut, _create_event(db, event), status_code=status.HTTP_201_CREATED),
+    )
+
+async def _create_event(db: AsyncSession, event: schemas.EventCreate):
+    if not timezones.is_valid_timezone(event.timezone):
         raise HTTPException(status_code=400, detail=f"Invalid timezone: {event.timezone}")
-    # Check for unique event name
-    from sqlalchemy.future import select
-    existing = await db.execute(select(models.Event).where(models.Event.name == event.name))
-    if existing.scalar_one_or_none():
+    db_event = await crud.create_event(db, event)
+    if db_event is None:
         raise HTTPException(status_code=400, detail=f"Event with name '{event.name}' already exists.")
-    return await crud.create_event(db, event)
+    return db_event
+
+@router.post(
+    "/events/bulk",
+    response_model=schemas.BulkEventResult,
+    summary="Create a batch of events",
+    description=f"Creates up to {MAX_BULK_EVENTS} events in one transaction, with multi-row inserts. Every event is validated as for POST /events, and one invalid event rejects the batch. Names that already exist (or repeat within the batch) are reported per event instead of failing the batch.",
+)
+async def create_events_bulk(events: List[schemas.EventCreate], db: AsyncSession = Depends(get_db)):
+    if len(events) > MAX_BULK_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_EVENTS} events per batch.")
+    results = await crud.create_events_bulk(db, events)
+    items = [
+        schemas.BulkEventItem(index=i, name=e.name, status=status, id=row.id if row is not None else None)
+        for i, (e, (status, row)) in enumerate(zip(events, results))
+    ]
+    return schemas.BulkEventResult(
+        created=sum(1 for status, _ in results if status == "created"),
+        duplicates=sum(1 for status, _ in results if status == "duplicate"),
+        results=items,
+    )
 
 @router.get(
     "/events",
     response_model=schemas.EventPagination,
     summary="List all upcoming events",
-    description="Lists all upcoming events (end_time > now). Supports pagination and timezone conversion.",
+    description="Lists all upcoming events (end_time > now), ordered by start time. from/to/location narrow it to events overlapping that window at that location. Supports skip/limit or cursor pagination and timezone conversion. include_seats=true adds each event's seats_remaining. Responses are cached (except with include_seats) and carry an ETag; send If-None-Match to get a 304 when nothing changed.",
 )
 async def list_events(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     timezone: str = Query("Asia/Kolkata", description="Timezone, e.g. 'Asia/Kolkata'"),
-    skip: int = 0,
-    limit: int = 100,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; overrides skip"),
+    include_total: bool = Query(True, description="Set to false to skip computing total (it is returned as null)"),
+    from_: Optional[datetime] = Query(None, alias="from", description="Only events still running at or after this time; naive times are in `timezone`"),
+    to: Optional[datetime] = Query(None, description="Only events starting before this time; naive times are in `timezone`"),
+    location: Optional[str] = Query(None, description="Only events at this location (exact match)"),
+    include_seats: bool = Query(False, description="Add seats_remaining to each event"),
+    if_none_match: Optional[str] = Header(None),
 ):
-    if timezone not in all_timezones:
+    if not timezones.is_valid_timezone(timezone):
         raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
-    return await crud.get_upcoming_events(db, user_tz=timezone, skip=skip, limit=limit)
+    start = timezones.to_utc(from_, timezone) if from_ else None
+    end = timezones.to_utc(to, timezone) if to else None
+    if start and end and start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'.")
+    key = (timezone, skip, limit, cursor, include_total, start, end, location)
+    _drop_stale_listings()
+    # Seat counts change with every registration, which does not clear the
+    # cache, so pages with them are always built fresh.
+    page = None if include_seats else events_cache.get(key)
+    if page is None:
+        after = None
+        if cursor is not None:
+            try:
+                after = pagination.decode_event_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor.")
+        generation = events_cache.generation
+        data = await crud.get_upcoming_events(db, user_tz=timezone, skip=skip, limit=limit, after=after, include_total=include_total, start=start, end=end, location=location, include_seats=include_seats)
+        # crud returns JSON-native values in EventPagination's field order,
+        # so the body is encoded directly (see app/serialization.py).
+        body = serialization.dumps(data)
+        page = CachedPage(body, f'"{hashlib.sha1(body).hexdigest()}"', formatdate(usegmt=True))
+        if not include_seats:
+            # Drop the page once the earliest-ending upcoming event ends,
+            # since that changes every listing.
+            next_end = await crud.next_event_end(db)
+            ttl = (next_end - datetime.utcnow()).total_seconds() if next_end else None
+            events_cache.set(key, page, ttl=ttl, generation=generation)
+    headers = {"ETag": page.etag, "Last-Modified": page.last_modified}
+    if if_none_match and etag_matches(if_none_match, page.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(page.body, media_type="application/json", headers=headers)
+
+def _render_event(event) -> ical.RenderedEvent:
+    vevent = ical.render_event(event)
+    rendered = ical.RenderedEvent(vevent, ical.etag(ical.calendar([vevent])), formatdate(usegmt=True))
+    ics_event_cache.set(event.id, rendered)
+    return rendered
+
+def _calendar_response(body: bytes, etag: str, last_modified: str, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": etag, "Last-Modified": last_modified}
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type=ICS_MEDIA_TYPE, headers=headers)
+
+@router.get(
+    "/events.ics",
+    summary="Calendar feed of upcoming events",
+    description=f"iCalendar (RFC 5545) feed of the soonest {settings.ics_feed_max_events} upcoming events (ICS_FEED_MAX_EVENTS), with times in UTC, for calendar app subscriptions. The feed is cached until events change and carries a strong ETag; a poll with a matching If-None-Match gets a 304 without a database query.",
+    response_class=Response,
+    responses={200: {"content": {"text/calendar": {}}}},
+)
+async def events_feed(db: AsyncSession = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
+    _drop_stale_listings()
+    page = ics_cache.get("events")
+    if page is None:
+        generation = ics_cache.generation
+        vevents = []
+        for row in await crud.get_feed_events(db, limit=settings.ics_feed_max_events):
+            rendered = ics_event_cache.get(row.id) or _render_event(row)
+            vevents.append(rendered.vevent)
+        body = ical.calendar(vevents)
+        page = CachedPage(body, ical.etag(body), formatdate(usegmt=True))
+        # Like the /events listing, the feed changes when its
+        # earliest-ending event ends.
+        next_end = await crud.next_event_end(db)
+        ttl = (next_end - datetime.utcnow()).total_seconds() if next_end else None
+        ics_cache.set("events", page, ttl=ttl, generation=generation)
+    return _calendar_response(page.body, page.etag, page.last_modified, if_none_match)
+
+@router.get(
+    "/events/{event_id}.ics",
+    summary="Calendar file for one event",
+    description="The event as an iCalendar (RFC 5545) file, times in UTC. Rendered once and cached; carries a strong ETag, and a matching If-None-Match gets a 304 without a database query.",
+    response_class=Response,
+    responses={200: {"content": {"text/calendar": {}}}},
+)
+async def event_feed(event_id: int, db: AsyncSession = Depends(get_read_db), if_none_match: Optional[str] = Header(None)):
+    rendered = ics_event_cache.get(event_id)
+    if rendered is None:
+        event = await crud.get_event(db, event_id)
+        if event is None:
+            raise HTTPException(status_code=404, detail="Event not found.")
+        rendered = _render_event(event)
+    return _calendar_response(ical.calendar([rendered.vevent]), rendered.etag, rendered.last_modified, if_none_match)
+
+@router.get(
+    "/events/calendar",
+    response_model=schemas.EventCalendar,
+    summary="Event counts per day",
+    description=f"Counts the events overlapping each local day from 'from' to 'to' (inclusive, at most {MAX_CALENDAR_DAYS} days) in the given timezone, optionally at one location. Days follow the timezone's DST changes. An event spanning several days counts on each.",
+)
+async def event_calendar(
+    from_: Optional[date] = Query(None, alias="from", description="First day (default: today in `timezone`)"),
+    to: Optional[date] = Query(None, description="Last day, inclusive (default: six days after 'from')"),
+    timezone: str = Query("Asia/Kolkata", description="Timezone, e.g. 'Asia/Kolkata'"),
+    location: Optional[str] = Query(None, description="Only events at this location (exact match)"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not timezones.is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
+    tz = timezones.get_timezone(timezone)
+    first = from_ or datetime.now(tz).date()
+    last = to or first + timedelta(days=6)
+    if last < first:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'.")
+    if (last - first).days + 1 > MAX_CALENDAR_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_CALENDAR_DAYS} days per calendar.")
+    days = []
+    for offset in range((last - first).days + 1):
+        day = first + timedelta(days=offset)
+        days.append((
+            day,
+            timezones.to_utc(datetime.combine(day, time.min), timezone),
+            timezones.to_utc(datetime.combine(day + timedelta(days=1), time.min), timezone),
+        ))
+    counts = await crud.get_event_calendar(db, days, location=location)
+    return {"timezone": timezone, "location": location, "days": counts}
+
+@router.get(
+    "/events/search",
+    response_model=schemas.EventPagination,
+    summary="Search upcoming events",
+    description="Full-text search over upcoming events' names and locations. Every word in q must match, as a prefix ('mum' finds 'Mumbai'); results are ranked best match first. Supports skip/limit or cursor pagination and timezone conversion like /events. Ranks depend on all events, so a cursor stops working (400) once events are created or archived; search again from the first page.",
+)
+async def search_events(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for in event names and locations"),
+    db: AsyncSession = Depends(get_read_db),
+    timezone: str = Query("Asia/Kolkata", description="Timezone, e.g. 'Asia/Kolkata'"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; overrides skip"),
+    include_total: bool = Query(True, description="Set to false to skip computing total (it is returned as null)"),
+):
+    if not timezones.is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
+    after = None
+    if cursor is not None:
+        try:
+            after = pagination.decode_search_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    data = await crud.search_events(db, q, user_tz=timezone, skip=skip, limit=limit, after=after, include_total=include_total)
+    if data is None:
+        raise HTTPException(status_code=400, detail="Search query has no words to match.")
+    if data is False:
+        raise HTTPException(status_code=400, detail="Events changed since this cursor was issued; search again from the first page.")
+    return Response(serialization.dumps(data), media_type="application/json")
 
 @router.post(
     "/events/{event_id}/register",
@@ -46,27 +261,310 @@ async def list_events(
     summary="Register an attendee for an event",
     description="Registers an attendee (name, email) for a specific event. Prevents overbooking and duplicate registration.",
 )
-async def register_attendee(event_id: int, attendee: schemas.AttendeeCreate, db: AsyncSession = Depends(get_db)):
-    result = await crud.register_attendee(db, event_id, attendee)
+async def register_attendee(
+    event_id: int,
+    attendee: schemas.AttendeeCreate,
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, description="Retries with the same key replay the first response instead of registering again"),
+):
+    if idempotency_key is None:
+        return await _register_attendee(db, event_id, attendee)
+    return await idempotency_store.run(
+        idempotency_key, f"POST /events/{event_id}/register", attendee.model_dump_json(),
+        lambda: idempotency.render(schemas.AttendeeOut, _register_attendee(db, event_id, attendee)),
+    )
+
+async def _register_attendee(db: AsyncSession, event_id: int, attendee: schemas.AttendeeCreate):
+    # Full events, and while the event has seat holds its free seats, are
+    # decided in memory; the rest wait for an admission slot.
+    if admission_control.is_full(event_id):
+        raise HTTPException(status_code=400, detail="Event is full.")
+    if shared_seats is not None and shared_seats.is_full(event_id):
+        SHARED_HITS.inc(1, "full")
+        raise HTTPException(status_code=400, detail="Event is full.")
+    claimed = seat_holds.claim(event_id)
+    if claimed == 0:
+        raise HTTPException(status_code=400, detail="Event is full.")
+    result = None
+    try:
+        async with admission_control.admit(event_id):
+            result = await _register(db, event_id, attendee)
+    finally:
+        if claimed is not None:
+            seat_holds.settle(event_id, used=0 if result is None else 1)
     if result is None:
         raise HTTPException(status_code=400, detail="Duplicate registration or event not found.")
     if result is False:
+        admission_control.mark_full(event_id)
         raise HTTPException(status_code=400, detail="Event is full.")
     return result
 
+async def _register(db: AsyncSession, event_id: int, attendee: schemas.AttendeeCreate):
+    if writer.registration_writer.running:
+        return await writer.registration_writer.submit(event_id, attendee)
+    return await crud.register_attendee(db, event_id, attendee)
+
+@router.post(
+    "/events/{event_id}/holds",
+    response_model=schemas.HoldOut,
+    status_code=status.HTTP_201_CREATED,
+    summary="Hold a seat",
+    description="Reserves a seat for a short time without registering anyone. Confirm the hold with the attendee's details before it expires, or release it.",
+)
+async def create_hold(event_id: int, db: AsyncSession = Depends(get_db)):
+    async def load_free_seats():
+        event = await crud.get_event(db, event_id)
+        return None if event is None else max(0, event.max_capacity - event.registered_count)
+
+    hold = await seat_holds.acquire(event_id, load_free_seats)
+    if hold is None:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    if hold is False:
+        raise HTTPException(status_code=400, detail="Event is full.")
+    expires_at = timezones.get_converter("UTC").isoformat(datetime.utcnow() + timedelta(seconds=seat_holds.ttl))
+    return schemas.HoldOut(hold_id=hold.hold_id, event_id=event_id, expires_at=expires_at, expires_in=seat_holds.ttl)
+
+@router.post(
+    "/events/{event_id}/holds/{hold_id}/confirm",
+    response_model=schemas.AttendeeOut,
+    summary="Confirm a seat hold",
+    description="Registers the attendee on the held seat. A duplicate registration, or a 429 from admission control, leaves the hold in place so it can be confirmed again.",
+)
+async def confirm_hold(event_id: int, hold_id: str, attendee: schemas.AttendeeCreate, db: AsyncSession = Depends(get_db)):
+    hold = seat_holds.take(event_id, hold_id)
+    if hold is None:
+        raise HTTPException(status_code=404, detail="Hold not found or expired.")
+    # Confirms are registrations too and take an admission slot; a 429
+    # leaves the hold in place for a retry.
+    try:
+        async with admission_control.admit(event_id):
+            result = await _register(db, event_id, attendee)
+    except BaseException:
+        seat_holds.restore(hold)
+        raise
+    if result is None:
+        seat_holds.restore(hold)
+        raise HTTPException(status_code=400, detail="Duplicate registration or event not found.")
+    seat_holds.settle(event_id, used=1)
+    if result is False:
+        # Another process sold the seat; the database has the last word.
+        admission_control.mark_full(event_id)
+        raise HTTPException(status_code=400, detail="Event is full.")
+    return result
+
+@router.delete(
+    "/events/{event_id}/holds/{hold_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Release a seat hold",
+)
+async def release_hold(event_id: int, hold_id: str):
+    if not seat_holds.release(event_id, hold_id):
+        raise HTTPException(status_code=404, detail="Hold not found or expired.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.post(
+    "/events/{event_id}/register/bulk",
+    response_model=schemas.BulkRegistrationResult,
+    summary="Register a batch of attendees for an event",
+    description=f"Registers up to {MAX_BULK_REGISTRATIONS} attendees in one transaction. Duplicates (within the batch or already registered) and rows beyond capacity are reported per row instead of failing the batch.",
+)
+async def register_attendees_bulk(event_id: int, attendees: List[schemas.AttendeeCreate], db: AsyncSession = Depends(get_db)):
+    if len(attendees) > MAX_BULK_REGISTRATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_REGISTRATIONS} registrations per batch.")
+    claimed = seat_holds.claim(event_id, len(attendees))
+    results = None
+    try:
+        async with admission_control.admit(event_id):
+            results = await crud.register_attendees_bulk(db, event_id, attendees, seats=claimed)
+    finally:
+        if claimed is not None:
+            created = sum(1 for status, _ in results if status == "created") if results else 0
+            seat_holds.settle(event_id, used=created, claimed=claimed)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    items = [
+        schemas.BulkRegistrationItem(index=i, email=a.email, status=status, id=row.id if row is not None else None)
+        for i, (a, (status, row)) in enumerate(zip(attendees, results))
+    ]
+    return schemas.BulkRegistrationResult(
+        event_id=event_id,
+        created=sum(1 for status, _ in results if status == "created"),
+        duplicates=sum(1 for status, _ in results if status == "duplicate"),
+        full=sum(1 for status, _ in results if status == "full"),
+        results=items,
+    )
+
 @router.get(
     "/events/{event_id}/attendees",
     response_model=schemas.AttendeePagination,
     summary="List all attendees for an event",
-    description="Returns all registered attendees for an event. Supports pagination and timezone conversion.",
+    description="Returns all registered attendees for an event. Supports skip/limit or cursor pagination and timezone conversion.",
 )
 async def get_attendees(
     event_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    timezone: str = Query("UTC", description="Timezone, e.g. 'Asia/Kolkata'"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; overrides skip"),
+    include_total: bool = Query(True, description="Set to false to skip computing total (it is returned as null)"),
+):
+    if not timezones.is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
+    after = None
+    if cursor is not None:
+        try:
+            after = pagination.decode_attendee_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    data = await crud.get_attendees(db, event_id, skip=skip, limit=limit, user_tz=timezone, after=after, include_total=include_total)
+    return Response(serialization.dumps(data), media_type="application/json")
+
+@router.get(
+    "/attendees/{email}/events",
+    response_model=schemas.RegistrationPagination,
+    summary="List the events an email is registered for",
+    description="Returns every event the email is registered for, with the event details and the registration's attendee_id, ordered by event id. The email is normalized as at registration. Supports skip/limit or cursor pagination and timezone conversion.",
+)
+async def get_registrations_by_email(
+    email: schemas.EmailStr,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=pagination.MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    timezone: str = Query("UTC", description="Timezone, e.g. 'Asia/Kolkata'"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; overrides skip"),
+    include_total: bool = Query(True, description="Set to false to skip computing total (it is returned as null)"),
+):
+    if not timezones.is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
+    after = None
+    if cursor is not None:
+        try:
+            after = pagination.decode_attendee_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor.")
+    data = await crud.get_registrations_by_email(db, email, skip=skip, limit=limit, user_tz=timezone, after=after, include_total=include_total)
+    return Response(serialization.dumps(data), media_type="application/json")
+
+@router.get(
+    "/events/{event_id}/attendees/export",
+    summary="Export an event's attendee roster",
+    description="Streams the full attendee roster as CSV or NDJSON, ordered by attendee id. Event times are converted to the requested timezone.",
+    response_class=StreamingResponse,
+)
+async def export_attendees(
+    event_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="'csv' or 'ndjson'"),
+    db: AsyncSession = Depends(get_read_db),
     timezone: str = Query("UTC", description="Timezone, e.g. 'Asia/Kolkata'"),
 ):
-    if timezone not in all_timezones:
+    if not timezones.is_valid_timezone(timezone):
         raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
-    return await crud.get_attendees(db, event_id, skip=skip, limit=limit, user_tz=timezone)
+    event = await crud.get_event(db, event_id)
+    if event is None:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    start_time, end_time = timezones.get_converter(timezone).isoformat_many([event.start_time, event.end_time])
+    encode = export.csv_chunk if format == "csv" else export.ndjson_chunk
+
+    async def body():
+        if format == "csv":
+            yield export.csv_header()
+        async for rows in crud.stream_attendees(db, event_id):
+            yield encode(rows, start_time, end_time)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"event-{event_id}-attendees.{format}"
+    return StreamingResponse(body(), media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+async def _current_availability(db: AsyncSession, event_id: int) -> Optional[availability.Availability]:
+    if shared_seats is not None:
+        seats = shared_seats.get(event_id)
+        if seats is not None:
+            SHARED_HITS.inc(1, "availability")
+            return availability.Availability(event_id, *seats)
+    event = await crud.get_event(db, event_id)
+    # Return the connection now; streams stay open for minutes.
+    await db.close()
+    if event is None:
+        return None
+    if shared_seats is not None:
+        shared_seats.record(event.id, event.registered_count, event.max_capacity)
+    return availability.Availability(event.id, event.registered_count, event.max_capacity)
+
+@router.get(
+    "/events/{event_id}/availability",
+    response_model=schemas.AvailabilityOut,
+    summary="Get an event's seat availability",
+    description="The event's registered count, max_capacity and seats_left, once. Under `python -m app.serve` it is answered from the workers' shared seat table when the event is known there.",
+)
+async def get_availability(event_id: int, db: AsyncSession = Depends(get_read_db)):
+    current = await _current_availability(db, event_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    return Response(availability.encode(current).text, media_type="application/json")
+
+@router.get(
+    "/events/{event_id}/stats",
+    response_model=schemas.EventStats,
+    summary="Get an event's registration statistics",
+    description=f"Registered count, seats remaining, fill percentage and registrations per hour for the last `hours` hours (at most {MAX_STATS_HOURS}; hours without registrations are omitted), with hour starts in the given timezone. Read from a rollup kept up to date by every registration, so the cost does not depend on the number of attendees.",
+)
+async def get_event_stats(
+    event_id: int,
+    hours: int = Query(24, description="How many hours of history, ending with the current hour"),
+    timezone: str = Query("Asia/Kolkata", description="Timezone, e.g. 'Asia/Kolkata'"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    if not timezones.is_valid_timezone(timezone):
+        raise HTTPException(status_code=400, detail=f"Invalid timezone: {timezone}")
+    if not 1 <= hours <= MAX_STATS_HOURS:
+        raise HTTPException(status_code=400, detail=f"hours must be between 1 and {MAX_STATS_HOURS}.")
+    stats = await crud.get_event_stats(db, event_id, user_tz=timezone, hours=hours)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    return stats
+
+@router.get(
+    "/events/{event_id}/availability/stream",
+    summary="Stream an event's seat availability",
+    description="Server-Sent Events: an `availability` event with registered, max_capacity and seats_left right away, then whenever registrations change them (at most one every AVAILABILITY_INTERVAL_MS). Idle streams get a keepalive comment.",
+    response_class=StreamingResponse,
+)
+async def availability_stream(event_id: int, db: AsyncSession = Depends(get_read_db)):
+    current = await _current_availability(db, event_id)
+    if current is None:
+        raise HTTPException(status_code=404, detail="Event not found.")
+    return StreamingResponse(
+        availability.sse_stream(current),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/events/{event_id}/availability/ws")
+async def availability_socket(websocket: WebSocket, event_id: int, db: AsyncSession = Depends(get_read_db)):
+    # Same messages as the SSE stream, as JSON text frames.
+    current = await _current_availability(db, event_id)
+    if current is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Event not found.")
+        return
+    await websocket.accept()
+    subscriber = availability.hub.subscribe(current)
+
+    async def watch_disconnect():
+        # Clients only listen; anything they send is ignored.
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscriber.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while (message := await subscriber.get()) is not None:
+            if message.text is not None:
+                await websocket.send_text(message.text)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        availability.hub.unsubscribe(subscriber)
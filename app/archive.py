@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from . import crud
+from .config import settings
+from .database import AsyncSessionLocal, engine
+from .metrics import Counter, register
+
+# Moves events that ended more than ARCHIVE_AFTER_DAYS ago, with their
+# attendees, from events/attendees into events_archive/attendees_archive, so
+# the hot tables and their indexes stay proportional to upcoming events.
+# Each batch is one short transaction (crud.archive_ended_events) and the
+# archiver sleeps between batches, so live registrations queue behind at
+# most one batch at a time. Runs as a background task (ARCHIVE_ENABLED) or
+# on demand:
+#
+#     python -m app.archive --older-than-days 30
+
+logger = logging.getLogger(__name__)
+
+EVENTS_ARCHIVED = register(Counter("archived_events_total", "Ended events moved to the archive tables."))
+
+class Archiver:
+    def __init__(self, session_factory, after: timedelta, max_events: int = 500, max_rows: int = 5000, pause: float = 0.05, interval: float = 3600.0):
+        self.session_factory = session_factory
+        self.after = after
+        self.max_events = max_events
+        self.max_rows = max_rows
+        self.pause = pause
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        # Archives everything that is due, batch by batch; returns the number
+        # of events moved.
+        ended_before = datetime.utcnow() - self.after
+        total = 0
+        while True:
+            async with self.session_factory() as db:
+                moved = await crud.archive_ended_events(db, ended_before, max_events=self.max_events, max_rows=self.max_rows)
+            if not moved:
+                return total
+            total += moved
+            EVENTS_ARCHIVED.inc(moved)
+            await asyncio.sleep(self.pause)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                moved = await self.run_once()
+                if moved:
+                    logger.info("Archived %d ended events", moved)
+            except Exception:
+                logger.exception("Archiving ended events failed")
+            await asyncio.sleep(self.interval)
+
+archiver = Archiver(
+    AsyncSessionLocal,
+    after=timedelta(days=settings.archive_after_days),
+    max_events=settings.archive_batch_events,
+    max_rows=settings.archive_batch_rows,
+    pause=settings.archive_pause_ms / 1000,
+    interval=settings.archive_interval_seconds,
+)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move ended events and their attendees to the archive tables.")
+    parser.add_argument("--older-than-days", type=float, default=settings.archive_after_days, help="archive events that ended this long ago")
+    parser.add_argument("--batch-events", type=int, default=settings.archive_batch_events)
+    parser.add_argument("--batch-rows", type=int, default=settings.archive_batch_rows)
+    parser.add_argument("--pause-ms", type=float, default=settings.archive_pause_ms, help="sleep between batches")
+    args = parser.parse_args()
+    logging.basicConfig()
+    one_off = Archiver(
+        AsyncSessionLocal,
+        after=timedelta(days=args.older_than_days),
+        max_events=args.batch_events,
+        max_rows=args.batch_rows,
+        pause=args.pause_ms / 1000,
+    )
+
+    async def run() -> int:
+        try:
+            return await one_off.run_once()
+        finally:
+            await engine.dispose()
+
+    print(f"Archived {asyncio.run(run())} events")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import serialization
+from .config import settings
+from .metrics import Collected, Counter, register
+from .shared_seats import shared_seats
+
+# Live seat availability for GET /events/{id}/availability/stream (SSE) and
+# its WebSocket variant. Registrations report the event's new
+# registered_count once their transaction commits; the hub keeps the latest
+# count per watched event and, at most once per interval, encodes one
+# message and appends it to every subscriber's queue. A burst of 500
+# registrations therefore costs 500 integer updates and a handful of
+# messages, and fan-out is a deque append per subscriber, not a query.
+#
+# Counts only grow, so the hub keeps the highest one it has seen and
+# reordered or stale reports cannot move it backwards. Subscriber queues are
+# bounded: a slow client loses its oldest messages, never the newest.
+#
+# The hub is per process; registrations made by other workers show up when
+# this process next registers for the event or a client reconnects. Under
+# app.serve, committed counts also go to the shared seat table.
+
+class Availability(NamedTuple):
+    event_id: int
+    registered: int
+    max_capacity: int
+
+class Message(NamedTuple):
+    # Encoded once per flush and shared by every subscriber.
+    text: Optional[str]  # None for keepalives
+    sse: bytes
+
+KEEPALIVE = Message(None, b": keepalive\n\n")
+
+def encode(availability: Availability) -> Message:
+    data = serialization.dumps({
+        "event_id": availability.event_id,
+        "registered": availability.registered,
+        "max_capacity": availability.max_capacity,
+        "seats_left": max(0, availability.max_capacity - availability.registered),
+    })
+    return Message(data.decode(), b"event: availability\ndata: " + data + b"\n\n")
+
+MESSAGES_DROPPED = register(Counter(
+    "availability_messages_dropped_total", "Availability messages dropped from full subscriber queues.",
+))
+
+class Subscriber:
+    # Waiting is a bare future, not an Event with a timeout: waking
+    # thousands of subscribers must cost one callback each.
+    __slots__ = ("event_id", "queue", "closed", "_waiter")
+
+    def __init__(self, event_id: int, queue_size: int):
+        self.event_id = event_id
+        self.queue: Deque[Message] = deque(maxlen=queue_size)
+        self.closed = False
+        self._waiter: Optional[asyncio.Future] = None
+
+    def put(self, message: Message) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            MESSAGES_DROPPED.inc()
+        self.queue.append(message)
+        self._wake()
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    async def get(self) -> Optional[Message]:
+        # Next message, or None once closed.
+        while not self.queue and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        if self.closed:
+            return None
+        return self.queue.popleft()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+class Topic:
+    __slots__ = ("subscribers", "latest", "sent")
+
+    def __init__(self, latest: Availability):
+        self.subscribers: Set[Subscriber] = set()
+        self.latest = latest
+        self.sent = latest
+
+class AvailabilityHub:
+    def __init__(self, interval: float = 0.25, queue_size: int = 16, heartbeat: Optional[float] = 15.0):
+        self.interval = interval
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.topics: Dict[int, Topic] = {}
+        self._dirty: Set[int] = set()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._heartbeat_handle: Optional[asyncio.TimerHandle] = None
+
+    def watching(self, event_id: int) -> bool:
+        return event_id in self.topics
+
+    def subscribe(self, current: Availability) -> Subscriber:
+        # `current` is the subscriber's own read of the event; it is sent to
+        # the new subscriber right away.
+        topic = self.topics.get(current.event_id)
+        if topic is None:
+            topic = self.topics[current.event_id] = Topic(current)
+        else:
+            self.publish(current)
+        subscriber = Subscriber(current.event_id, self.queue_size)
+        topic.subscribers.add(subscriber)
+        subscriber.put(encode(topic.latest))
+        if self.heartbeat and self._heartbeat_handle is None:
+            self._heartbeat_handle = asyncio.get_running_loop().call_later(self.heartbeat, self._beat)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        topic = self.topics.get(subscriber.event_id)
+        if topic is None:
+            return
+        topic.subscribers.discard(subscriber)
+        if not topic.subscribers:
+            del self.topics[subscriber.event_id]
+            self._dirty.discard(subscriber.event_id)
+        if not self.topics:
+            for handle in (self._flush_handle, self._heartbeat_handle):
+                if handle is not None:
+                    handle.cancel()
+            self._flush_handle = self._heartbeat_handle = None
+
+    def publish(self, availability: Availability) -> None:
+        # O(1); the message goes out with the next flush.
+        topic = self.topics.get(availability.event_id)
+        if topic is None or availability.registered <= topic.latest.registered:
+            return
+        topic.latest = availability
+        self._dirty.add(availability.event_id)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.interval, self.flush)
+
+    def flush(self) -> int:
+        # Sends one message per changed event; returns how many were sent.
+        self._flush_handle = None
+        dirty, self._dirty = self._dirty, set()
+        sent = 0
+        for event_id in dirty:
+            topic = self.topics.get(event_id)
+            if topic is None or topic.latest == topic.sent:
+                continue
+            topic.sent = topic.latest
+            message = encode(topic.latest)
+            for subscriber in topic.subscribers:
+                subscriber.put(message)
+            sent += 1
+        return sent
+
+    def _beat(self) -> None:
+        # One timer for all subscribers; idle ones get a keepalive.
+        self._heartbeat_handle = None
+        if not self.topics:
+            return
+        for topic in self.topics.values():
+            for subscriber in topic.subscribers:
+                if not subscriber.queue:
+                    subscriber.put(KEEPALIVE)
+        self._heartbeat_handle = asyncio.get_running_loop().call_later(self.heartbeat, self._beat)
+
+    def subscriber_count(self) -> int:
+        return sum(len(topic.subscribers) for topic in self.topics.values())
+
+hub = AvailabilityHub(
+    interval=settings.availability_interval_ms / 1000,
+    queue_size=settings.availability_queue_size,
+    heartbeat=settings.availability_heartbeat_seconds,
+)
+
+register(Collected("availability_subscribers", "Open availability streams.", (), lambda: {(): hub.subscriber_count()}))
+
+# Registrations report counts through the session, so nothing is published
+# for a transaction that rolls back.
+
+_SESSION_KEY = "availability"
+
+def stage(db, availability: Availability) -> None:
+    # Publish `availability` when `db` commits. Free for unwatched events,
+    # unless workers share seat counts.
+    if shared_seats is not None or hub.watching(availability.event_id):
+        db.info.setdefault(_SESSION_KEY, {})[availability.event_id] = availability
+
+@event.listens_for(Session, "after_commit")
+def _publish_staged(session):
+    for availability in session.info.pop(_SESSION_KEY, {}).values():
+        if shared_seats is not None:
+            shared_seats.record(*availability)
+        hub.publish(availability)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_staged(session):
+    session.info.pop(_SESSION_KEY, None)
+
+async def sse_stream(current: Availability):
+    subscriber = hub.subscribe(current)
+    try:
+        while (message := await subscriber.get()) is not None:
+            # Keepalives are SSE comments; they hold idle connections open
+            # through proxies.
+            yield message.sse
+    finally:
+        hub.unsubscribe(subscriber)
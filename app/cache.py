@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+# In-process LRU + TTL caches. Every cache registers itself by name so its
+# counters can be inspected (GET /cache/stats).
+
+CACHES: Dict[str, "TTLCache"] = {}
+
+_MISSING = object()
+
+class TTLCache:
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = 30.0, clock=time.monotonic):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by clear(); a value computed before an invalidation is not
+        # stored afterwards (see set()).
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        CACHES[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING:
+                expires_at, value = item
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, generation: Optional[int] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            if ttl <= 0 or (generation is not None and generation != self.generation):
+                return
+            self._data[key] = (self._clock() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+# Pre-rendered GET /events pages keyed by (timezone, skip, limit, cursor,
+# include_total). Cleared by crud.create_event and create_events_bulk;
+# entries also expire when the earliest-ending upcoming event ends.
+events_cache = TTLCache("events", maxsize=512, ttl=60.0)
+
+# The rendered GET /events.ics feed (a CachedPage). Cleared with
+# events_cache; also expires when the earliest-ending upcoming event ends.
+ics_cache = TTLCache("ics", maxsize=1, ttl=300.0)
+
+# Encoded VEVENT blocks (ical.RenderedEvent) by event id, shared by the
+# full feed and GET /events/{id}.ics. Events are never edited, so a block
+# stays valid until crud.archive_ended_events drops it.
+ics_event_cache = TTLCache("ics_events", maxsize=20000, ttl=3600.0)
@@ -0,0 +1,100 @@
+import os
+from dataclasses import dataclass, fields, replace
+from typing import Optional
+
+# Environment profiles. APP_ENV picks the profile (dev, test, prod); any field
+# can then be overridden with an environment variable of the same name in
+# upper case, e.g. DATABASE_URL=... or POOL_SIZE=20.
+
+@dataclass(frozen=True)
+class Settings:
+    env: str = "dev"
+    database_url: str = "sqlite+aiosqlite:///./app/event_management.db"
+    # List endpoints read through their own engine so they never wait behind
+    # registration writes for a pooled connection. Defaults to database_url.
+    read_database_url: Optional[str] = None
+    echo: bool = False
+    pool_size: int = 5
+    max_overflow: int = 10
+    # Applied on every new SQLite connection.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # Request/SQL instrumentation exported at GET /metrics.
+    metrics_enabled: bool = True
+    # Adds X-DB-Statements / X-DB-Time-Ms to every response.
+    debug_headers: bool = False
+    # Group-commit single registrations through one writer task (app/writer.py).
+    write_batching: bool = False
+    write_batch_max: int = 256
+    write_batch_window_ms: float = 2.0
+    # How long POST /events/{id}/holds reserves a seat (app/holds.py).
+    hold_ttl_seconds: float = 120.0
+    # Idempotency-Key responses (app/idempotency.py): how many are kept in
+    # memory, for how long, and whether they are also stored in the database.
+    idempotency_cache_size: int = 10000
+    idempotency_ttl_seconds: float = 24 * 3600.0
+    idempotency_persistent: bool = False
+    # Availability streams (app/availability.py): at most one update per
+    # event per interval, messages buffered per subscriber, and how often an
+    # idle SSE stream sends a keepalive.
+    availability_interval_ms: float = 250.0
+    availability_queue_size: int = 16
+    availability_heartbeat_seconds: float = 15.0
+    # Admission control for registrations (app/admission.py): slots overall
+    # and per event, how many requests may queue for one and for how long,
+    # how long a full event is remembered, and the 429's Retry-After. The
+    # slot counts are small because SQLite commits one write at a time: more
+    # concurrent registrations only wait on its lock, whose busy handler is
+    # not FIFO and times some of them out, while the queue here is.
+    admission_max_concurrency: int = 8
+    admission_event_concurrency: int = 4
+    admission_queue_size: int = 256
+    admission_queue_timeout_ms: float = 1000.0
+    admission_full_ttl_seconds: float = 60.0
+    admission_retry_after_seconds: int = 1
+    # Archiving of ended events (app/archive.py): run in the background,
+    # how long after an event ends, and how much each transaction moves.
+    archive_enabled: bool = False
+    archive_after_days: float = 30.0
+    archive_interval_seconds: float = 3600.0
+    archive_batch_events: int = 500
+    archive_batch_rows: int = 5000
+    archive_pause_ms: float = 50.0
+    # Upcoming events in GET /events.ics, soonest first.
+    ics_feed_max_events: int = 1000
+    # Seat counts shared between workers (app/shared_seats.py). Set by
+    # `python -m app.serve` for its workers; unset means one process.
+    shared_seats_path: Optional[str] = None
+    shared_seats_slots: int = 1 << 20
+
+PROFILES = {
+    "dev": Settings(env="dev", echo=True, debug_headers=True),
+    "test": Settings(env="test", database_url="sqlite+aiosqlite:///:memory:", pool_size=1, max_overflow=0),
+    "prod": Settings(env="prod", pool_size=10, max_overflow=20),
+}
+
+def _parse(value: str, default):
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+def get_settings(environ=os.environ) -> Settings:
+    env = environ.get("APP_ENV", "dev")
+    if env not in PROFILES:
+        raise ValueError(f"Unknown APP_ENV {env!r}; expected one of {sorted(PROFILES)}")
+    profile = PROFILES[env]
+    overrides = {}
+    for f in fields(Settings):
+        value = environ.get(f.name.upper())
+        if value is not None and f.name != "env":
+            overrides[f.name] = _parse(value, getattr(profile, f.name))
+    return replace(profile, **overrides)
+
+settings = get_settings()
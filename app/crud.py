@@ -1,72 +1,329 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import DateTime, Row, String, and_, column, delete, func, insert, literal, literal_column, table, tuple_, update, values
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
-from . import models, schemas
-from typing import List, Optional
-from datetime import datetime
-from pytz import timezone as pytz_timezone, UTC
-from sqlalchemy.orm import selectinload
+from . import availability, models, schemas, timezones
+from .cache import events_cache, ics_cache, ics_event_cache
+from .pagination import encode_cursor
+from .shared_seats import shared_seats
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
+import hashlib
+import re
+
+# Keeps IN (...) lists well under SQLite's bound-parameter limit.
+BATCH_CHUNK_SIZE = 500
 
 # Event CRUD
 
-async def create_event(db: AsyncSession, event: schemas.EventCreate) -> models.Event:
-    db_event = models.Event(
-        name=event.name,
-        location=event.location,
-        start_time=event.start_time,
-        end_time=event.end_time,
-        max_capacity=event.max_capacity
+def _event_row(event: schemas.EventCreate) -> dict:
+    return {
+        "name": event.name,
+        "location": event.location,
+        "start_time": event.start_time,
+        "end_time": event.end_time,
+        "max_capacity": event.max_capacity,
+    }
+
+def _insert_events(rows: List[dict]):
+    # Multi-row INSERT that skips names already taken (uix_event_name), in
+    # the table or earlier in the same statement, and returns only the rows
+    # it created.
+    return (
+        sqlite_insert(models.Event)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[models.Event.name])
+        .returning(models.Event.id, models.Event.name)
     )
-    db.add(db_event)
+
+def _events_changed() -> None:
+    # Cached listings are stale, in this process and (under app.serve) in
+    # the other workers.
+    events_cache.clear()
+    ics_cache.clear()
+    if shared_seats is not None:
+        shared_seats.note_events_changed()
+
+async def create_event(db: AsyncSession, event: schemas.EventCreate) -> Optional[models.Event]:
+    # One round trip: the insert returns the new id, so there is no
+    # uniqueness pre-check and no refresh. None if the name is taken.
+    row = _event_row(event)
+    created = (await db.execute(_insert_events([row]))).one_or_none()
+    if created is None:
+        await db.rollback()
+        return None
+    await db.commit()
+    _events_changed()
+    return models.Event(id=created.id, registered_count=0, **row)
+
+async def create_events_bulk(db: AsyncSession, events: List[schemas.EventCreate]) -> List[Tuple[str, Optional[models.Event]]]:
+    # Creates many events in one transaction, one INSERT ... RETURNING per
+    # BATCH_CHUNK_SIZE rows. Returns one (status, event) pair per input, in
+    # order: "created", or "duplicate" if the name was already taken or
+    # appears earlier in the batch.
+    rows = [_event_row(event) for event in events]
+    ids = {}
+    for i in range(0, len(rows), BATCH_CHUNK_SIZE):
+        result = await db.execute(_insert_events(rows[i:i + BATCH_CHUNK_SIZE]))
+        ids.update((name, event_id) for event_id, name in result)
     await db.commit()
-    await db.refresh(db_event)
-    return db_event
+    if ids:
+        _events_changed()
+    results = []
+    for row in rows:
+        # Only the first row with a given name was inserted.
+        event_id = ids.pop(row["name"], None)
+        if event_id is None:
+            results.append(("duplicate", None))
+        else:
+            results.append(("created", models.Event(id=event_id, registered_count=0, **row)))
+    return results
+
+async def _event_window(db: AsyncSession, start: datetime, end: Optional[datetime] = None, location: Optional[str] = None) -> Optional[list]:
+    # Conditions for events overlapping [start, end) (end open if None),
+    # optionally in one location; None if there are no events at all.
+    # Overlap alone (start_time < end AND end_time > start) cannot bound an
+    # index scan from below, so start_time is also bounded by start minus
+    # the longest event's duration: no event that overlaps can start
+    # earlier. The scan then covers the window, not the table.
+    longest = await db.scalar(select(func.max(models.event_duration_days)))
+    if longest is None:
+        return None
+    conditions = [
+        models.Event.end_time > start,
+        # A second of slack for julianday()'s floating point.
+        models.Event.start_time >= start - timedelta(days=longest, seconds=1),
+    ]
+    if end is not None:
+        conditions.append(models.Event.start_time < end)
+    if location is not None:
+        conditions.append(models.Event.location == location)
+    return conditions
 
-async def get_upcoming_events(db: AsyncSession, user_tz: str = "UTC", skip: int = 0, limit: int = 100) -> dict:
+async def get_upcoming_events(db: AsyncSession, user_tz: str = "UTC", skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None, include_total: bool = True, start: Optional[datetime] = None, end: Optional[datetime] = None, location: Optional[str] = None, include_seats: bool = False) -> dict:
+    # start/end (naive UTC) and location narrow the listing to upcoming
+    # events overlapping [start, end) in that location. include_seats adds
+    # seats_remaining from the same rows.
     now = datetime.utcnow()
-    result = await db.execute(select(models.Event).where(models.Event.end_time > now).offset(skip).limit(limit))
-    events = result.scalars().all()
-    total_result = await db.execute(select(models.Event).where(models.Event.end_time > now))
-    total = len(total_result.scalars().all())
-    tz = pytz_timezone(user_tz)
+    if start is None and end is None and location is None:
+        conditions = [models.Event.end_time > now]
+    else:
+        conditions = await _event_window(db, max(start, now) if start else now, end, location)
+    if conditions is None:
+        return {"total": 0 if include_total else None, "skip": skip, "limit": limit, "next_cursor": None, "events": []}
+    # Plain column tuples: no ORM identity map or attribute instrumentation.
+    columns = [
+        models.Event.id, models.Event.name, models.Event.location,
+        models.Event.start_time, models.Event.end_time, models.Event.max_capacity,
+    ]
+    if include_seats:
+        columns.append(models.Event.registered_count)
+    query = select(*columns).where(*conditions)
+    if after is not None:
+        # Keyset mode: resume after the (start_time, id) of the previous page.
+        query = query.where(tuple_(models.Event.start_time, models.Event.id) > after)
+        skip = 0
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.order_by(models.Event.start_time, models.Event.id).limit(limit + 1))
+    events = result.all()
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        if events:
+            next_cursor = encode_cursor(events[-1].start_time, events[-1].id)
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(models.Event).where(*conditions))
+    return {
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "events": _event_dicts(events, user_tz, include_seats)
+    }
+
+def _event_dicts(events: Sequence[Row], user_tz: str, include_seats: bool = False) -> List[dict]:
+    converter = timezones.get_converter(user_tz)
+    start_times = converter.isoformat_many([event.start_time for event in events])
+    end_times = converter.isoformat_many([event.end_time for event in events])
     event_list = []
-    for event in events:
-        event_list.append({
+    for event, start_time, end_time in zip(events, start_times, end_times):
+        item = {
             "id": event.id,
             "name": event.name,
             "location": event.location,
-            "start_time": UTC.localize(event.start_time).astimezone(tz).isoformat(),
-            "end_time": UTC.localize(event.end_time).astimezone(tz).isoformat(),
+            "start_time": start_time,
+            "end_time": end_time,
             "max_capacity": event.max_capacity
-        })
+        }
+        if include_seats:
+            item["seats_remaining"] = max(0, event.max_capacity - event.registered_count)
+        event_list.append(item)
+    return event_list
+
+async def get_feed_events(db: AsyncSession, limit: int = 1000) -> Sequence[Row]:
+    # The soonest `limit` upcoming events, as plain rows for the calendar
+    # feed (GET /events.ics).
+    return (await db.execute(
+        select(models.Event.id, models.Event.name, models.Event.location, models.Event.start_time, models.Event.end_time, models.Event.created_at)
+        .where(models.Event.end_time > datetime.utcnow())
+        .order_by(models.Event.start_time, models.Event.id)
+        .limit(limit)
+    )).all()
+
+async def next_event_end(db: AsyncSession) -> Optional[datetime]:
+    # When the earliest-ending upcoming event ends; listings change then.
+    return await db.scalar(select(func.min(models.Event.end_time)).where(models.Event.end_time > datetime.utcnow()))
+
+async def get_event_calendar(db: AsyncSession, days: Sequence[Tuple[date, datetime, datetime]], location: Optional[str] = None) -> List[dict]:
+    # Number of events overlapping each (day, start, end) window, with the
+    # bounds in naive UTC, counted in SQL. An event spanning several days
+    # counts on each of them.
+    if not days:
+        return []
+    windows = values(
+        column("day", String), column("day_start", DateTime), column("day_end", DateTime), column("floor", DateTime),
+        name="days",
+    )
+    longest = await db.scalar(select(func.max(models.event_duration_days)))
+    counts = {}
+    if longest is not None:
+        slack = timedelta(days=longest, seconds=1)
+        windows = windows.data([(day.isoformat(), day_start, day_end, day_start - slack) for day, day_start, day_end in days]).cte("days")
+        # The floor bound is the same trick as _event_window(): each day is
+        # one index range scan.
+        overlap = and_(
+            models.Event.start_time < windows.c.day_end,
+            models.Event.end_time > windows.c.day_start,
+            models.Event.start_time >= windows.c.floor,
+        )
+        if location is not None:
+            overlap = and_(overlap, models.Event.location == location)
+        result = await db.execute(
+            select(windows.c.day, func.count(models.Event.id))
+            .select_from(windows)
+            .join(models.Event, overlap)
+            .group_by(windows.c.day)
+        )
+        counts = dict(result.all())
+    return [{"date": day.isoformat(), "count": counts.get(day.isoformat(), 0)} for day, _, _ in days]
+
+# FTS5 index over events.name/location, maintained by triggers (see models.py).
+events_fts = table("events_fts", column("rowid"))
+# FTS5's own row with the document count and total token counts (its
+# "averages" record), which bm25 reads along with per-term counts.
+_fts_averages = table("events_fts_data", column("id"), column("block"))
+# bm25 with name matches weighted above location matches; lower is better.
+_search_rank = func.bm25(literal_column("events_fts"), 2.0, 1.0)
+_SEARCH_TERM = re.compile(r"\w+")
+MAX_SEARCH_TERMS = 16
+
+def _fts_match_expression(q: str) -> Optional[str]:
+    # Every word must match, each as a prefix ("mum" finds "Mumbai"). Words
+    # are quoted so FTS5 query syntax in user input is taken literally.
+    terms = _SEARCH_TERM.findall(q)[:MAX_SEARCH_TERMS]
+    return " ".join(f'"{term}"*' for term in terms) or None
+
+async def _search_corpus_version(db: AsyncSession) -> str:
+    # Changes whenever bm25 scores can: an event is created (max id grows;
+    # ids are never reused, see archive_ended_events) or archived (the
+    # document count drops). Two PK lookups.
+    averages, max_id = (await db.execute(select(
+        select(_fts_averages.c.block).where(_fts_averages.c.id == 1).scalar_subquery(),
+        select(func.max(models.Event.id)).scalar_subquery(),
+    ))).one()
+    return hashlib.blake2b(b"%d:%s" % (max_id or 0, averages or b""), digest_size=8).hexdigest()
+
+async def search_events(db: AsyncSession, q: str, user_tz: str = "UTC", skip: int = 0, limit: int = 100, after: Optional[Tuple[float, int, str]] = None, include_total: bool = True) -> Optional[dict]:
+    # Upcoming events whose name or location match q, best match first.
+    # Returns None if q has no searchable words, and False if `after` comes
+    # from a cursor issued before events were created or archived: bm25
+    # scores depend on the whole corpus, so its (rank, id) no longer marks
+    # the same place in the results.
+    match = _fts_match_expression(q)
+    if match is None:
+        return None
+    version = None
+    if after is not None:
+        version = await _search_corpus_version(db)
+        if after[2] != version:
+            return False
+    now = datetime.utcnow()
+    matching = (
+        select(models.Event.id)
+        .join(events_fts, events_fts.c.rowid == models.Event.id)
+        .where(literal_column("events_fts").op("MATCH")(match), models.Event.end_time > now)
+    )
+    query = matching.with_only_columns(
+        models.Event.id, models.Event.name, models.Event.location,
+        models.Event.start_time, models.Event.end_time, models.Event.max_capacity,
+        _search_rank.label("rank"),
+    )
+    if after is not None:
+        # Keyset mode: resume after the (rank, id) of the previous page.
+        query = query.where(tuple_(_search_rank, models.Event.id) > after[:2])
+        skip = 0
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.order_by(_search_rank, models.Event.id).limit(limit + 1))
+    events = result.all()
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        if events:
+            if version is None:
+                version = await _search_corpus_version(db)
+            next_cursor = encode_cursor(events[-1].rank, events[-1].id, version)
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(matching.subquery()))
     return {
         "total": total,
         "skip": skip,
         "limit": limit,
-        "events": event_list
+        "next_cursor": next_cursor,
+        "events": _event_dicts(events, user_tz)
     }
 
 # Attendee CRUD
 
-async def register_attendee(db: AsyncSession, event_id: int, attendee: schemas.AttendeeCreate) -> Optional[models.Attendee]:
-    result = await db.execute(
-        select(models.Event)
-        .options(selectinload(models.Event.attendees))
-        .where(models.Event.id == event_id)
+def _count_registrations(event_id: int, at: datetime, count: int):
+    # Adds `count` registrations to the event's bucket for the hour of `at`.
+    hour = at.replace(minute=0, second=0, microsecond=0)
+    stmt = sqlite_insert(models.EventStatsHour).values(event_id=event_id, hour=hour, registrations=count)
+    return stmt.on_conflict_do_update(
+        index_elements=[models.EventStatsHour.event_id, models.EventStatsHour.hour],
+        set_={"registrations": models.EventStatsHour.registrations + stmt.excluded.registrations},
     )
-    event = result.scalar_one_or_none()
-    if not event:
-        return None
-    if len(event.attendees) >= event.max_capacity:
-        return False  # Overbooked
-    # Prevent duplicate registration for same event/email
-    for a in event.attendees:
-        if a.email == attendee.email:
-            return None
+
+async def register_attendee(db: AsyncSession, event_id: int, attendee: schemas.AttendeeCreate) -> Optional[models.Attendee]:
+    # Claim a seat with a single conditional UPDATE so concurrent requests can
+    # never push registered_count past max_capacity, then insert in the same
+    # transaction. Duplicates are caught by uix_event_email, which rolls the
+    # seat back together with the insert.
+    seat = (await db.execute(
+        update(models.Event)
+        .where(models.Event.id == event_id, models.Event.registered_count < models.Event.max_capacity)
+        .values(registered_count=models.Event.registered_count + 1)
+        .returning(models.Event.registered_count, models.Event.max_capacity)
+        .execution_options(synchronize_session=False)
+    )).one_or_none()
+    if seat is None:
+        await db.rollback()
+        exists = await db.scalar(select(models.Event.id).where(models.Event.id == event_id))
+        return False if exists else None  # False means overbooked
+    availability.stage(db, availability.Availability(event_id, *seat))
+    now = datetime.utcnow()
+    # Before the attendee is added, so a duplicate surfaces at commit (not at
+    # this statement's autoflush) and rolls the bucket back with the seat.
+    await db.execute(_count_registrations(event_id, now, 1))
     db_attendee = models.Attendee(
         name=attendee.name,
         email=attendee.email,
-        event_id=event_id
+        event_id=event_id,
+        registered_at=now,
     )
     db.add(db_attendee)
     try:
@@ -74,17 +331,155 @@ async def register_attendee(db: AsyncSession, event_id: int, attendee: schemas.A
     except IntegrityError:
         await db.rollback()
         return None
-    await db.refresh(db_attendee)
     return db_attendee
 
-async def get_attendees(db: AsyncSession, event_id: int, skip: int = 0, limit: int = 100, user_tz: str = "UTC") -> dict:
-    attendees_result = await db.execute(select(models.Attendee).where(models.Attendee.event_id == event_id).offset(skip).limit(limit))
-    attendees = attendees_result.scalars().all()
-    total_result = await db.execute(select(models.Attendee).where(models.Attendee.event_id == event_id))
-    total = len(total_result.scalars().all())
-    event_result = await db.execute(select(models.Event).where(models.Event.id == event_id))
-    event = event_result.scalar_one_or_none()
-    tz = pytz_timezone(user_tz)
+async def register_attendees_batch(db: AsyncSession, event_id: int, attendees: List[schemas.AttendeeCreate], seats: Optional[int] = None) -> Optional[List[Tuple[str, Optional[models.Attendee]]]]:
+    # Registers many attendees for one event inside the caller's transaction
+    # (the caller commits). Returns one (status, attendee) pair per input, in
+    # order, with status "created", "full" or "duplicate"; None if the event
+    # does not exist. `seats` caps how many may be created (seats claimed
+    # from the hold ledger); rows beyond it are "full".
+    # A no-op UPDATE takes the write lock on the event row (SQLite has no
+    # SELECT ... FOR UPDATE) and reads the counter, so the capacity and
+    # duplicate checks below cannot race with other registrations.
+    row = (await db.execute(
+        update(models.Event)
+        .where(models.Event.id == event_id)
+        .values(registered_count=models.Event.registered_count)
+        .returning(models.Event.registered_count, models.Event.max_capacity)
+        .execution_options(synchronize_session=False)
+    )).one_or_none()
+    if row is None:
+        return None
+    registered, max_capacity = row
+    capacity = max_capacity if seats is None else min(max_capacity, registered + seats)
+    emails = list({a.email for a in attendees})
+    existing = set()
+    for i in range(0, len(emails), BATCH_CHUNK_SIZE):
+        existing.update(await db.scalars(
+            select(models.Attendee.email)
+            .where(models.Attendee.event_id == event_id, models.Attendee.email.in_(emails[i:i + BATCH_CHUNK_SIZE]))
+        ))
+    # Same precedence as register_attendee: a full event wins over a duplicate.
+    statuses = []
+    accepted = []
+    for attendee in attendees:
+        if registered + len(accepted) >= capacity:
+            statuses.append("full")
+        elif attendee.email in existing:
+            statuses.append("duplicate")
+        else:
+            existing.add(attendee.email)
+            accepted.append(attendee)
+            statuses.append("created")
+    created = {}
+    if accepted:
+        now = datetime.utcnow()
+        rows = [{"name": a.name, "email": a.email, "event_id": event_id, "registered_at": now} for a in accepted]
+        result = await db.execute(insert(models.Attendee).returning(models.Attendee.id, models.Attendee.email), rows)
+        ids = {email: attendee_id for attendee_id, email in result}
+        created = {
+            a.email: models.Attendee(id=ids[a.email], name=a.name, email=a.email, event_id=event_id, registered_at=now)
+            for a in accepted
+        }
+        await db.execute(_count_registrations(event_id, now, len(accepted)))
+        await db.execute(
+            update(models.Event)
+            .where(models.Event.id == event_id)
+            .values(registered_count=registered + len(accepted))
+            .execution_options(synchronize_session=False)
+        )
+        availability.stage(db, availability.Availability(event_id, registered + len(accepted), max_capacity))
+    return [
+        (status, created[a.email] if status == "created" else None)
+        for status, a in zip(statuses, attendees)
+    ]
+
+async def register_attendees_bulk(db: AsyncSession, event_id: int, attendees: List[schemas.AttendeeCreate], seats: Optional[int] = None) -> Optional[List[Tuple[str, Optional[models.Attendee]]]]:
+    results = await register_attendees_batch(db, event_id, attendees, seats=seats)
+    if results is None:
+        await db.rollback()
+        return None
+    await db.commit()
+    return results
+
+async def get_attendees(db: AsyncSession, event_id: int, skip: int = 0, limit: int = 100, user_tz: str = "UTC", after: Optional[int] = None, include_total: bool = True) -> dict:
+    return await _attendee_page(db, models.Attendee, models.Event, event_id, skip, limit, user_tz, after, include_total)
+
+async def get_registrations_by_email(db: AsyncSession, email: str, skip: int = 0, limit: int = 100, user_tz: str = "UTC", after: Optional[int] = None, include_total: bool = True) -> dict:
+    # Every event an email is registered for, with the event details joined
+    # in, ordered by event id. ix_attendees_email_event_id serves the filter,
+    # the order and the keyset, and events are joined by primary key, so the
+    # cost follows the email's registrations, not the table sizes.
+    query = (
+        select(
+            models.Event.id, models.Event.name, models.Event.location,
+            models.Event.start_time, models.Event.end_time, models.Event.max_capacity,
+            models.Attendee.id.label("attendee_id"), models.Attendee.name.label("attendee_name"),
+        )
+        .join(models.Event, models.Event.id == models.Attendee.event_id)
+        .where(models.Attendee.email == email)
+    )
+    if after is not None:
+        # Keyset mode: resume after the event id of the previous page.
+        query = query.where(models.Attendee.event_id > after)
+        skip = 0
+    else:
+        query = query.offset(skip)
+    rows = (await db.execute(query.order_by(models.Attendee.event_id).limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if rows:
+            next_cursor = encode_cursor(rows[-1].id)
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(models.Attendee).where(models.Attendee.email == email))
+    events = _event_dicts(rows, user_tz)
+    for event, row in zip(events, rows):
+        event["attendee_id"] = row.attendee_id
+        event["attendee_name"] = row.attendee_name
+    return {
+        "email": email,
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "events": events
+    }
+
+async def _attendee_page(db: AsyncSession, attendee_model, event_model, event_id: int, skip: int, limit: int, user_tz: str, after: Optional[int], include_total: bool) -> dict:
+    # Shared by live and archived attendee listings; the archive tables have
+    # the same columns.
+    query = select(
+        attendee_model.id, attendee_model.name, attendee_model.email, attendee_model.event_id,
+    ).where(attendee_model.event_id == event_id)
+    if after is not None:
+        # Keyset mode: resume after the id of the previous page.
+        query = query.where(attendee_model.id > after)
+        skip = 0
+    else:
+        query = query.offset(skip)
+    attendees_result = await db.execute(query.order_by(attendee_model.id).limit(limit + 1))
+    attendees = attendees_result.all()
+    next_cursor = None
+    if len(attendees) > limit:
+        attendees = attendees[:limit]
+        if attendees:
+            next_cursor = encode_cursor(attendees[-1].id)
+    event_result = await db.execute(
+        select(event_model.start_time, event_model.end_time, event_model.registered_count)
+        .where(event_model.id == event_id)
+    )
+    event = event_result.one_or_none()
+    total = None
+    if include_total:
+        # registered_count is maintained by register_attendee, so no COUNT is needed.
+        total = event.registered_count if event else 0
+    # Every row shares the event's times, so convert them once.
+    event_start_time = event_end_time = None
+    if event:
+        event_start_time, event_end_time = timezones.get_converter(user_tz).isoformat_many([event.start_time, event.end_time])
     result = []
     for attendee in attendees:
         result.append({
@@ -92,12 +487,226 @@ async def get_attendees(db: AsyncSession, event_id: int, skip: int = 0, limit: i
             "name": attendee.name,
             "email": attendee.email,
             "event_id": attendee.event_id,
-            "event_start_time": UTC.localize(event.start_time).astimezone(tz).isoformat() if event else None,
-            "event_end_time": UTC.localize(event.end_time).astimezone(tz).isoformat() if event else None
+            "event_start_time": event_start_time,
+            "event_end_time": event_end_time
         })
     return {
         "total": total,
         "skip": skip,
         "limit": limit,
+        "next_cursor": next_cursor,
         "attendees": result
     }
+
+async def get_event(db: AsyncSession, event_id: int) -> Optional[models.Event]:
+    result = await db.execute(select(models.Event).where(models.Event.id == event_id))
+    return result.scalar_one_or_none()
+
+async def stream_attendees(db: AsyncSession, event_id: int, chunk_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+    # Server-side cursor: rows are fetched chunk_size at a time while the
+    # caller consumes them, so memory stays bounded for any roster size.
+    result = await db.stream(
+        select(models.Attendee.id, models.Attendee.name, models.Attendee.email, models.Attendee.event_id)
+        .where(models.Attendee.event_id == event_id)
+        .order_by(models.Attendee.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    async for partition in result.partitions():
+        yield partition
+
+# Registration stats
+
+async def get_event_stats(db: AsyncSession, event_id: int, user_tz: str = "UTC", hours: int = 24) -> Optional[dict]:
+    # The event's counter plus its hourly buckets for the last `hours` hours
+    # (oldest first, empty hours omitted): two primary-key lookups, whatever
+    # the number of attendees. None if the event does not exist.
+    event = (await db.execute(
+        select(models.Event.registered_count, models.Event.max_capacity).where(models.Event.id == event_id)
+    )).one_or_none()
+    if event is None:
+        return None
+    since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=hours - 1)
+    buckets = (await db.execute(
+        select(models.EventStatsHour.hour, models.EventStatsHour.registrations)
+        .where(models.EventStatsHour.event_id == event_id, models.EventStatsHour.hour >= since)
+        .order_by(models.EventStatsHour.hour)
+    )).all()
+    registered, max_capacity = event
+    hour_starts = timezones.get_converter(user_tz).isoformat_many([bucket.hour for bucket in buckets])
+    return {
+        "event_id": event_id,
+        "registered": registered,
+        "max_capacity": max_capacity,
+        "seats_remaining": max(0, max_capacity - registered),
+        "fill_percentage": round(100 * registered / max_capacity, 2) if max_capacity else 0.0,
+        "hours": hours,
+        "registrations_per_hour": [
+            {"hour": hour, "registrations": bucket.registrations}
+            for hour, bucket in zip(hour_starts, buckets)
+        ],
+    }
+
+async def rebuild_event_stats(db: AsyncSession, after_id: int = 0, max_events: int = 500) -> Optional[int]:
+    # Recomputes registered_count and the hourly buckets from the attendee
+    # rows for the next max_events events with id > after_id, in one
+    # transaction. Returns the last event id rebuilt, or None when there
+    # are no more. Attendees without registered_at count towards the total
+    # but not towards any hour.
+    event_ids = list(await db.scalars(
+        select(models.Event.id)
+        .where(models.Event.id > after_id)
+        .order_by(models.Event.id)
+        .limit(min(max_events, BATCH_CHUNK_SIZE))
+    ))
+    if not event_ids:
+        return None
+    await db.execute(
+        update(models.Event)
+        .where(models.Event.id.in_(event_ids))
+        .values(registered_count=select(func.count()).where(models.Attendee.event_id == models.Event.id).scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(delete(models.EventStatsHour).where(models.EventStatsHour.event_id.in_(event_ids)))
+    # Same text as the DateTime column stores, so rebuilt buckets and live
+    # ones compare and upsert alike.
+    hour = func.strftime("%Y-%m-%d %H:00:00.000000", models.Attendee.registered_at)
+    await db.execute(
+        insert(models.EventStatsHour).from_select(
+            ["event_id", "hour", "registrations"],
+            select(models.Attendee.event_id, hour, func.count())
+            .where(models.Attendee.event_id.in_(event_ids), models.Attendee.registered_at.is_not(None))
+            .group_by(models.Attendee.event_id, hour),
+        )
+    )
+    await db.commit()
+    if shared_seats is not None:
+        # Slots only grow; a repaired count may be lower.
+        shared_seats.forget(event_ids)
+    return event_ids[-1]
+
+# Idempotency records
+
+async def get_idempotency_record(db: AsyncSession, key: str, not_before: datetime) -> Optional[models.IdempotencyRecord]:
+    return await db.scalar(
+        select(models.IdempotencyRecord)
+        .where(models.IdempotencyRecord.key == key, models.IdempotencyRecord.created_at >= not_before)
+    )
+
+async def save_idempotency_record(db: AsyncSession, key: str, fingerprint: str, status_code: int, body: bytes, expired_before: datetime) -> None:
+    # First writer wins if two workers race on the same key; a record that
+    # expired but was not purged yet is replaced.
+    values = {"fingerprint": fingerprint, "status_code": status_code, "body": body, "created_at": datetime.utcnow()}
+    await db.execute(
+        sqlite_insert(models.IdempotencyRecord)
+        .values(key=key, **values)
+        .on_conflict_do_update(
+            index_elements=[models.IdempotencyRecord.key],
+            set_=values,
+            where=models.IdempotencyRecord.created_at < expired_before,
+        )
+    )
+    await db.commit()
+
+async def purge_idempotency_records(db: AsyncSession, before: datetime) -> int:
+    result = await db.execute(
+        delete(models.IdempotencyRecord)
+        .where(models.IdempotencyRecord.created_at < before)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+# Archive
+
+_EVENT_COLUMNS = ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count")
+_ATTENDEE_COLUMNS = ("id", "name", "email", "event_id", "registered_at")
+
+async def archive_ended_events(db: AsyncSession, ended_before: datetime, max_events: int = 500, max_rows: int = 5000) -> int:
+    # Moves events that ended before `ended_before`, oldest first, with their
+    # attendees into the archive tables in one short transaction. A batch
+    # stops at max_events events or, counting attendees, about max_rows rows
+    # (an event is never split). Returns the number of events moved.
+    # Set-based INSERT ... SELECT and DELETE do what the ORM's delete-orphan
+    # cascade would, without loading every attendee.
+    #
+    # SQLite hands out max(id) + 1 for new rows, so the events holding the
+    # newest event id and the newest attendee id stay put; archiving them
+    # would let a new row reuse an id that is already in the archive.
+    keep = {
+        await db.scalar(select(func.max(models.Event.id))),
+        await db.scalar(select(models.Attendee.event_id).where(models.Attendee.id == select(func.max(models.Attendee.id)).scalar_subquery())),
+    } - {None}
+    candidates = (await db.execute(
+        select(models.Event.id, models.Event.registered_count)
+        .where(models.Event.end_time < ended_before, models.Event.id.not_in(keep))
+        .order_by(models.Event.end_time)
+        .limit(min(max_events, BATCH_CHUNK_SIZE))
+    )).all()
+    event_ids, rows = [], 0
+    for event_id, registered in candidates:
+        if event_ids and rows + registered + 1 > max_rows:
+            break
+        event_ids.append(event_id)
+        rows += registered + 1
+    if not event_ids:
+        return 0
+    await db.execute(
+        insert(models.ArchivedEvent).from_select(
+            [*_EVENT_COLUMNS, "created_at", "archived_at"],
+            select(*(getattr(models.Event, name) for name in _EVENT_COLUMNS), models.Event.created_at, literal(datetime.utcnow(), DateTime))
+            .where(models.Event.id.in_(event_ids)),
+        )
+    )
+    await db.execute(
+        insert(models.ArchivedAttendee).from_select(
+            list(_ATTENDEE_COLUMNS),
+            select(*(getattr(models.Attendee, name) for name in _ATTENDEE_COLUMNS))
+            .where(models.Attendee.event_id.in_(event_ids)),
+        )
+    )
+    await db.execute(delete(models.Attendee).where(models.Attendee.event_id.in_(event_ids)).execution_options(synchronize_session=False))
+    await db.execute(delete(models.EventStatsHour).where(models.EventStatsHour.event_id.in_(event_ids)))
+    await db.execute(delete(models.Event).where(models.Event.id.in_(event_ids)).execution_options(synchronize_session=False))
+    await db.commit()
+    for event_id in event_ids:
+        ics_event_cache.invalidate(event_id)
+    if shared_seats is not None:
+        shared_seats.forget(event_ids)
+    return len(event_ids)
+
+async def get_archived_events(db: AsyncSession, user_tz: str = "UTC", skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None, include_total: bool = True) -> dict:
+    # Most recently ended first.
+    query = select(*(getattr(models.ArchivedEvent, name) for name in _EVENT_COLUMNS))
+    if after is not None:
+        # Keyset mode: resume after the (end_time, id) of the previous page.
+        query = query.where(tuple_(models.ArchivedEvent.end_time, models.ArchivedEvent.id) < after)
+        skip = 0
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.order_by(models.ArchivedEvent.end_time.desc(), models.ArchivedEvent.id.desc()).limit(limit + 1))
+    events = result.all()
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        if events:
+            next_cursor = encode_cursor(events[-1].end_time, events[-1].id)
+    total = None
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(models.ArchivedEvent))
+    event_list = _event_dicts(events, user_tz)
+    for item, event in zip(event_list, events):
+        item["registered_count"] = event.registered_count
+    return {
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "events": event_list
+    }
+
+async def get_archived_event(db: AsyncSession, event_id: int) -> Optional[models.ArchivedEvent]:
+    result = await db.execute(select(models.ArchivedEvent).where(models.ArchivedEvent.id == event_id))
+    return result.scalar_one_or_none()
+
+async def get_archived_attendees(db: AsyncSession, event_id: int, skip: int = 0, limit: int = 100, user_tz: str = "UTC", after: Optional[int] = None, include_total: bool = True) -> dict:
+    return await _attendee_page(db, models.ArchivedAttendee, models.ArchivedEvent, event_id, skip, limit, user_tz, after, include_total)
@@ -1,12 +1,46 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from .config import settings
+from .metrics import InstrumentedQueuePool, instrument_engine
 
-DATABASE_URL = "sqlite+aiosqlite:///./app/event_management.db"
+DATABASE_URL = settings.database_url
+READ_DATABASE_URL = settings.read_database_url or DATABASE_URL
 
-engine = create_async_engine(
-    DATABASE_URL, echo=True, future=True
-)
+def _is_memory_sqlite(url: str) -> bool:
+    return url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":"))
+
+def make_engine(url: str, read_only: bool = False):
+    kwargs = {}
+    if not _is_memory_sqlite(url):
+        # In-memory SQLite uses a single shared connection (StaticPool).
+        kwargs.update(pool_size=settings.pool_size, max_overflow=settings.max_overflow)
+        if settings.metrics_enabled:
+            kwargs["poolclass"] = InstrumentedQueuePool
+    engine = create_async_engine(url, echo=settings.echo, future=True, **kwargs)
+    if settings.metrics_enabled:
+        instrument_engine(engine, "read" if read_only else "write")
+    if url.startswith("sqlite"):
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            # WAL lets readers run alongside the single writer; NORMAL sync is
+            # durable across application crashes in WAL mode.
+            cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+            cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+            cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kib)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+            if read_only:
+                cursor.execute("PRAGMA query_only=ON")
+            cursor.close()
+    return engine
+
+engine = make_engine(DATABASE_URL)
+# A separate engine (and pool) for list endpoints. An in-memory database only
+# exists on its one connection, so it has to be shared.
+read_engine = engine if _is_memory_sqlite(READ_DATABASE_URL) else make_engine(READ_DATABASE_URL, read_only=True)
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -16,8 +50,20 @@ AsyncSessionLocal = sessionmaker(
     autocommit=False,
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False,
+    autocommit=False,
+)
+
 Base = declarative_base()
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        yield session
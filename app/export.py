@@ -0,0 +1,26 @@
+import csv
+import io
+import json
+from typing import Iterable, Sequence
+
+# Roster export encoders. Each call renders one chunk of rows; the event's
+# start/end times are converted by the caller once and reused for every row.
+
+ATTENDEE_EXPORT_FIELDS = ["id", "name", "email", "event_id", "event_start_time", "event_end_time"]
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(ATTENDEE_EXPORT_FIELDS)
+    return buffer.getvalue()
+
+def csv_chunk(rows: Iterable[Sequence], event_start_time: str, event_end_time: str) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows((*row, event_start_time, event_end_time) for row in rows)
+    return buffer.getvalue()
+
+def ndjson_chunk(rows: Iterable[Sequence], event_start_time: str, event_end_time: str) -> str:
+    return "".join(
+        json.dumps(dict(zip(ATTENDEE_EXPORT_FIELDS, (*row, event_start_time, event_end_time)))) + "\n"
+        for row in rows
+    )
@@ -0,0 +1,207 @@
+import asyncio
+import heapq
+import secrets
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .config import settings
+from .metrics import Collected, register
+
+# Time-limited seat holds. While an event has active holds, this process
+# keeps an in-memory ledger of its free seats, so holding, releasing and
+# direct registrations for a hot event are decided in memory (O(1)) and the
+# database only sees confirmed writes. A ledger is created from the event's
+# max_capacity - registered_count when its first hold is taken and dropped
+# once no holds or claims are left, so it never outlives the surge.
+#
+# The ledger is per process; the conditional UPDATE in
+# crud.register_attendee still guards capacity across processes, so a
+# confirm can come back "full" if other workers sold the seat.
+#
+# Expired holds are reclaimed from a heap ordered by expiry: by the sweeper
+# task, and lazily on every acquire, so expiry never scans all holds.
+
+class Hold(NamedTuple):
+    hold_id: str
+    event_id: int
+    expires_at: float  # on the ledger's clock
+
+class EventLedger:
+    __slots__ = ("free", "holds", "pending")
+
+    def __init__(self, free: int):
+        self.free = free
+        self.holds: Dict[str, Hold] = {}
+        # Seats claimed by registrations or confirms that are still writing.
+        self.pending = 0
+
+class SeatHolds:
+    def __init__(self, ttl: float = 120.0, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self.ledgers: Dict[int, EventLedger] = {}
+        self._heap: List[Tuple[float, str, int]] = []
+        self._loading: Dict[int, asyncio.Future] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # Holds
+
+    async def acquire(self, event_id: int, load_free_seats: Callable[[], Awaitable[Optional[int]]]) -> Union[Hold, None, bool]:
+        # Returns the new hold, None if the event does not exist, or False if
+        # it has no free seats. load_free_seats is only awaited when the
+        # event has no ledger yet.
+        self.expire()
+        ledger = self.ledgers.get(event_id)
+        if ledger is None:
+            free = await self._load(event_id, load_free_seats)
+            if free is None:
+                return None
+            # Another acquire may have created the ledger while we waited.
+            ledger = self.ledgers.get(event_id)
+            if ledger is None:
+                ledger = self.ledgers[event_id] = EventLedger(free)
+        if ledger.free <= 0:
+            self._drop_if_idle(event_id)
+            return False
+        ledger.free -= 1
+        hold = Hold(secrets.token_urlsafe(16), event_id, self._clock() + self.ttl)
+        ledger.holds[hold.hold_id] = hold
+        self._push(hold)
+        return hold
+
+    def take(self, event_id: int, hold_id: str) -> Optional[Hold]:
+        # Removes a live hold for confirmation; its seat stays claimed until
+        # the caller settles it (registered) or restores it (retry later).
+        ledger = self.ledgers.get(event_id)
+        hold = ledger.holds.get(hold_id) if ledger else None
+        if hold is None:
+            return None
+        del ledger.holds[hold_id]
+        if hold.expires_at <= self._clock():
+            ledger.free += 1
+            self._drop_if_idle(event_id)
+            return None
+        ledger.pending += 1
+        return hold
+
+    def restore(self, hold: Hold) -> None:
+        ledger = self.ledgers.get(hold.event_id)
+        if ledger is None:
+            return
+        ledger.pending -= 1
+        ledger.holds[hold.hold_id] = hold
+        self._push(hold)
+
+    def release(self, event_id: int, hold_id: str) -> bool:
+        ledger = self.ledgers.get(event_id)
+        if ledger is None or ledger.holds.pop(hold_id, None) is None:
+            return False
+        ledger.free += 1
+        self._drop_if_idle(event_id)
+        return True
+
+    # Registrations that bypass holds
+
+    def claim(self, event_id: int, seats: int = 1) -> Optional[int]:
+        # Claims up to `seats` free seats for a direct registration. None
+        # means the event has no ledger and the database decides alone.
+        ledger = self.ledgers.get(event_id)
+        if ledger is None:
+            return None
+        claimed = max(0, min(seats, ledger.free))
+        ledger.free -= claimed
+        ledger.pending += claimed
+        return claimed
+
+    def settle(self, event_id: int, used: int, claimed: int = 1) -> None:
+        # Ends a claim (or a taken hold): `used` seats were registered, the
+        # rest go back to the ledger.
+        ledger = self.ledgers.get(event_id)
+        if ledger is None:
+            return
+        ledger.pending -= claimed
+        ledger.free += claimed - used
+        self._drop_if_idle(event_id)
+
+    # Expiry
+
+    def expire(self) -> int:
+        now = self._clock()
+        expired = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, hold_id, event_id = heapq.heappop(self._heap)
+            ledger = self.ledgers.get(event_id)
+            hold = ledger.holds.get(hold_id) if ledger else None
+            # Skip entries for holds already confirmed or released, and the
+            # duplicate entry left behind by restore().
+            if hold is None or hold.expires_at != expires_at:
+                continue
+            del ledger.holds[hold_id]
+            ledger.free += 1
+            self._drop_if_idle(event_id)
+            expired += 1
+        return expired
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._sweep())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sweep(self) -> None:
+        while True:
+            self.expire()
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - self._clock() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def active_holds(self) -> int:
+        return sum(len(ledger.holds) for ledger in self.ledgers.values())
+
+    # Internals
+
+    def _push(self, hold: Hold) -> None:
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (hold.expires_at, hold.hold_id, hold.event_id))
+        # Wake the sweeper if this hold now expires first.
+        if self._wakeup is not None and (earliest is None or hold.expires_at < earliest):
+            self._wakeup.set()
+
+    def _drop_if_idle(self, event_id: int) -> None:
+        ledger = self.ledgers.get(event_id)
+        if ledger is not None and not ledger.holds and ledger.pending == 0:
+            del self.ledgers[event_id]
+
+    async def _load(self, event_id: int, load_free_seats) -> Optional[int]:
+        # Concurrent first holds for an event share one database read.
+        future = self._loading.get(event_id)
+        if future is not None:
+            return await asyncio.shield(future)
+        future = self._loading[event_id] = asyncio.get_running_loop().create_future()
+        try:
+            free = await load_free_seats()
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+        else:
+            future.set_result(free)
+            return free
+        finally:
+            del self._loading[event_id]
+
+seat_holds = SeatHolds(ttl=settings.hold_ttl_seconds)
+
+register(Collected("seat_holds_active", "Seat holds not yet confirmed, released or expired.", (), lambda: {(): seat_holds.active_holds()}))
@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, NamedTuple
+
+# iCalendar (RFC 5545) encoding for the calendar feeds (GET /events.ics and
+# /events/{id}.ics). Each event renders to one VEVENT block, encoded once
+# and cached by event id (cache.ics_event_cache); a feed is the calendar
+# header, the blocks and the footer joined as bytes.
+#
+# The output depends only on the event's row, so every worker renders the
+# same bytes and the same ETag. That is why DTSTAMP is the event's
+# created_at (events are never edited, so it is also when the row last
+# changed) rather than the render time.
+
+CRLF = b"\r\n"
+MAX_LINE_OCTETS = 75
+PRODID = "-//Event Management System//Events//EN"
+UID_DOMAIN = "event-management-system"
+# DTSTAMP for rows without created_at (inserted outside the app); a
+# constant, so their ETags still agree across workers.
+UNKNOWN_DTSTAMP = "19700101T000000Z"
+
+CALENDAR_HEADER = b"".join(line.encode() + CRLF for line in (
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    f"PRODID:{PRODID}",
+    "CALSCALE:GREGORIAN",
+))
+CALENDAR_FOOTER = b"END:VCALENDAR" + CRLF
+
+class RenderedEvent(NamedTuple):
+    vevent: bytes
+    etag: str  # of the single-event calendar
+    last_modified: str
+
+def escape_text(value: str) -> str:
+    # TEXT values (section 3.3.11): backslash first, then the separators,
+    # and line breaks as a literal \n.
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+def fold(line: str) -> bytes:
+    # Content lines are at most 75 octets; longer ones continue on lines
+    # starting with a space (section 3.1). Cuts never split a UTF-8
+    # sequence.
+    data = line.encode()
+    if len(data) <= MAX_LINE_OCTETS:
+        return data + CRLF
+    parts = []
+    start, limit = 0, MAX_LINE_OCTETS
+    while len(data) - start > limit:
+        end = start + limit
+        while data[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(data[start:end])
+        start, limit = end, MAX_LINE_OCTETS - 1  # the leading space counts
+    parts.append(data[start:])
+    return (CRLF + b" ").join(parts) + CRLF
+
+def format_utc(value: datetime) -> str:
+    # Stored times are naive UTC; seconds precision in UTC form.
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+def render_event(event) -> bytes:
+    # `event` is anything with id, name, location, start_time, end_time and
+    # created_at.
+    dtstamp = format_utc(event.created_at) if event.created_at is not None else UNKNOWN_DTSTAMP
+    return b"".join(fold(line) for line in (
+        "BEGIN:VEVENT",
+        f"UID:event-{event.id}@{UID_DOMAIN}",
+        f"DTSTAMP:{dtstamp}",
+        f"DTSTART:{format_utc(event.start_time)}",
+        f"DTEND:{format_utc(event.end_time)}",
+        f"SUMMARY:{escape_text(event.name)}",
+        f"LOCATION:{escape_text(event.location)}",
+        "END:VEVENT",
+    ))
+
+def calendar(vevents: Iterable[bytes]) -> bytes:
+    return CALENDAR_HEADER + b"".join(vevents) + CALENDAR_FOOTER
+
+def etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, NamedTuple, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+from . import crud
+from .cache import TTLCache
+from .config import settings
+from .database import AsyncSessionLocal
+
+# Idempotency-Key support for write endpoints. The first request with a key
+# runs normally and its response (anything below 500, including 4xx
+# business errors, but not a 429 asking to retry) is stored under
+# (endpoint, key); retries get the stored bytes back without touching the
+# write path, and concurrent requests with the same key wait for the one in
+# flight instead of racing it. Reusing a key for a different request body
+# is rejected.
+#
+# Responses live in an in-memory LRU + TTL cache; with IDEMPOTENCY_PERSISTENT
+# they are also written to the idempotency_keys table, so they survive
+# restarts and are shared between workers.
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+REPLAY_HEADER = "Idempotent-Replayed"
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    status_code: int
+    body: bytes
+
+class IdempotencyStore:
+    def __init__(self, cache: TTLCache, session_factory=None):
+        self.cache = cache
+        # Set to persist responses in the idempotency_keys table.
+        self.session_factory = session_factory
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def run(self, key: str, scope: str, fingerprint: str, execute: Callable[[], Awaitable[Response]]) -> Response:
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters.")
+        store_key = f"{scope} {key}"
+        while True:
+            stored = self.cache.get(store_key)
+            if stored is None:
+                stored = await self._load(store_key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request.")
+                return Response(stored.body, status_code=stored.status_code, media_type="application/json", headers={REPLAY_HEADER: "true"})
+            in_flight = self._in_flight.get(store_key)
+            if in_flight is None:
+                break
+            # Another request with this key is running; replay its result
+            # (or, if it failed with a 5xx or 429, take over).
+            await asyncio.shield(in_flight)
+        future = self._in_flight[store_key] = asyncio.get_running_loop().create_future()
+        try:
+            try:
+                response = await execute()
+            except HTTPException as exc:
+                response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+            if response.status_code < 500 and response.status_code != 429:
+                stored = StoredResponse(fingerprint, response.status_code, bytes(response.body))
+                self.cache.set(store_key, stored)
+                await self._save(store_key, stored)
+            return response
+        finally:
+            del self._in_flight[store_key]
+            future.set_result(None)
+
+    async def _load(self, store_key: str) -> Optional[StoredResponse]:
+        if self.session_factory is None:
+            return None
+        async with self.session_factory() as db:
+            record = await crud.get_idempotency_record(db, store_key, not_before=datetime.utcnow() - timedelta(seconds=self.cache.ttl))
+        if record is None:
+            return None
+        stored = StoredResponse(record.fingerprint, record.status_code, record.body)
+        self.cache.set(store_key, stored)
+        return stored
+
+    async def _save(self, store_key: str, stored: StoredResponse) -> None:
+        if self.session_factory is None:
+            return
+        try:
+            async with self.session_factory() as db:
+                await crud.save_idempotency_record(
+                    db, store_key, stored.fingerprint, stored.status_code, stored.body,
+                    expired_before=datetime.utcnow() - timedelta(seconds=self.cache.ttl),
+                )
+        except Exception:
+            # The write itself succeeded; a retry after a restart would just
+            # run again, as it would without a key.
+            logger.exception("Could not persist idempotent response for %r", store_key)
+
+    async def purge_expired(self) -> int:
+        if self.session_factory is None:
+            return 0
+        async with self.session_factory() as db:
+            return await crud.purge_idempotency_records(db, before=datetime.utcnow() - timedelta(seconds=self.cache.ttl))
+
+async def render(model, result: Awaitable, status_code: int = 200) -> JSONResponse:
+    # The bytes FastAPI would send for `result` under response_model=model.
+    return JSONResponse(jsonable_encoder(model.model_validate(await result, from_attributes=True)), status_code=status_code)
+
+idempotency_store = IdempotencyStore(
+    TTLCache("idempotency", maxsize=settings.idempotency_cache_size, ttl=settings.idempotency_ttl_seconds),
+    session_factory=AsyncSessionLocal if settings.idempotency_persistent else None,
+)
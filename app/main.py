@@ -1,14 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 # from .database import Base, engine
-from .api import events
+from .api import archive as archive_api, events
+from .archive import archiver
+from .cache import CACHES
+from .config import settings
+from .holds import seat_holds
+from .idempotency import idempotency_store
+from .metrics import MetricsMiddleware, render_metrics
+from .writer import registration_writer
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.write_batching:
+        await registration_writer.start()
+    await seat_holds.start()
+    # Persisted idempotent responses past their TTL are never replayed.
+    await idempotency_store.purge_expired()
+    if settings.archive_enabled:
+        await archiver.start()
+    yield
+    await archiver.stop()
+    await seat_holds.stop()
+    await registration_writer.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # Create tables
 # Base.metadata.create_all(bind=engine)
 
 app.include_router(events.router)
+app.include_router(archive_api.router)
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, debug_headers=settings.debug_headers)
 
 @app.get("/")
 def root():
     return {"message": "Event Management System API is up!"}
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
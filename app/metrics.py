@@ -0,0 +1,227 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .cache import CACHES
+
+# Process-local performance metrics, rendered in the Prometheus text format
+# at GET /metrics:
+#   - MetricsMiddleware times every request by route template;
+#   - instrument_engine() counts SQL statements and database time, both
+#     globally and for the request in flight (see RequestStats);
+#   - InstrumentedQueuePool records how long sessions wait for a pooled
+#     connection.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labels, labels)} {count}"
+
+class Collected:
+    # Sampled at render time from a callback returning {labels: value}; used
+    # to export state other modules already keep (e.g. cache counters).
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], collect: Callable[[], Dict[Tuple[str, ...], float]], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.kind = kind
+        self._collect = collect
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in sorted(self._collect().items()):
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+
+REGISTRY: List = []
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+REQUEST_LATENCY = register(Histogram("http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")))
+REQUEST_DB_STATEMENTS = register(Counter("http_request_db_statements_total", "SQL statements executed while serving requests, by route.", ("method", "route")))
+REQUEST_DB_TIME = register(Counter("http_request_db_seconds_total", "Time spent executing SQL while serving requests, by route.", ("method", "route")))
+DB_STATEMENTS = register(Counter("db_statements_total", "SQL statements executed, by engine.", ("engine",)))
+DB_TIME = register(Histogram("db_statement_duration_seconds", "SQL statement execution time, by engine.", ("engine",)))
+POOL_CHECKOUT_WAIT = register(Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection, by engine.", ("engine",)))
+
+def _cache_stat(field: str) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    return lambda: {(name,): cache.stats()[field] for name, cache in CACHES.items()}
+
+register(Collected("cache_entries", "Entries held by each in-process cache.", ("cache",), _cache_stat("size")))
+register(Collected("cache_hits_total", "Cache hits.", ("cache",), _cache_stat("hits"), kind="counter"))
+register(Collected("cache_misses_total", "Cache misses.", ("cache",), _cache_stat("misses"), kind="counter"))
+register(Collected("cache_evictions_total", "Entries evicted to stay within maxsize.", ("cache",), _cache_stat("evictions"), kind="counter"))
+register(Collected("cache_expirations_total", "Entries dropped after their TTL.", ("cache",), _cache_stat("expirations"), kind="counter"))
+
+# Per-request accounting
+
+class RequestStats:
+    __slots__ = ("statements", "db_time")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def instrument_engine(engine, name: str) -> None:
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        pool.metrics_name = name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_start"].pop()
+        DB_STATEMENTS.inc(1, name)
+        DB_TIME.observe(elapsed, name)
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.db_time += elapsed
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        # Keep the timing stack balanced when a statement fails.
+        starts = context.connection.info.get("metrics_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # Times connection checkout, which includes waiting for a free pooled
+    # connection when the pool is exhausted.
+    metrics_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, self.metrics_name)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+class MetricsMiddleware:
+    def __init__(self, app, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.debug_headers:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-statements", str(stats.statements).encode()))
+                    headers.append((b"x-db-time-ms", f"{stats.db_time * 1000:.3f}".encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = scope.get("route")
+            # Label by route template, not raw path, to bound cardinality.
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            REQUEST_LATENCY.observe(elapsed, method, route_label, str(status_code))
+            REQUEST_DB_STATEMENTS.inc(stats.statements, method, route_label)
+            REQUEST_DB_TIME.inc(stats.db_time, method, route_label)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import DDL, Column, Integer, LargeBinary, String, DateTime, ForeignKey, Index, UniqueConstraint, event, func
 from sqlalchemy.orm import relationship
 from .database import Base
 import datetime
@@ -12,13 +12,33 @@ class Event(Base):
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False)
     max_capacity = Column(Integer, nullable=False)
+    registered_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Naive UTC. Events are never edited, so this is also when the row last
+    # changed (the calendar feeds' DTSTAMP); null only for rows inserted
+    # outside the app.
+    created_at = Column(DateTime, nullable=True, default=datetime.datetime.utcnow)
 
     attendees = relationship("Attendee", back_populates="event", cascade="all, delete-orphan")
 
     __table_args__ = (
         UniqueConstraint('name', name='uix_event_name'),
+        # Serves the upcoming-events listing (order by start_time, id), walked
+        # in order with end_time > now checked from the index, so a page never
+        # sorts every upcoming event.
+        Index('ix_events_start_time_id_end_time', 'start_time', 'id', 'end_time'),
+        # Serves the upcoming count and next_event_end (filter end_time > now).
+        Index('ix_events_end_time_start_time_id', 'end_time', 'start_time', 'id'),
+        # Time-window and location queries (GET /events?from=&to=&location=,
+        # GET /events/calendar) range-scan start_time; see crud._event_window().
+        Index('ix_events_start_time_end_time', 'start_time', 'end_time'),
+        Index('ix_events_location_start_time_end_time', 'location', 'start_time', 'end_time'),
     )
 
+# Event length in days. Indexed so MAX() over it is a single index lookup;
+# queries must use this exact expression to hit the index.
+event_duration_days = func.julianday(Event.end_time) - func.julianday(Event.start_time)
+Index('ix_events_duration', event_duration_days)
+
 class Attendee(Base):
     __tablename__ = "attendees"
 
@@ -26,9 +46,95 @@ class Attendee(Base):
     name = Column(String, nullable=False)
     email = Column(String, nullable=False)
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    # Naive UTC; null for rows registered before it was recorded.
+    registered_at = Column(DateTime, nullable=True)
 
     event = relationship("Event", back_populates="attendees")
 
     __table_args__ = (
         UniqueConstraint('event_id', 'email', name='uix_event_email'),
+        # Serves the per-event attendee listing (filter event_id, order by id).
+        Index('ix_attendees_event_id_id', 'event_id', 'id'),
+        # Serves the per-email registrations lookup (filter email, order by
+        # event_id); uix_event_email leads with event_id and cannot.
+        Index('ix_attendees_email_event_id', 'email', 'event_id'),
+    )
+
+class EventStatsHour(Base):
+    # Registrations per event per UTC hour (GET /events/{id}/stats). Written
+    # by crud's registration paths in the same transaction as the attendee
+    # rows and events.registered_count, which is the running total; rebuilt
+    # from attendees.registered_at by `python -m app.stats`. Stored without
+    # a rowid, so an event's buckets are one contiguous primary-key range.
+    __tablename__ = "event_stats_hourly"
+
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    hour = Column(DateTime, primary_key=True)
+    registrations = Column(Integer, nullable=False)
+
+    __table_args__ = {"sqlite_with_rowid": False}
+
+# Ended events and their attendees, moved out of the hot tables by
+# app/archive.py. Rows keep their original ids; archived_at records the move.
+
+class ArchivedEvent(Base):
+    __tablename__ = "events_archive"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    location = Column(String, nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    max_capacity = Column(Integer, nullable=False)
+    registered_count = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Serves the archive listing (most recently ended first).
+        Index('ix_events_archive_end_time_id', 'end_time', 'id'),
     )
+
+class ArchivedAttendee(Base):
+    __tablename__ = "attendees_archive"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    email = Column(String, nullable=False)
+    event_id = Column(Integer, ForeignKey("events_archive.id"), nullable=False)
+    registered_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_attendees_archive_event_id_id', 'event_id', 'id'),
+    )
+
+class IdempotencyRecord(Base):
+    # Stored responses for Idempotency-Key retries (IDEMPOTENCY_PERSISTENT).
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)  # "<endpoint> <Idempotency-Key>"
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow, index=True)
+
+# Full-text index over event names and locations (GET /events/search). An
+# external-content FTS5 table stores only the index; triggers keep it in step
+# with events, and only fire when name or location change, so registration
+# counter updates do not touch it. Created by migration da12b4995dbc and,
+# for create_all() (tests, benchmarks), by the listeners below.
+EVENTS_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+    "name, location, content='events', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_insert AFTER INSERT ON events BEGIN "
+    "INSERT INTO events_fts(rowid, name, location) VALUES (new.id, new.name, new.location); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_delete AFTER DELETE ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, name, location) VALUES ('delete', old.id, old.name, old.location); END",
+    "CREATE TRIGGER IF NOT EXISTS events_fts_update AFTER UPDATE OF name, location ON events BEGIN "
+    "INSERT INTO events_fts(events_fts, rowid, name, location) VALUES ('delete', old.id, old.name, old.location); "
+    "INSERT INTO events_fts(rowid, name, location) VALUES (new.id, new.name, new.location); END",
+]
+
+for _statement in EVENTS_FTS_DDL:
+    event.listen(Event.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Event.__table__, "before_drop", DDL("DROP TABLE IF EXISTS events_fts").execute_if(dialect="sqlite"))
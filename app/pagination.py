@@ -0,0 +1,49 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Tuple
+
+# Opaque keyset cursors. A cursor carries the sort key of the last row of a
+# page; the next page resumes strictly after it instead of OFFSET-scanning.
+
+# Largest `limit` a listing endpoint accepts.
+MAX_PAGE_SIZE = 1000
+
+def encode_cursor(*values: Any) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode(cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+def decode_event_cursor(cursor: str) -> Tuple[datetime, int]:
+    values = _decode(cursor)
+    if len(values) != 2 or not isinstance(values[0], str) or type(values[1]) is not int:
+        raise ValueError("Invalid cursor")
+    try:
+        return datetime.fromisoformat(values[0]), values[1]
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def decode_attendee_cursor(cursor: str) -> int:
+    values = _decode(cursor)
+    if len(values) != 1 or type(values[0]) is not int:
+        raise ValueError("Invalid cursor")
+    return values[0]
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int, str]:
+    # (rank, id) of the last row, and the search corpus version it was
+    # ranked against (see crud.search_events).
+    values = _decode(cursor)
+    if (len(values) != 3 or type(values[0]) not in (int, float) or type(values[1]) is not int
+            or not isinstance(values[2], str)):
+        raise ValueError("Invalid cursor")
+    return float(values[0]), values[1], values[2]
@@ -1,9 +1,11 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from pydantic import BaseModel, Field, PlainValidator, WithJsonSchema, field_validator, model_validator
+from pydantic.networks import validate_email
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-import pytz
-from pytz import all_timezones
+from functools import lru_cache
+from typing import Annotated, List, Optional, Dict, Any
+import re
 from fastapi import HTTPException
+from .timezones import is_valid_timezone, to_utc
 
 class EventBase(BaseModel):
     name: str = Field(...)
@@ -23,20 +25,17 @@ class EventCreate(EventBase):
 
     @model_validator(mode="after")
     def validate_timezone(self):
-        if self.timezone not in all_timezones:
+        if not is_valid_timezone(self.timezone):
             raise HTTPException(status_code=400, detail=f"Invalid timezone: {self.timezone}")
         return self
 
     @model_validator(mode="after")
-    def convert_times_to_ist(self):
+    def convert_times_to_utc(self):
+        # Naive times are wall-clock times in `timezone`; everything is
+        # stored as naive UTC.
         tzname = self.timezone or "Asia/Kolkata"
-        tz = pytz.timezone(tzname)
         for attr in ["start_time", "end_time"]:
-            dt = getattr(self, attr)
-            if dt.tzinfo is None:
-                dt = tz.localize(dt)
-            dt_ist = dt.astimezone(tz).replace(tzinfo=None)
-            setattr(self, attr, dt_ist)
+            setattr(self, attr, to_utc(getattr(self, attr), tzname))
         return self
 
     @model_validator(mode="after")
@@ -45,7 +44,7 @@ class EventCreate(EventBase):
             raise HTTPException(status_code=400, detail="start_time must be before end_time")
         if self.max_capacity is not None and self.max_capacity <= 0:
             raise HTTPException(status_code=400, detail="max_capacity must be greater than 0")
-        if self.start_time < datetime.now():
+        if self.start_time < datetime.utcnow():
             raise HTTPException(status_code=400, detail="start_time cant be in past.")
         return self
 
@@ -55,11 +54,46 @@ class EventOut(EventBase):
         orm_mode = True
 
 class EventPagination(BaseModel):
-    total: int
+    total: Optional[int]
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
     events: List[Dict[str, Any]]
 
+class ArchivedEventOut(EventBase):
+    id: int
+    registered_count: int
+    archived_at: datetime
+    class Config:
+        orm_mode = True
+
+class CalendarDay(BaseModel):
+    date: str
+    count: int
+
+class EventCalendar(BaseModel):
+    timezone: str
+    location: Optional[str] = None
+    days: List[CalendarDay]
+
+# Plain ASCII dot-atom local parts, which email-validator accepts unchanged.
+_SIMPLE_LOCAL_PART = re.compile(r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*")
+
+@lru_cache(maxsize=1024)
+def _normalized_email_domain(domain: str) -> str:
+    return validate_email(f"probe@{domain}")[1].rpartition("@")[2]
+
+def _validate_email(value: Any) -> str:
+    # Same result as EmailStr, but domain checks (the expensive part) are
+    # cached, so bulk imports where most rows share a domain stay cheap.
+    if isinstance(value, str) and value.isascii() and len(value) <= 254:
+        local, sep, domain = value.rpartition("@")
+        if sep and len(local) <= 64 and _SIMPLE_LOCAL_PART.fullmatch(local):
+            return f"{local}@{_normalized_email_domain(domain)}"
+    return validate_email(value)[1]
+
+EmailStr = Annotated[str, PlainValidator(_validate_email), WithJsonSchema({"type": "string", "format": "email"})]
+
 class AttendeeBase(BaseModel):
     name: str
     email: EmailStr
@@ -79,7 +113,65 @@ class AttendeeOut(AttendeeBase):
         orm_mode = True
 
 class AttendeePagination(BaseModel):
-    total: int
+    total: Optional[int]
     skip: int
     limit: int
+    next_cursor: Optional[str] = None
     attendees: List[Dict[str, Any]]
+
+class RegistrationPagination(BaseModel):
+    email: str
+    total: Optional[int]
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+    events: List[Dict[str, Any]]
+
+class BulkRegistrationItem(BaseModel):
+    index: int
+    email: str
+    status: str  # "created", "duplicate" or "full"
+    id: Optional[int] = None
+
+class BulkRegistrationResult(BaseModel):
+    event_id: int
+    created: int
+    duplicates: int
+    full: int
+    results: List[BulkRegistrationItem]
+
+class BulkEventItem(BaseModel):
+    index: int
+    name: str
+    status: str  # "created" or "duplicate"
+    id: Optional[int] = None
+
+class BulkEventResult(BaseModel):
+    created: int
+    duplicates: int
+    results: List[BulkEventItem]
+
+class AvailabilityOut(BaseModel):
+    event_id: int
+    registered: int
+    max_capacity: int
+    seats_left: int
+
+class HourlyRegistrations(BaseModel):
+    hour: str  # start of the hour, in the requested timezone
+    registrations: int
+
+class EventStats(BaseModel):
+    event_id: int
+    registered: int
+    max_capacity: int
+    seats_remaining: int
+    fill_percentage: float
+    hours: int
+    registrations_per_hour: List[HourlyRegistrations]
+
+class HoldOut(BaseModel):
+    hold_id: str
+    event_id: int
+    expires_at: str
+    expires_in: float  # seconds
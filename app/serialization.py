@@ -0,0 +1,19 @@
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# One-pass JSON rendering for list responses. The CRUD layer already builds
+# plain dicts of JSON-native values (times are pre-formatted strings), so
+# they are encoded directly instead of being re-validated into a response
+# model and walked again by jsonable_encoder. The bytes are exactly what
+# JSONResponse would produce: compact separators, UTF-8 without escaping
+# non-ASCII. orjson is used when installed, stdlib json otherwise.
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
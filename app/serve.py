@@ -0,0 +1,59 @@
+import argparse
+import os
+import sys
+import tempfile
+
+import uvicorn
+
+from .config import settings
+
+# Runs the API in several worker processes on one port, all on the same
+# SQLite database:
+#
+#     python -m app.serve --workers 4 --port 8000
+#
+# One process runs the async app on a single core; validation and response
+# building saturate it long before SQLite does. uvicorn's supervisor starts
+# the workers and shares the listening socket; this launcher first creates
+# the shared seat table (app/shared_seats.py) they all map, and splits the
+# admission limits between them, since SQLite still has one writer however
+# many processes there are.
+#
+# Still per worker: seat holds, idempotency replays (set
+# IDEMPOTENCY_PERSISTENT=true to share them through the database) and
+# availability stream fan-out.
+
+def _shared_seats_file() -> str:
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    fd, path = tempfile.mkstemp(prefix="event-seats-", suffix=".bin", dir=directory)
+    os.close(fd)
+    return path
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the API from several worker processes sharing one SQLite database.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    if ":memory:" in settings.database_url:
+        sys.exit("app.serve needs a file database; workers cannot share an in-memory one.")
+    workers = max(1, args.workers)
+
+    # Workers import the app afresh and read their settings from the
+    # environment, so everything is handed over there.
+    for name in ("admission_max_concurrency", "admission_event_concurrency"):
+        os.environ.setdefault(name.upper(), str(max(1, getattr(settings, name) // workers)))
+    if workers == 1:
+        # One process needs no shared table.
+        uvicorn.run("app.main:app", host=args.host, port=args.port, log_level=args.log_level)
+        return
+    path = _shared_seats_file()
+    os.environ["SHARED_SEATS_PATH"] = path
+    try:
+        uvicorn.run("app.main:app", host=args.host, port=args.port, workers=workers, log_level=args.log_level)
+    finally:
+        os.unlink(path)
+
+if __name__ == "__main__":
+    main()
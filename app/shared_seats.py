@@ -0,0 +1,118 @@
+import ctypes
+import fcntl
+import mmap
+import os
+from typing import Iterable, Optional, Tuple
+
+from .config import settings
+from .metrics import Counter, register
+
+# Seat counts shared by the worker processes of `python -m app.serve`. The
+# launcher creates a file (in /dev/shm where available) and every worker
+# maps it; slot N holds event N's last committed registered_count and
+# max_capacity, packed into one 64-bit word (0 = not known yet). Workers
+# write a slot right after a registration commits (see
+# availability._publish_staged), so from then on every worker can refuse
+# registrations for a full event and report availability without a query.
+#
+# Counts only grow (there are no cancellations), so a write keeps the
+# larger count and a slot can lag the database but never run ahead of it:
+# a slot that says "full" is right, and one that says "seats left" only
+# sends the request on to the database, which decides. Writes take an
+# fcntl lock on their slot; reads take none, as an aligned 8-byte load sees
+# either the old or the new word. Events beyond the table's slots are simply
+# not tracked.
+#
+# Slot 0 (event ids start at 1) counts event creations, so a worker can
+# tell that its cached /events pages are out of date.
+
+SLOT_SIZE = 8
+_REGISTERED_MASK = (1 << 32) - 1
+_MAX_CAPACITY = (1 << 31) - 1
+_EVENTS_GENERATION = 0
+
+SHARED_HITS = register(Counter(
+    "shared_seats_answered_total", "Registrations refused or availability answered from the shared seat table.", ("kind",),
+))
+
+class SharedSeats:
+    def __init__(self, path: str, slots: int = 1 << 20):
+        self.path = path
+        self.slots = slots
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < slots * SLOT_SIZE:
+            os.ftruncate(self._fd, slots * SLOT_SIZE)
+        self._map = mmap.mmap(self._fd, slots * SLOT_SIZE)
+        self._words = (ctypes.c_int64 * slots).from_buffer(self._map)
+        self._seen_generation = self._words[_EVENTS_GENERATION]
+
+    # Seat counts
+
+    def get(self, event_id: int) -> Optional[Tuple[int, int]]:
+        # (registered, max_capacity) as last committed, or None if unknown.
+        if not 0 < event_id < self.slots:
+            return None
+        word = self._words[event_id]
+        if not word:
+            return None
+        return word & _REGISTERED_MASK, word >> 32
+
+    def is_full(self, event_id: int) -> bool:
+        seats = self.get(event_id)
+        return seats is not None and seats[0] >= seats[1]
+
+    def record(self, event_id: int, registered: int, max_capacity: int) -> None:
+        if not 0 < event_id < self.slots or not 0 < max_capacity <= _MAX_CAPACITY:
+            return
+        with self._locked(event_id):
+            word = self._words[event_id]
+            if not word or word & _REGISTERED_MASK < registered:
+                self._words[event_id] = max_capacity << 32 | registered
+
+    def forget(self, event_ids: Iterable[int]) -> None:
+        # For events that no longer exist (archived).
+        for event_id in event_ids:
+            if 0 < event_id < self.slots:
+                with self._locked(event_id):
+                    self._words[event_id] = 0
+
+    # Event listings
+
+    def note_events_changed(self) -> None:
+        with self._locked(_EVENTS_GENERATION):
+            self._words[_EVENTS_GENERATION] += 1
+        self._seen_generation = self._words[_EVENTS_GENERATION]
+
+    def events_changed(self) -> bool:
+        # True once per change made by any worker since the last call.
+        generation = self._words[_EVENTS_GENERATION]
+        if generation == self._seen_generation:
+            return False
+        self._seen_generation = generation
+        return True
+
+    def close(self) -> None:
+        del self._words
+        self._map.close()
+        os.close(self._fd)
+
+    def _locked(self, slot: int):
+        return _SlotLock(self._fd, slot * SLOT_SIZE)
+
+class _SlotLock:
+    __slots__ = ("fd", "offset")
+
+    def __init__(self, fd: int, offset: int):
+        self.fd = fd
+        self.offset = offset
+
+    def __enter__(self):
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, SLOT_SIZE, self.offset)
+
+    def __exit__(self, *exc):
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, SLOT_SIZE, self.offset)
+
+# Only set up in workers started by app.serve (SHARED_SEATS_PATH).
+shared_seats: Optional[SharedSeats] = (
+    SharedSeats(settings.shared_seats_path, settings.shared_seats_slots) if settings.shared_seats_path else None
+)
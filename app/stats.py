@@ -0,0 +1,47 @@
+import argparse
+import asyncio
+
+from . import crud
+from .database import AsyncSessionLocal, engine
+
+# Recomputes the registration rollup (events.registered_count and
+# event_stats_hourly, see models.EventStatsHour) from the attendee rows, for
+# repair after manual edits or a restore:
+#
+#     python -m app.stats --rebuild
+#
+# Registrations keep the rollup current on their own; this is never needed
+# in normal operation. Each batch of events is one short transaction
+# (crud.rebuild_event_stats), so it can run next to live traffic.
+
+async def rebuild(session_factory, batch_events: int = 500, pause: float = 0.05) -> int:
+    # Rebuilds every event, batch by batch; returns the number of batches.
+    after_id, batches = 0, 0
+    while True:
+        async with session_factory() as db:
+            last = await crud.rebuild_event_stats(db, after_id=after_id, max_events=batch_events)
+        if last is None:
+            return batches
+        after_id = last
+        batches += 1
+        await asyncio.sleep(pause)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain the per-event registration statistics.")
+    parser.add_argument("--rebuild", action="store_true", help="recompute counters and hourly buckets from the attendees table")
+    parser.add_argument("--batch-events", type=int, default=500)
+    parser.add_argument("--pause-ms", type=float, default=50, help="sleep between batches")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("nothing to do; pass --rebuild")
+
+    async def run() -> int:
+        try:
+            return await rebuild(AsyncSessionLocal, batch_events=args.batch_events, pause=args.pause_ms / 1000)
+        finally:
+            await engine.dispose()
+
+    print(f"Rebuilt registration stats in {asyncio.run(run())} batches")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.admission import AdmissionControl
+
+
+@pytest.mark.asyncio
+async def test_per_event_limit_leaves_room_for_other_events():
+    control = AdmissionControl(max_concurrency=3, event_concurrency=2, queue_size=10, queue_timeout=1)
+    assert await control.acquire(1)
+    assert await control.acquire(1)
+    hot = asyncio.create_task(control.acquire(1))  # over the per-event limit
+    await asyncio.sleep(0)
+    assert not hot.done() and control.waiting() == 1
+    assert await control.acquire(2)  # other events are not stuck behind it
+    other = asyncio.create_task(control.acquire(3))  # over the global limit
+    await asyncio.sleep(0)
+    control.release(2)
+    assert await other is True
+    assert not hot.done()
+    control.release(1)
+    assert await hot is True
+    assert control.in_flight == 3
+    for event_id in (1, 1, 3):
+        control.release(event_id)
+    assert control.in_flight == 0 and control.in_flight_by_event == {}
+
+
+@pytest.mark.asyncio
+async def test_overflow_is_shed():
+    control = AdmissionControl(max_concurrency=1, event_concurrency=1, queue_size=1, queue_timeout=0.01)
+    assert await control.acquire(1)
+    queued = asyncio.create_task(control.acquire(1))
+    await asyncio.sleep(0)
+    assert await control.acquire(1) is False  # queue full
+    assert await queued is False  # waited too long
+    assert control.waiting() == 0
+    control.release(1)
+    assert await control.acquire(1)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_back_its_slot():
+    control = AdmissionControl(max_concurrency=1, event_concurrency=1, queue_size=5, queue_timeout=1)
+    assert await control.acquire(1)
+    waiter = asyncio.create_task(control.acquire(1))
+    await asyncio.sleep(0)
+    control.release(1)  # granted to the waiter...
+    waiter.cancel()  # ...which goes away before it runs
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert control.in_flight == 0
+    assert await control.acquire(1)
+
+
+@pytest.mark.asyncio
+async def test_admit_raises_429_with_retry_after():
+    control = AdmissionControl(max_concurrency=1, event_concurrency=1, queue_size=0, retry_after=3)
+    async with control.admit(1):
+        with pytest.raises(HTTPException) as exc:
+            async with control.admit(2):
+                pass
+    assert exc.value.status_code == 429
+    assert exc.value.headers == {"Retry-After": "3"}
+    assert control.in_flight == 0
+
+
+def test_known_full_events():
+    control = AdmissionControl(full_ttl=60)
+    assert not control.is_full(1)
+    control.mark_full(1)
+    assert control.is_full(1)
+    assert not control.is_full(2)
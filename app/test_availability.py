@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+from app.availability import KEEPALIVE, Availability, AvailabilityHub
+
+
+def payload(message):
+    return json.loads(message.text)
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_and_fanned_out():
+    hub = AvailabilityHub(interval=0.01, queue_size=4)
+    subscribers = [hub.subscribe(Availability(1, 10, 500)) for _ in range(100)]
+    assert all(payload(s.queue.popleft())["seats_left"] == 490 for s in subscribers)
+    for registered in range(11, 511):
+        hub.publish(Availability(1, min(registered, 500), 500))
+    await asyncio.sleep(0.05)
+    for subscriber in subscribers:
+        assert len(subscriber.queue) == 1
+        message = await subscriber.get()
+        assert payload(message) == {"event_id": 1, "registered": 500, "max_capacity": 500, "seats_left": 0}
+    # Nothing changed since the last flush: no message.
+    hub.publish(Availability(1, 500, 500))
+    assert hub.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_counts_never_go_backwards():
+    hub = AvailabilityHub(interval=60)
+    subscriber = hub.subscribe(Availability(1, 5, 10))
+    subscriber.queue.clear()
+    hub.publish(Availability(1, 7, 10))
+    hub.publish(Availability(1, 6, 10))  # stale report, e.g. a slower commit
+    # A late subscriber with an older read gets the newer count.
+    late = hub.subscribe(Availability(1, 4, 10))
+    assert payload(late.queue.popleft())["registered"] == 7
+    assert hub.flush() == 1
+    assert payload(subscriber.queue.popleft())["registered"] == 7
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_keeps_newest_messages():
+    hub = AvailabilityHub(interval=60, queue_size=3)
+    slow = hub.subscribe(Availability(1, 0, 100))
+    for registered in range(1, 11):
+        hub.publish(Availability(1, registered, 100))
+        hub.flush()
+    assert [payload(m)["registered"] for m in slow.queue] == [8, 9, 10]
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe_stops_publishing():
+    hub = AvailabilityHub(interval=60)
+    subscriber = hub.subscribe(Availability(1, 0, 10))
+    assert await subscriber.get() is not None
+    other = asyncio.create_task(subscriber.get())
+    await asyncio.sleep(0)
+    hub.unsubscribe(subscriber)
+    assert await other is None
+    assert not hub.watching(1)
+    hub.publish(Availability(1, 1, 10))  # no topic, no timer
+    assert hub.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_subscribers_get_keepalives():
+    hub = AvailabilityHub(interval=60, heartbeat=0.01)
+    idle = hub.subscribe(Availability(1, 0, 10))
+    busy = hub.subscribe(Availability(1, 0, 10))
+    idle.queue.clear()
+    await asyncio.sleep(0.015)
+    assert list(idle.queue) == [KEEPALIVE]
+    assert KEEPALIVE not in busy.queue
+    hub.unsubscribe(idle)
+    hub.unsubscribe(busy)
+    assert hub._heartbeat_handle is None
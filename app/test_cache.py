@@ -0,0 +1,45 @@
+from app.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction():
+    cache = TTLCache("test-lru", maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry_and_per_entry_ttl():
+    clock = FakeClock()
+    cache = TTLCache("test-ttl", maxsize=10, ttl=10, clock=clock)
+    cache.set("long", 1)
+    cache.set("short", 2, ttl=3)
+    clock.now = 5
+    assert cache.get("short") is None
+    assert cache.get("long") == 1
+    clock.now = 11
+    assert cache.get("long") is None
+    stats = cache.stats()
+    assert stats["expirations"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_clear_rejects_stale_writes():
+    cache = TTLCache("test-gen", maxsize=10, ttl=10)
+    generation = cache.generation
+    cache.clear()
+    cache.set("k", "stale", generation=generation)
+    assert cache.get("k") is None
+    cache.set("k", "fresh", generation=cache.generation)
+    assert cache.get("k") == "fresh"
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.database import make_engine
+
+
+def test_profiles_and_overrides():
+    assert get_settings({}).env == "dev"
+    prod = get_settings({"APP_ENV": "prod"})
+    assert prod.echo is False
+    assert prod.pool_size == 10
+    custom = get_settings({"APP_ENV": "prod", "DATABASE_URL": "sqlite+aiosqlite:///./other.db", "ECHO": "true", "POOL_SIZE": "3"})
+    assert custom.database_url == "sqlite+aiosqlite:///./other.db"
+    assert custom.echo is True
+    assert custom.pool_size == 3
+    batching = get_settings({"WRITE_BATCHING": "on", "WRITE_BATCH_WINDOW_MS": "0.5"})
+    assert batching.write_batching is True
+    assert batching.write_batch_window_ms == 0.5
+    with pytest.raises(ValueError):
+        get_settings({"APP_ENV": "staging"})
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}"
+    write_engine = make_engine(url)
+    read_engine = make_engine(url, read_only=True)
+    async with write_engine.connect() as conn:
+        assert (await conn.scalar(text("PRAGMA journal_mode"))) == "wal"
+        assert (await conn.scalar(text("PRAGMA synchronous"))) == 1  # NORMAL
+        assert (await conn.scalar(text("PRAGMA busy_timeout"))) == 5000
+        assert (await conn.scalar(text("PRAGMA query_only"))) == 0
+    async with read_engine.connect() as conn:
+        assert (await conn.scalar(text("PRAGMA query_only"))) == 1
+    await write_engine.dispose()
+    await read_engine.dispose()
@@ -2,16 +2,31 @@ import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db
+from app.metrics import instrument_engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from app.models import Event, Attendee
+from app.models import Event, Attendee, IdempotencyRecord
+from app import archive, availability, crud, idempotency, models, schemas, writer
+from app import stats as stats_module
+from app.api import events as api_events
+from app.admission import AdmissionControl
+from app.shared_seats import SharedSeats
+from app.cache import TTLCache
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from sqlalchemy import func, select, update
 from datetime import datetime, timedelta
 import pytz
 import asyncio
+import csv
+import json
+import re
 
 SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True, future=True)
+instrument_engine(engine, "test")
 TestingSessionLocal = sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -29,6 +44,7 @@ async def async_client():
         async with TestingSessionLocal() as session:
             yield session
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
@@ -129,3 +145,998 @@ async def test_get_attendees_pagination(async_client):
     assert "total" in data
     assert "attendees" in data
     assert len(data["attendees"]) <= 2
+
+@pytest.mark.asyncio
+async def test_pagination_params_are_validated(async_client):
+    listings = [
+        ("/events", {}), ("/events/search", {"q": "event"}), ("/events/1/attendees", {}),
+        ("/attendees/a@example.com/events", {}), ("/archive/events", {}), ("/archive/events/1/attendees", {}),
+    ]
+    for path, base in listings:
+        for bad in ({"limit": -1}, {"limit": 0}, {"limit": 1001}, {"skip": -1}):
+            response = await async_client.get(path, params={**base, **bad})
+            assert response.status_code == 422, (path, bad)
+    assert (await async_client.get("/events", params={"limit": 1000})).status_code == 200
+
+@pytest.mark.asyncio
+async def test_register_attendee_concurrent_no_overbooking(tmp_path):
+    # Hundreds of concurrent registrations racing for the last few seats must
+    # never overbook. Uses a file database so every session has its own
+    # connection, like the real app.
+    file_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'race.db'}", future=True)
+    SessionLocal = sessionmaker(bind=file_engine, class_=AsyncSession, expire_on_commit=False)
+    async with file_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        event = Event(
+            name="Race Event",
+            location="Loc",
+            start_time=datetime.utcnow() + timedelta(hours=1),
+            end_time=datetime.utcnow() + timedelta(hours=2),
+            max_capacity=5,
+        )
+        session.add(event)
+        await session.commit()
+        event_id = event.id
+    for i in range(2):
+        async with SessionLocal() as session:
+            await crud.register_attendee(session, event_id, schemas.AttendeeCreate(name=f"Early{i}", email=f"early{i}@example.com"))
+
+    async def register(i):
+        async with SessionLocal() as session:
+            return await crud.register_attendee(session, event_id, schemas.AttendeeCreate(name=f"Racer{i}", email=f"racer{i}@example.com"))
+
+    results = await asyncio.gather(*(register(i) for i in range(300)))
+    assert sum(1 for r in results if isinstance(r, Attendee)) == 3
+    assert sum(1 for r in results if r is False) == 297
+    async with SessionLocal() as session:
+        count = await session.scalar(select(func.count()).select_from(Attendee).where(Attendee.event_id == event_id))
+        registered = await session.scalar(select(Event.registered_count).where(Event.id == event_id))
+    assert count == 5
+    assert registered == 5
+    await file_engine.dispose()
+
+@pytest.mark.asyncio
+async def test_registration_writer_group_commit(tmp_path, async_client):
+    # Batched registrations must give every caller the same answer as the
+    # direct path: the last seats go to the earliest requests, repeats are
+    # duplicates, unknown events are None.
+    file_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'batch.db'}", future=True)
+    SessionLocal = sessionmaker(bind=file_engine, class_=AsyncSession, expire_on_commit=False)
+    async with file_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        event = Event(
+            name="Batch Event",
+            location="Loc",
+            start_time=datetime.utcnow() + timedelta(hours=1),
+            end_time=datetime.utcnow() + timedelta(hours=2),
+            max_capacity=5,
+        )
+        session.add(event)
+        await session.commit()
+        event_id = event.id
+    async with SessionLocal() as session:
+        await crud.register_attendee(session, event_id, schemas.AttendeeCreate(name="Early", email="early@example.com"))
+
+    batch_writer = writer.RegistrationWriter(SessionLocal, max_batch=64, window=0.005)
+    await batch_writer.start()
+    emails = ["early@example.com", "b0@example.com", "b0@example.com"] + [f"b{i}@example.com" for i in range(1, 200)]
+    results = await asyncio.gather(
+        *(batch_writer.submit(event_id, schemas.AttendeeCreate(name="Batched", email=email)) for email in emails),
+        batch_writer.submit(event_id + 1000, schemas.AttendeeCreate(name="Nobody", email="nobody@example.com")),
+    )
+    await batch_writer.stop()
+    assert not batch_writer.running
+    assert results[0] is None and results[2] is None  # duplicates
+    created = [r for r in results if isinstance(r, Attendee)]
+    assert [a.email for a in created] == ["b0@example.com", "b1@example.com", "b2@example.com", "b3@example.com"]
+    assert all(a.id is not None and a.event_id == event_id for a in created)
+    assert all(r is False for r in results[7:-1])
+    assert results[-1] is None
+    async with SessionLocal() as session:
+        count = await session.scalar(select(func.count()).select_from(Attendee).where(Attendee.event_id == event_id))
+        registered = await session.scalar(select(Event.registered_count).where(Event.id == event_id))
+    assert count == registered == 5
+    await file_engine.dispose()
+
+    # The endpoint routes through the writer while it is running.
+    event_data = {
+        "name": "Event10",
+        "location": "Loc10",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 1,
+        "timezone": "UTC"
+    }
+    api_event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+    api_writer = writer.RegistrationWriter(TestingSessionLocal)
+    original, writer.registration_writer = writer.registration_writer, api_writer
+    await api_writer.start()
+    try:
+        ok = await async_client.post(f"/events/{api_event_id}/register", json={"name": "W", "email": "w@example.com"})
+        full = await async_client.post(f"/events/{api_event_id}/register", json={"name": "X", "email": "x@example.com"})
+    finally:
+        await api_writer.stop()
+        writer.registration_writer = original
+    assert ok.status_code == 200 and ok.json()["email"] == "w@example.com"
+    assert full.status_code == 400 and full.json()["detail"] == "Event is full."
+    assert writer.BATCH_SIZE.count() >= 2
+
+@pytest.mark.asyncio
+async def test_seat_holds(async_client):
+    event_data = {
+        "name": "Event11",
+        "location": "Loc11",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 3,
+        "timezone": "UTC"
+    }
+    event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+    await async_client.post(f"/events/{event_id}/register", json={"name": "A", "email": "a11@example.com"})
+    first = await async_client.post(f"/events/{event_id}/holds")
+    second = await async_client.post(f"/events/{event_id}/holds")
+    assert first.status_code == second.status_code == 201
+    assert first.json()["event_id"] == event_id and first.json()["expires_in"] > 0
+    # Held seats are not available to anyone else.
+    assert (await async_client.post(f"/events/{event_id}/holds")).json()["detail"] == "Event is full."
+    direct = await async_client.post(f"/events/{event_id}/register", json={"name": "B", "email": "b11@example.com"})
+    assert direct.status_code == 400 and direct.json()["detail"] == "Event is full."
+
+    hold_id = first.json()["hold_id"]
+    dup = await async_client.post(f"/events/{event_id}/holds/{hold_id}/confirm", json={"name": "A", "email": "a11@example.com"})
+    assert dup.status_code == 400  # the hold survives a duplicate
+    confirmed = await async_client.post(f"/events/{event_id}/holds/{hold_id}/confirm", json={"name": "C", "email": "c11@example.com"})
+    assert confirmed.status_code == 200 and confirmed.json()["email"] == "c11@example.com"
+    again = await async_client.post(f"/events/{event_id}/holds/{hold_id}/confirm", json={"name": "D", "email": "d11@example.com"})
+    assert again.status_code == 404
+
+    released = await async_client.delete(f"/events/{event_id}/holds/{second.json()['hold_id']}")
+    assert released.status_code == 204
+    assert (await async_client.delete(f"/events/{event_id}/holds/{second.json()['hold_id']}")).status_code == 404
+    bulk = await async_client.post(f"/events/{event_id}/register/bulk", json=[
+        {"name": "E", "email": "e11@example.com"}, {"name": "F", "email": "f11@example.com"},
+    ])
+    assert [r["status"] for r in bulk.json()["results"]] == ["created", "full"]
+    attendees = (await async_client.get(f"/events/{event_id}/attendees")).json()
+    assert attendees["total"] == 3
+    assert (await async_client.post("/events/999999/holds")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_seat_sold_elsewhere_stays_claimed(async_client, monkeypatch):
+    monkeypatch.setattr(api_events, "admission_control", AdmissionControl())
+    event_id = (await async_client.post("/events", json={
+        "name": "Event Sold Elsewhere",
+        "location": "Loc",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 2,
+        "timezone": "UTC"
+    })).json()["id"]
+    assert (await async_client.post(f"/events/{event_id}/holds")).status_code == 201
+    # Another process sells both seats behind this process's ledger.
+    async with TestingSessionLocal() as session:
+        await session.execute(update(Event).where(Event.id == event_id).values(registered_count=2))
+        await session.commit()
+    direct = await async_client.post(f"/events/{event_id}/register", json={"name": "B", "email": "b@example.com"})
+    assert direct.status_code == 400 and direct.json()["detail"] == "Event is full."
+    # The database's "full" is final: the claimed seat is not handed back.
+    assert api_events.seat_holds.ledgers[event_id].free == 0
+    assert (await async_client.post(f"/events/{event_id}/holds")).json()["detail"] == "Event is full."
+
+@pytest.mark.asyncio
+async def test_search_events(async_client):
+    start = datetime.utcnow() + timedelta(days=2)
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            Event(name="Mumbai Jazz Night", location="Bandra", start_time=start, end_time=start + timedelta(hours=3), max_capacity=5),
+            Event(name="Jazz Brunch", location="Mumbaí Fort", start_time=start, end_time=start + timedelta(hours=3), max_capacity=5),
+            Event(name="Mumbai Marathon", location="Marine Drive", start_time=start, end_time=start + timedelta(hours=3), max_capacity=5),
+            Event(name="Mumbai Jazz Past", location="Colaba", start_time=datetime.utcnow() - timedelta(days=2),
+                  end_time=datetime.utcnow() - timedelta(days=1), max_capacity=5),
+        ])
+        await session.commit()
+    response = await async_client.get("/events/search", params={"q": "mum", "timezone": "UTC"})
+    assert response.status_code == 200
+    data = response.json()
+    # Prefix match on either column, diacritics folded, ended events left out.
+    assert data["total"] == 3
+    assert {e["name"] for e in data["events"]} == {"Mumbai Jazz Night", "Jazz Brunch", "Mumbai Marathon"}
+    assert data["events"][0]["start_time"].endswith("+00:00")
+    both = (await async_client.get("/events/search", params={"q": "jazz MUMBAI"})).json()
+    # A name match ranks above a location match.
+    assert [e["name"] for e in both["events"]] == ["Mumbai Jazz Night", "Jazz Brunch"]
+    assert both["events"][0]["start_time"].endswith("+05:30")
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "mumbai", "limit": 1, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await async_client.get("/events/search", params=params)).json()
+        assert page["total"] is None
+        seen += [e["name"] for e in page["events"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [e["name"] for e in data["events"]]
+
+    # A new event changes every bm25 score, so older cursors are refused
+    # instead of skipping or repeating rows.
+    first = (await async_client.get("/events/search", params={"q": "mumbai", "limit": 1})).json()
+    await async_client.post("/events", json={
+        "name": "Mumbai Food Walk",
+        "location": "Colaba",
+        "start_time": (datetime.utcnow() + timedelta(days=2)).isoformat(),
+        "end_time": (datetime.utcnow() + timedelta(days=2, hours=2)).isoformat(),
+        "max_capacity": 5,
+        "timezone": "UTC"
+    })
+    stale = await async_client.get("/events/search", params={"q": "mumbai", "cursor": first["next_cursor"]})
+    assert stale.status_code == 400 and "search again" in stale.json()["detail"]
+
+    # FTS5 syntax in the query is taken literally.
+    assert (await async_client.get("/events/search", params={"q": 'jazz" (* - ^'})).json()["total"] == 2
+    assert (await async_client.get("/events/search", params={"q": "***"})).status_code == 400
+    assert (await async_client.get("/events/search", params={"q": "jazz", "cursor": "bad"})).status_code == 400
+
+@pytest.mark.asyncio
+async def test_event_times_are_stored_in_utc(async_client):
+    # Posted as 10:00 in Kolkata (UTC+5:30), so 04:30 UTC.
+    created = await async_client.post("/events", json={
+        "name": "Kolkata Morning",
+        "location": "Nashik",
+        "start_time": "2032-03-10T10:00:00",
+        "end_time": "2032-03-10T11:00:00",
+        "max_capacity": 5,
+        "timezone": "Asia/Kolkata"
+    })
+    assert created.status_code == 201
+    async with TestingSessionLocal() as session:
+        stored = await session.get(Event, created.json()["id"])
+    assert stored.start_time == datetime(2032, 3, 10, 4, 30)
+
+    def window(start, end):
+        return f"/events?location=Nashik&timezone=Asia/Kolkata&from=2032-03-10T{start}&to=2032-03-10T{end}"
+
+    matched = (await async_client.get(window("10:00", "11:00"))).json()["events"]
+    assert [e["start_time"] for e in matched] == ["2032-03-10T10:00:00+05:30"]
+    assert (await async_client.get(window("15:00", "16:00"))).json()["events"] == []
+
+@pytest.mark.asyncio
+async def test_events_time_window_and_calendar(async_client):
+    # Kolkata is UTC+5:30, so local day D runs from D-1 18:30 to D 18:30 UTC.
+    base = datetime(2031, 3, 10)
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            # 2031-03-10 09:30-11:30 local
+            Event(name="Window A", location="Pune", start_time=base + timedelta(hours=4), end_time=base + timedelta(hours=6), max_capacity=5),
+            # 2031-03-11 23:30 local to 2031-03-13 01:30 local: spans three local days
+            Event(name="Window B", location="Pune", start_time=base + timedelta(days=1, hours=18), end_time=base + timedelta(days=2, hours=20), max_capacity=5),
+            Event(name="Window C", location="Goa", start_time=base + timedelta(days=1, hours=4), end_time=base + timedelta(days=1, hours=6), max_capacity=5),
+            Event(name="Window D", location="Pune", start_time=base + timedelta(days=30), end_time=base + timedelta(days=30, hours=2), max_capacity=5),
+        ])
+        await session.commit()
+
+    async def names(**params):
+        response = await async_client.get("/events", params={"timezone": "Asia/Kolkata", **params})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(data["events"])
+        return [e["name"] for e in data["events"]]
+
+    assert await names(**{"from": "2031-03-10T00:00:00", "to": "2031-03-17T00:00:00"}) == ["Window A", "Window C", "Window B"]
+    assert await names(**{"from": "2031-03-10T00:00:00", "to": "2031-03-17T00:00:00", "location": "Pune"}) == ["Window A", "Window B"]
+    # Overlap, not containment: B started the day before.
+    assert await names(**{"from": "2031-03-12T12:00:00", "to": "2031-03-12T13:00:00"}) == ["Window B"]
+    # Aware bounds keep their own offset: 04:00-04:30 UTC is inside A.
+    assert await names(**{"from": "2031-03-10T04:00:00+00:00", "to": "2031-03-10T04:30:00+00:00"}) == ["Window A"]
+    assert await names(location="Goa") == ["Window C"]
+    bad = await async_client.get("/events", params={"from": "2031-03-12T00:00:00", "to": "2031-03-11T00:00:00"})
+    assert bad.status_code == 400
+
+    calendar = await async_client.get("/events/calendar", params={"from": "2031-03-09", "to": "2031-03-14", "timezone": "Asia/Kolkata"})
+    assert calendar.status_code == 200
+    assert calendar.json()["days"] == [
+        {"date": "2031-03-09", "count": 0},
+        {"date": "2031-03-10", "count": 1},
+        {"date": "2031-03-11", "count": 2},
+        {"date": "2031-03-12", "count": 1},
+        {"date": "2031-03-13", "count": 1},
+        {"date": "2031-03-14", "count": 0},
+    ]
+    pune = (await async_client.get("/events/calendar", params={"from": "2031-03-11", "to": "2031-03-11", "timezone": "Asia/Kolkata", "location": "Pune"})).json()
+    assert pune == {"timezone": "Asia/Kolkata", "location": "Pune", "days": [{"date": "2031-03-11", "count": 1}]}
+    # In UTC the same events fall on other days.
+    utc = (await async_client.get("/events/calendar", params={"from": "2031-03-11", "to": "2031-03-12", "timezone": "UTC"})).json()
+    assert [d["count"] for d in utc["days"]] == [2, 1]
+    # New York moves to EDT on 2031-03-09, so 2031-03-10 starts at 04:00 UTC.
+    ny = (await async_client.get("/events/calendar", params={"from": "2031-03-09", "to": "2031-03-10", "timezone": "America/New_York", "location": "Pune"})).json()
+    assert [d["count"] for d in ny["days"]] == [0, 1]
+    assert (await async_client.get("/events/calendar", params={"from": "2031-01-01", "to": "2032-06-01"})).status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_attendees_cursor_pagination(async_client):
+    event_data = {
+        "name": "Event5",
+        "location": "Loc5",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 10,
+        "timezone": "UTC"
+    }
+    event_resp = await async_client.post("/events", json=event_data)
+    event_id = event_resp.json()["id"]
+    for i in range(5):
+        attendee_data = {"name": f"Walker{i}", "email": f"walker{i}@example.com"}
+        await async_client.post(f"/events/{event_id}/register", json=attendee_data)
+    ids = []
+    url = f"/events/{event_id}/attendees?limit=2"
+    while url:
+        response = await async_client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        ids.extend(a["id"] for a in data["attendees"])
+        url = f"/events/{event_id}/attendees?limit=2&cursor={data['next_cursor']}" if data["next_cursor"] else None
+    assert len(ids) == 5
+    assert ids == sorted(ids)
+
+@pytest.mark.asyncio
+async def test_get_events_cursor_pagination(async_client):
+    full = (await async_client.get("/events?limit=1000&timezone=UTC")).json()
+    ids = []
+    url = "/events?limit=1&timezone=UTC"
+    while url:
+        data = (await async_client.get(url)).json()
+        ids.extend(e["id"] for e in data["events"])
+        url = f"/events?limit=1&timezone=UTC&cursor={data['next_cursor']}" if data["next_cursor"] else None
+    assert ids == [e["id"] for e in full["events"]]
+    response = await async_client.get("/events?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_totals(async_client):
+    events = (await async_client.get("/events?limit=1")).json()
+    assert events["total"] >= len(events["events"])
+    assert (await async_client.get("/events?limit=1&include_total=false")).json()["total"] is None
+    event_data = {
+        "name": "Event6",
+        "location": "Loc6",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 5,
+        "timezone": "UTC"
+    }
+    event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+    for i in range(3):
+        await async_client.post(f"/events/{event_id}/register", json={"name": f"T{i}", "email": f"t{i}@example.com"})
+    data = (await async_client.get(f"/events/{event_id}/attendees?limit=1")).json()
+    assert data["total"] == 3
+    assert len(data["attendees"]) == 1
+    data = (await async_client.get(f"/events/{event_id}/attendees?limit=1&include_total=false")).json()
+    assert data["total"] is None
+
+@pytest.mark.asyncio
+async def test_register_attendees_bulk(async_client):
+    event_data = {
+        "name": "Event7",
+        "location": "Loc7",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 3,
+        "timezone": "UTC"
+    }
+    event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+    await async_client.post(f"/events/{event_id}/register", json={"name": "A", "email": "a@example.com"})
+    batch = [
+        {"name": "A", "email": "a@example.com"},
+        {"name": "B", "email": "b@example.com"},
+        {"name": "B again", "email": "b@example.com"},
+        {"name": "C", "email": "c@example.com"},
+        {"name": "D", "email": "d@example.com"},
+    ]
+    response = await async_client.post(f"/events/{event_id}/register/bulk", json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["duplicate", "created", "duplicate", "created", "full"]
+    assert (data["created"], data["duplicates"], data["full"]) == (2, 2, 1)
+    assert all(r["id"] for r in data["results"] if r["status"] == "created")
+    attendees = (await async_client.get(f"/events/{event_id}/attendees")).json()
+    assert attendees["total"] == 3
+    assert len(attendees["attendees"]) == 3
+    response = await async_client.post("/events/999999/register/bulk", json=batch)
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_registrations_by_email(async_client):
+    event_ids = []
+    for i in range(3):
+        event_ids.append((await async_client.post("/events", json={
+            "name": f"Fan Event {i}",
+            "location": "Fan Hall",
+            "start_time": (datetime.now() + timedelta(days=i + 1)).isoformat(),
+            "end_time": (datetime.now() + timedelta(days=i + 1, hours=2)).isoformat(),
+            "max_capacity": 5,
+            "timezone": "UTC"
+        })).json()["id"])
+    for event_id in reversed(event_ids):
+        await async_client.post(f"/events/{event_id}/register", json={"name": "Fan", "email": "fan@Example.COM"})
+    await async_client.post(f"/events/{event_ids[0]}/register", json={"name": "Other", "email": "other@example.com"})
+
+    # The path email is normalized like a registration's.
+    response = await async_client.get("/attendees/fan@example.com/events?limit=2&timezone=Asia/Kolkata")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["email"] == "fan@example.com"
+    assert data["total"] == 3
+    assert [e["id"] for e in data["events"]] == event_ids[:2]
+    assert data["events"][0]["name"] == "Fan Event 0"
+    assert data["events"][0]["attendee_name"] == "Fan"
+    assert data["events"][0]["start_time"].endswith("+05:30")
+    listed = (await async_client.get(f"/events/{event_ids[0]}/attendees?timezone=Asia/Kolkata")).json()["attendees"]
+    assert data["events"][0]["attendee_id"] == next(a["id"] for a in listed if a["email"] == "fan@example.com")
+    assert data["events"][0]["start_time"] == listed[0]["event_start_time"]
+
+    rest = (await async_client.get(f"/attendees/fan@EXAMPLE.com/events?limit=2&include_total=false&cursor={data['next_cursor']}")).json()
+    assert [e["id"] for e in rest["events"]] == event_ids[2:]
+    assert rest["next_cursor"] is None and rest["total"] is None
+
+    nobody = (await async_client.get("/attendees/nobody@example.com/events")).json()
+    assert (nobody["total"], nobody["events"]) == (0, [])
+    assert (await async_client.get("/attendees/not-an-email/events")).status_code == 422
+    assert (await async_client.get("/attendees/fan@example.com/events?cursor=bad")).status_code == 400
+
+@pytest.mark.asyncio
+async def test_event_stats(async_client):
+    event_id = (await async_client.post("/events", json={
+        "name": "Stats Event",
+        "location": "Stats Hall",
+        "start_time": (datetime.now() + timedelta(days=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(days=1, hours=2)).isoformat(),
+        "max_capacity": 8,
+        "timezone": "UTC"
+    })).json()["id"]
+    for i in range(2):
+        await async_client.post(f"/events/{event_id}/register", json={"name": "S", "email": f"stats{i}@example.com"})
+    await async_client.post(f"/events/{event_id}/register", json={"name": "S", "email": "stats0@example.com"})  # duplicate
+    await async_client.post(f"/events/{event_id}/register/bulk", json=[
+        {"name": "S", "email": f"stats{i}@example.com"} for i in range(1, 5)
+    ])
+
+    response = await async_client.get(f"/events/{event_id}/stats?timezone=UTC")
+    assert response.status_code == 200
+    stats = response.json()
+    hour = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    assert stats == {
+        "event_id": event_id,
+        "registered": 5,
+        "max_capacity": 8,
+        "seats_remaining": 3,
+        "fill_percentage": 62.5,
+        "hours": 24,
+        "registrations_per_hour": [{"hour": hour.isoformat() + "+00:00", "registrations": 5}],
+    }
+    listing = (await async_client.get("/events?limit=1000&timezone=UTC&include_seats=true")).json()
+    assert next(e for e in listing["events"] if e["id"] == event_id)["seats_remaining"] == 3
+    assert "seats_remaining" not in (await async_client.get("/events?limit=1000&timezone=UTC")).json()["events"][0]
+
+    # Repair: the rebuild recomputes both from the attendee rows, and older
+    # rows without a registration time count towards the total only.
+    async with TestingSessionLocal() as session:
+        await session.execute(update(Event).where(Event.id == event_id).values(registered_count=0))
+        session.add(Attendee(name="Old", email="old@example.com", event_id=event_id))
+        await session.commit()
+    assert (await async_client.get(f"/events/{event_id}/stats")).json()["registered"] == 0
+    await stats_module.rebuild(TestingSessionLocal, pause=0)
+    rebuilt = (await async_client.get(f"/events/{event_id}/stats?timezone=UTC")).json()
+    assert rebuilt["registered"] == 6 and rebuilt["seats_remaining"] == 2
+    assert rebuilt["registrations_per_hour"] == stats["registrations_per_hour"]
+
+    assert (await async_client.get(f"/events/{event_id}/stats?hours=0")).status_code == 400
+    assert (await async_client.get(f"/events/{event_id}/stats?timezone=Nowhere")).status_code == 400
+    assert (await async_client.get("/events/999999/stats")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_calendar_feeds(async_client):
+    start = datetime.utcnow().replace(microsecond=0) + timedelta(days=400)
+    posted_at = datetime.utcnow().replace(microsecond=0)
+    event_id = (await async_client.post("/events", json={
+        "name": "Feed Event, Part 1",
+        "location": "Feed Hall",
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=2)).isoformat(),
+        "max_capacity": 5,
+        "timezone": "UTC"
+    })).json()["id"]
+
+    single = await async_client.get(f"/events/{event_id}.ics")
+    assert single.status_code == 200
+    assert single.headers["content-type"] == "text/calendar; charset=utf-8"
+    assert single.content.startswith(b"BEGIN:VCALENDAR\r\n")
+    assert f"\r\nDTSTART:{start:%Y%m%dT%H%M%S}Z\r\n".encode() in single.content
+    assert b"\r\nSUMMARY:Feed Event\\, Part 1\r\n" in single.content
+    # DTSTAMP is when the event was created.
+    dtstamp = datetime.strptime(re.search(rb"\r\nDTSTAMP:(\w+)Z\r\n", single.content).group(1).decode(), "%Y%m%dT%H%M%S")
+    assert posted_at <= dtstamp <= datetime.utcnow()
+    cached = await async_client.get(f"/events/{event_id}.ics", headers={"If-None-Match": single.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.headers["x-db-statements"] == "0"
+    assert not single.headers["etag"].startswith("W/")
+    assert (await async_client.get("/events/999999.ics")).status_code == 404
+
+    feed = await async_client.get("/events.ics")
+    assert feed.status_code == 200
+    assert f"UID:event-{event_id}@".encode() in feed.content
+    assert feed.content.count(b"BEGIN:VEVENT") == feed.content.count(b"END:VEVENT") >= 1
+    polled = await async_client.get("/events.ics", headers={"If-None-Match": feed.headers["etag"]})
+    assert polled.status_code == 304
+    assert polled.headers["x-db-statements"] == "0"
+
+    # A new event invalidates the feed.
+    new_id = (await async_client.post("/events", json={
+        "name": "Feed Event, Part 2",
+        "location": "Feed Hall",
+        "start_time": (start + timedelta(days=1)).isoformat(),
+        "end_time": (start + timedelta(days=1, hours=2)).isoformat(),
+        "max_capacity": 5,
+        "timezone": "UTC"
+    })).json()["id"]
+    changed = await async_client.get("/events.ics", headers={"If-None-Match": feed.headers["etag"]})
+    assert changed.status_code == 200
+    assert f"UID:event-{new_id}@".encode() in changed.content
+    # The single-event file did not change.
+    assert (await async_client.get(f"/events/{event_id}.ics", headers={"If-None-Match": single.headers["etag"]})).status_code == 304
+
+    # Times posted in another zone come out in UTC.
+    kolkata_id = (await async_client.post("/events", json={
+        "name": "Feed Event, Kolkata",
+        "location": "Feed Hall",
+        "start_time": "2031-03-10T10:00:00",
+        "end_time": "2031-03-10T12:00:00",
+        "max_capacity": 5,
+        "timezone": "Asia/Kolkata"
+    })).json()["id"]
+    kolkata = (await async_client.get(f"/events/{kolkata_id}.ics")).content
+    assert b"\r\nDTSTART:20310310T043000Z\r\nDTEND:20310310T063000Z\r\n" in kolkata
+
+@pytest.mark.asyncio
+async def test_create_events_bulk(async_client):
+    def event(name, tz="UTC", hours=1):
+        return {
+            "name": name,
+            "location": "Season Hall",
+            "start_time": (datetime.now() + timedelta(hours=hours)).isoformat(),
+            "end_time": (datetime.now() + timedelta(hours=hours + 1)).isoformat(),
+            "max_capacity": 50,
+            "timezone": tz,
+        }
+    single = await async_client.post("/events", json=event("Season 0"))
+    assert single.status_code == 201
+    assert single.headers["x-db-statements"] == "1"
+    taken = await async_client.post("/events", json=event("Season 0"))
+    assert taken.status_code == 400
+    assert taken.json()["detail"] == "Event with name 'Season 0' already exists."
+
+    batch = [event("Season 0"), event("Season 1"), event("Season 2", "Asia/Kolkata", 30), event("Season 1"), event("Season 3")]
+    response = await async_client.post("/events/bulk", json=batch)
+    assert response.status_code == 200
+    data = response.json()
+    assert [r["status"] for r in data["results"]] == ["duplicate", "created", "created", "duplicate", "created"]
+    assert (data["created"], data["duplicates"]) == (3, 2)
+    assert [r["name"] for r in data["results"]] == [e["name"] for e in batch]
+    created = {r["name"]: r["id"] for r in data["results"] if r["status"] == "created"}
+    assert len(set(created.values())) == 3
+
+    # Stored exactly as POST /events would store it, and visible in listings
+    # (the cache is invalidated) and search.
+    async with TestingSessionLocal() as session:
+        stored = await session.get(Event, created["Season 2"])
+    assert stored.start_time == schemas.EventCreate(**batch[2]).start_time
+    assert stored.registered_count == 0
+    listed = (await async_client.get("/events?limit=1000&timezone=UTC")).json()["events"]
+    assert {"Season 1", "Season 2", "Season 3"} <= {e["name"] for e in listed}
+    found = (await async_client.get("/events/search?q=season&timezone=UTC")).json()["events"]
+    assert {"Season 0", "Season 1", "Season 2", "Season 3"} == {e["name"] for e in found}
+
+    # One invalid event rejects the whole batch.
+    response = await async_client.post("/events/bulk", json=[event("Season 4"), event("Season 5", "Mars/Base")])
+    assert response.status_code == 400
+    assert (await async_client.get("/events/search?q=season&timezone=UTC")).json()["total"] == 4
+
+@pytest.mark.asyncio
+async def test_export_attendees(async_client):
+    event_data = {
+        "name": "Event8",
+        "location": "Loc8",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 5,
+        "timezone": "UTC"
+    }
+    event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+    for i in range(3):
+        await async_client.post(f"/events/{event_id}/register", json={"name": f"Ex, {i}", "email": f"ex{i}@example.com"})
+    listed = (await async_client.get(f"/events/{event_id}/attendees?timezone=Asia/Kolkata")).json()["attendees"]
+
+    response = await async_client.get(f"/events/{event_id}/attendees/export?format=csv&timezone=Asia/Kolkata")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(response.text.splitlines()))
+    assert [r["email"] for r in rows] == [a["email"] for a in listed]
+    assert rows[0]["name"] == "Ex, 0"
+    assert rows[0]["event_start_time"] == listed[0]["event_start_time"]
+
+    response = await async_client.get(f"/events/{event_id}/attendees/export?format=ndjson&timezone=Asia/Kolkata")
+    assert response.status_code == 200
+    assert [json.loads(line) for line in response.text.splitlines()] == listed
+
+    assert (await async_client.get("/events/999999/attendees/export")).status_code == 404
+    assert (await async_client.get(f"/events/{event_id}/attendees/export?format=xml")).status_code == 422
+
+@pytest.mark.asyncio
+async def test_list_events_cache_and_etag(async_client):
+    first = await async_client.get("/events?limit=500&timezone=UTC")
+    etag = first.headers["etag"]
+    assert "last-modified" in first.headers
+    cached = await async_client.get("/events?limit=500&timezone=UTC", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    stats = (await async_client.get("/cache/stats")).json()["events"]
+    assert stats["hits"] >= 1
+    event_data = {
+        "name": "Event9",
+        "location": "Loc9",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 5,
+        "timezone": "UTC"
+    }
+    await async_client.post("/events", json=event_data)
+    fresh = await async_client.get("/events?limit=500&timezone=UTC", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert "Event9" in [e["name"] for e in fresh.json()["events"]]
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_and_debug_headers(async_client):
+    response = await async_client.get("/events?limit=3&timezone=Europe/London")
+    assert int(response.headers["x-db-statements"]) >= 1
+    assert float(response.headers["x-db-time-ms"]) > 0
+    cached = await async_client.get("/events?limit=3&timezone=Europe/London")
+    assert cached.headers["x-db-statements"] == "0"
+    metrics = await async_client.get("/metrics")
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/events",status="200"}' in metrics.text
+    assert 'http_request_db_statements_total{method="GET",route="/events"}' in metrics.text
+    assert 'db_statements_total{engine="test"}' in metrics.text
+    assert 'cache_hits_total{cache="events"}' in metrics.text
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_writes(async_client):
+    event_data = {
+        "name": "Idem Event",
+        "location": "Loc",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 1,
+        "timezone": "UTC"
+    }
+    headers = {"Idempotency-Key": "create-idem-event"}
+    first = await async_client.post("/events", json=event_data, headers=headers)
+    assert first.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+    retry = await async_client.post("/events", json=event_data, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.content == first.content
+    # Without a key the duplicate name is still rejected.
+    assert (await async_client.post("/events", json=event_data)).status_code == 400
+    # Same key, different body.
+    other = await async_client.post("/events", json={**event_data, "name": "Idem Other"}, headers=headers)
+    assert other.status_code == 422
+
+    event_id = first.json()["id"]
+    attendee = {"name": "Retry", "email": "retry@example.com"}
+    register_headers = {"Idempotency-Key": "register-retry"}
+    results = await asyncio.gather(*(
+        async_client.post(f"/events/{event_id}/register", json=attendee, headers=register_headers)
+        for _ in range(5)
+    ))
+    assert [r.status_code for r in results] == [200] * 5
+    assert len({r.content for r in results}) == 1
+    assert sum("idempotent-replayed" in r.headers for r in results) == 4
+    # Business errors are replayed too: the event is now full.
+    full_headers = {"Idempotency-Key": "register-late"}
+    late = await async_client.post(f"/events/{event_id}/register", json={"name": "Late", "email": "late@example.com"}, headers=full_headers)
+    assert late.status_code == 400
+    replayed = await async_client.post(f"/events/{event_id}/register", json={"name": "Late", "email": "late@example.com"}, headers=full_headers)
+    assert replayed.status_code == 400 and replayed.content == late.content
+    assert replayed.headers["idempotent-replayed"] == "true"
+    async with TestingSessionLocal() as session:
+        count = await session.scalar(select(func.count()).select_from(Attendee).where(Attendee.event_id == event_id))
+    assert count == 1
+    too_long = await async_client.post(f"/events/{event_id}/register", json=attendee, headers={"Idempotency-Key": "k" * 256})
+    assert too_long.status_code == 400
+
+@pytest.mark.asyncio
+async def test_idempotency_store_persists_responses(tmp_path):
+    file_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'idem.db'}", future=True)
+    SessionLocal = sessionmaker(bind=file_engine, class_=AsyncSession, expire_on_commit=False)
+    async with file_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    store = idempotency.IdempotencyStore(TTLCache("idempotency-test", ttl=60), session_factory=SessionLocal)
+    calls = []
+
+    async def execute():
+        calls.append(1)
+        return JSONResponse({"n": len(calls)}, status_code=201)
+
+    first = await store.run("k", "POST /x", "body", execute)
+    # A restarted worker (empty cache) replays from the table.
+    store.cache.clear()
+    replay = await store.run("k", "POST /x", "body", execute)
+    assert len(calls) == 1
+    assert replay.body == first.body and replay.status_code == 201
+    assert replay.headers[idempotency.REPLAY_HEADER] == "true"
+
+    # Expired records are neither replayed nor in the way of a new response.
+    async with SessionLocal() as session:
+        await session.execute(update(IdempotencyRecord).values(created_at=datetime.utcnow() - timedelta(minutes=5)))
+        await session.commit()
+    store.cache.clear()
+    fresh = await store.run("k", "POST /x", "body", execute)
+    assert len(calls) == 2 and "idempotent-replayed" not in fresh.headers
+    store.cache.clear()
+    assert (await store.run("k", "POST /x", "body", execute)).body == fresh.body
+    assert len(calls) == 2
+
+    async with SessionLocal() as session:
+        await session.execute(update(IdempotencyRecord).values(created_at=datetime.utcnow() - timedelta(minutes=5)))
+        await session.commit()
+    assert await store.purge_expired() == 1
+    await file_engine.dispose()
+
+@pytest.mark.asyncio
+async def test_availability_stream(async_client, monkeypatch):
+    monkeypatch.setattr(availability.hub, "interval", 0.01)
+    event_data = {
+        "name": "Watched Event",
+        "location": "Loc",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 30,
+        "timezone": "UTC"
+    }
+    event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+    assert (await async_client.get("/events/999999/availability/stream")).status_code == 404
+
+    async with TestingSessionLocal() as session:
+        response = await api_events.availability_stream(event_id, db=session)
+    stream = response.body_iterator
+    first = await anext(stream)
+    assert first.startswith(b"event: availability\ndata: ")
+    assert json.loads(first.split(b"data: ")[1]) == {"event_id": event_id, "registered": 0, "max_capacity": 30, "seats_left": 30}
+
+    # Single, bulk and duplicate registrations; only committed seats count.
+    # (One at a time: the in-memory test database is a single shared
+    # connection, so concurrent transactions would interleave on it.)
+    for i in range(20):
+        await async_client.post(f"/events/{event_id}/register", json={"name": "W", "email": f"w{i}@example.com"})
+    await async_client.post(f"/events/{event_id}/register", json={"name": "W", "email": "w0@example.com"})
+    await async_client.post(f"/events/{event_id}/register/bulk", json=[{"name": "B", "email": f"wb{i}@example.com"} for i in range(15)])
+    messages = []
+    while True:
+        try:
+            chunk = await asyncio.wait_for(anext(stream), 0.1)
+        except asyncio.TimeoutError:
+            break
+        messages.append(json.loads(chunk.split(b"data: ")[1]))
+    assert 1 <= len(messages) < 20
+    assert messages[-1] == {"event_id": event_id, "registered": 30, "max_capacity": 30, "seats_left": 0}
+    assert [m["registered"] for m in messages] == sorted(m["registered"] for m in messages)
+    await stream.aclose()
+    assert not availability.hub.watching(event_id)
+
+@pytest.mark.asyncio
+async def test_availability_websocket(async_client):
+    event_data = {
+        "name": "Watched Over WebSocket",
+        "location": "Loc",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 12,
+        "timezone": "UTC"
+    }
+    event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+
+    def watch():
+        # TestClient runs the app on its own loop, in this thread.
+        client = TestClient(app)
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect("/events/999999/availability/ws") as ws:
+                ws.receive_text()
+        with client.websocket_connect(f"/events/{event_id}/availability/ws") as ws:
+            message = json.loads(ws.receive_text())
+            assert availability.hub.watching(event_id)
+        return message
+
+    message = await asyncio.to_thread(watch)
+    assert message["event_id"] == event_id
+    assert (message["max_capacity"], message["registered"], message["seats_left"]) == (12, 0, 12)
+    assert not availability.hub.watching(event_id)
+
+@pytest.mark.asyncio
+async def test_archive_ended_events(async_client):
+    now = datetime.utcnow()
+    async with TestingSessionLocal() as session:
+        ended = [
+            Event(name=f"Ended {i}", location="Old Town", start_time=now - timedelta(days=10 - i, hours=2),
+                  end_time=now - timedelta(days=10 - i), max_capacity=50, registered_count=3)
+            for i in range(5)
+        ]
+        recent = Event(name="Ended Yesterday", location="Old Town", start_time=now - timedelta(hours=30),
+                       end_time=now - timedelta(hours=26), max_capacity=5, registered_count=0)
+        session.add_all(ended + [recent])
+        await session.flush()
+        session.add_all(Attendee(name="Past", email=f"past{i}@example.com", event_id=e.id) for e in ended for i in range(3))
+        # Created last, so it holds the newest ids and is never archived.
+        newest = Event(name="Ended Newest", location="Old Town", start_time=now - timedelta(days=5, hours=1),
+                       end_time=now - timedelta(days=5), max_capacity=5, registered_count=1)
+        session.add(newest)
+        await session.flush()
+        session.add(Attendee(name="Past", email="newest@example.com", event_id=newest.id))
+        await session.commit()
+        ended_ids = [e.id for e in ended]
+    upcoming_before = (await async_client.get("/events?limit=500&timezone=UTC")).json()["total"]
+    assert (await async_client.get(f"/events/{ended_ids[0]}.ics")).status_code == 200  # now cached
+
+    # Batches of at most 8 rows: one event (1 + 3 attendees) per transaction.
+    archiver = archive.Archiver(TestingSessionLocal, after=timedelta(days=2), max_rows=8, pause=0)
+    assert await archiver.run_once() == 5
+    assert await archiver.run_once() == 0
+    async with TestingSessionLocal() as session:
+        assert await session.scalar(select(func.count()).select_from(Event).where(Event.id.in_(ended_ids))) == 0
+        assert await session.scalar(select(func.count()).select_from(Attendee).where(Attendee.event_id.in_(ended_ids))) == 0
+        assert await session.get(Event, recent.id) is not None
+        assert await session.get(Event, newest.id) is not None
+        archived = await session.get(models.ArchivedEvent, ended_ids[0])
+        assert archived.created_at == ended[0].created_at is not None
+    assert (await async_client.get("/events?limit=500&timezone=UTC")).json()["total"] == upcoming_before
+
+    page = (await async_client.get("/archive/events?limit=3&timezone=UTC")).json()
+    assert page["total"] == 5
+    assert [e["name"] for e in page["events"]] == ["Ended 4", "Ended 3", "Ended 2"]
+    assert page["events"][0]["registered_count"] == 3
+    rest = (await async_client.get(f"/archive/events?limit=3&cursor={page['next_cursor']}")).json()
+    assert [e["name"] for e in rest["events"]] == ["Ended 1", "Ended 0"]
+    assert rest["next_cursor"] is None
+    event = (await async_client.get(f"/archive/events/{ended_ids[0]}")).json()
+    assert event["name"] == "Ended 0" and event["archived_at"]
+    attendees = (await async_client.get(f"/archive/events/{ended_ids[0]}/attendees?limit=2")).json()
+    assert attendees["total"] == 3
+    assert [a["email"] for a in attendees["attendees"]] == ["past0@example.com", "past1@example.com"]
+    assert (await async_client.get(f"/archive/events/{recent.id}")).status_code == 404
+    assert (await async_client.get(f"/events/{ended_ids[0]}/attendees")).json()["attendees"] == []
+    assert (await async_client.get(f"/events/{ended_ids[0]}.ics")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_registration_admission_control(async_client, monkeypatch):
+    event_data = {
+        "name": "Celebrity Event",
+        "location": "Arena",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 2,
+        "timezone": "UTC"
+    }
+    event_id = (await async_client.post("/events", json=event_data)).json()["id"]
+    control = AdmissionControl(max_concurrency=1, event_concurrency=1, queue_size=2, queue_timeout=5, retry_after=2)
+    monkeypatch.setattr(api_events, "admission_control", control)
+
+    responses = await asyncio.gather(*(
+        async_client.post(f"/events/{event_id}/register", json={"name": "Fan", "email": f"fan{i}@example.com"})
+        for i in range(8)
+    ))
+    statuses = sorted(r.status_code for r in responses)
+    # One runs, two queue (the last of those finds the event full), five are shed.
+    assert statuses == [200, 200, 400, 429, 429, 429, 429, 429]
+    shed = [r for r in responses if r.status_code == 429]
+    assert all(r.headers["retry-after"] == "2" for r in shed)
+    assert control.in_flight == 0 and control.waiting() == 0
+
+    # The event is now known to be full: answered without touching the database.
+    full = await async_client.post(f"/events/{event_id}/register", json={"name": "Fan", "email": "late@example.com"})
+    assert full.status_code == 400 and full.json()["detail"] == "Event is full."
+    assert full.headers["x-db-statements"] == "0"
+
+    # A shed request is not stored under its Idempotency-Key; the retry runs.
+    other_id = (await async_client.post("/events", json={**event_data, "name": "Quiet Event", "max_capacity": 5})).json()["id"]
+    async with control.admit(other_id):
+        control.queue_size = 0
+        headers = {"Idempotency-Key": "shed-then-retry"}
+        first = await async_client.post(f"/events/{other_id}/register", json={"name": "Fan", "email": "retry@example.com"}, headers=headers)
+        assert first.status_code == 429
+    retry = await async_client.post(f"/events/{other_id}/register", json={"name": "Fan", "email": "retry@example.com"}, headers=headers)
+    assert retry.status_code == 200 and "idempotent-replayed" not in retry.headers
+
+@pytest.mark.asyncio
+async def test_hold_confirms_are_admitted(async_client, monkeypatch):
+    event_id = (await async_client.post("/events", json={
+        "name": "Confirm Surge",
+        "location": "Arena",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 2,
+        "timezone": "UTC"
+    })).json()["id"]
+    control = AdmissionControl(max_concurrency=1, event_concurrency=1, queue_size=0, retry_after=2)
+    monkeypatch.setattr(api_events, "admission_control", control)
+    hold_id = (await async_client.post(f"/events/{event_id}/holds")).json()["hold_id"]
+
+    # With every slot taken, the confirm is shed and keeps its hold.
+    async with control.admit(event_id):
+        shed = await async_client.post(f"/events/{event_id}/holds/{hold_id}/confirm", json={"name": "C", "email": "c@example.com"})
+    assert shed.status_code == 429 and shed.headers["retry-after"] == "2"
+    confirmed = await async_client.post(f"/events/{event_id}/holds/{hold_id}/confirm", json={"name": "C", "email": "c@example.com"})
+    assert confirmed.status_code == 200
+    assert control.in_flight == 0
+
+    # A confirm the database finds full marks the event full in memory.
+    hold_id = (await async_client.post(f"/events/{event_id}/holds")).json()["hold_id"]
+    async with TestingSessionLocal() as session:
+        await session.execute(update(Event).where(Event.id == event_id).values(registered_count=2))
+        await session.commit()
+    sold = await async_client.post(f"/events/{event_id}/holds/{hold_id}/confirm", json={"name": "D", "email": "d@example.com"})
+    assert sold.status_code == 400 and sold.json()["detail"] == "Event is full."
+    assert control.is_full(event_id)
+
+@pytest.mark.asyncio
+async def test_shared_seat_table(async_client, monkeypatch, tmp_path):
+    # This process plays one worker; `other` is a second worker's mapping of
+    # the same table.
+    path = str(tmp_path / "seats.bin")
+    table, other = SharedSeats(path, slots=1024), SharedSeats(path, slots=1024)
+    for module in (api_events, availability, crud):
+        monkeypatch.setattr(module, "shared_seats", table)
+    monkeypatch.setattr(api_events, "admission_control", AdmissionControl())
+
+    listing = (await async_client.get("/events?limit=1000&timezone=UTC")).json()
+    event_id = (await async_client.post("/events", json={
+        "name": "Shared Event",
+        "location": "Everywhere",
+        "start_time": (datetime.now() + timedelta(hours=1)).isoformat(),
+        "end_time": (datetime.now() + timedelta(hours=2)).isoformat(),
+        "max_capacity": 2,
+        "timezone": "UTC"
+    })).json()["id"]
+    assert other.events_changed()  # the other worker drops its cached listings
+
+    unknown = await async_client.get(f"/events/{event_id}/availability")
+    assert unknown.json() == {"event_id": event_id, "registered": 0, "max_capacity": 2, "seats_left": 2}
+    assert unknown.headers["x-db-statements"] == "1"
+    for i in range(2):
+        assert (await async_client.post(f"/events/{event_id}/register", json={"name": "S", "email": f"s{i}@example.com"})).status_code == 200
+    # Committed counts are visible to every worker, with no query.
+    assert other.get(event_id) == (2, 2)
+    known = await async_client.get(f"/events/{event_id}/availability")
+    assert known.json()["seats_left"] == 0
+    assert known.headers["x-db-statements"] == "0"
+
+    # A worker that never saw this event refuses registrations from the table.
+    monkeypatch.setattr(api_events, "admission_control", AdmissionControl())
+    full = await async_client.post(f"/events/{event_id}/register", json={"name": "S", "email": "late@example.com"})
+    assert full.status_code == 400 and full.json()["detail"] == "Event is full."
+    assert full.headers["x-db-statements"] == "0"
+    assert (await async_client.get("/events/999999/availability")).status_code == 404
+    assert len(listing["events"]) + 1 == len((await async_client.get("/events?limit=1000&timezone=UTC")).json()["events"])
+
+    # Events created by another worker also drop the cached calendar feed.
+    etag = (await async_client.get("/events.ics")).headers["etag"]
+    assert (await async_client.get("/events.ics", headers={"If-None-Match": etag})).headers["x-db-statements"] == "0"
+    other.note_events_changed()
+    rebuilt = await async_client.get("/events.ics", headers={"If-None-Match": etag})
+    assert rebuilt.status_code == 304 and rebuilt.headers["x-db-statements"] != "0"
+    table.close()
+    other.close()
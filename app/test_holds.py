@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.holds import SeatHolds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def seats(n):
+    async def load():
+        return n
+    return load
+
+
+@pytest.mark.asyncio
+async def test_acquire_release_and_capacity():
+    holds = SeatHolds(ttl=60, clock=FakeClock())
+    first = await holds.acquire(1, seats(2))
+    second = await holds.acquire(1, seats(99))  # ledger already loaded
+    assert first and second and first.hold_id != second.hold_id
+    assert await holds.acquire(1, seats(99)) is False
+    assert holds.release(1, first.hold_id)
+    assert not holds.release(1, first.hold_id)
+    assert await holds.acquire(1, seats(99))
+    assert await holds.acquire(2, seats(None)) is None
+
+
+@pytest.mark.asyncio
+async def test_expired_holds_are_reclaimed():
+    clock = FakeClock()
+    holds = SeatHolds(ttl=10, clock=clock)
+    early = await holds.acquire(1, seats(2))
+    clock.now = 5
+    late = await holds.acquire(1, seats(2))
+    assert await holds.acquire(1, seats(2)) is False
+    clock.now = 10
+    assert holds.take(1, early.hold_id) is None
+    assert holds.expire() == 0  # already reclaimed by take()
+    clock.now = 15
+    assert holds.expire() == 1
+    assert holds.take(1, late.hold_id) is None
+    # Nothing left, so the ledger is dropped and reloaded on the next hold.
+    assert holds.ledgers == {}
+    assert await holds.acquire(1, seats(0)) is False
+
+
+@pytest.mark.asyncio
+async def test_take_restore_settle_and_claims():
+    holds = SeatHolds(ttl=10, clock=FakeClock())
+    hold = await holds.acquire(1, seats(4))
+    other = await holds.acquire(1, seats(4))
+    taken = holds.take(1, hold.hold_id)
+    assert taken == hold and holds.take(1, hold.hold_id) is None
+    holds.restore(taken)
+    assert holds.take(1, hold.hold_id) == hold
+    holds.settle(1, used=1)
+    assert holds.claim(1, 5) == 2  # direct registrations get what is left
+    holds.settle(1, used=1, claimed=2)
+    assert holds.ledgers[1].free == 1
+    # Once the last hold is gone the database decides alone again.
+    assert holds.release(1, other.hold_id)
+    assert holds.active_holds() == 0 and holds.ledgers == {}
+    assert holds.claim(1) is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_holds_share_one_load():
+    holds = SeatHolds(ttl=10)
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+        return 3
+
+    results = await asyncio.gather(*(holds.acquire(7, load) for _ in range(10)))
+    assert loads == 1
+    assert sum(1 for r in results if r) == 3
+    assert sum(1 for r in results if r is False) == 7
+
+
+@pytest.mark.asyncio
+async def test_sweeper_wakes_for_earlier_holds():
+    holds = SeatHolds(ttl=0.05)
+    await holds.start()
+    try:
+        hold = await holds.acquire(1, seats(1))
+        assert holds.active_holds() == 1
+        await asyncio.sleep(0.15)
+        assert holds.active_holds() == 0
+        assert holds.take(1, hold.hold_id) is None
+    finally:
+        await holds.stop()
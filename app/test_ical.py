@@ -0,0 +1,45 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app import ical
+
+
+def test_escape_text():
+    assert ical.escape_text("a\\b;c,d\ne\r\nf") == r"a\\b\;c\,d\ne\nf"
+
+
+def test_fold_long_lines_at_75_octets():
+    assert ical.fold("SUMMARY:short") == b"SUMMARY:short\r\n"
+    folded = ical.fold("SUMMARY:" + "x" * 200)
+    lines = folded.split(b"\r\n")
+    assert lines[-1] == b""
+    assert all(len(line) <= 75 for line in lines)
+    assert all(line.startswith(b" ") for line in lines[1:-1])
+    assert b"".join(line[1:] if i else line for i, line in enumerate(lines[:-1])) == b"SUMMARY:" + b"x" * 200
+
+
+def test_fold_keeps_utf8_sequences_whole():
+    line = "SUMMARY:" + "é" * 100  # two octets each, so a cut lands mid-character
+    lines = ical.fold(line).split(b"\r\n")[:-1]
+    assert all(len(l) <= 75 for l in lines)
+    for l in lines:
+        l.decode()  # every physical line is valid UTF-8 on its own
+    assert b"".join(l[1:] if i else l for i, l in enumerate(lines)).decode() == line
+
+
+def test_render_event():
+    event = SimpleNamespace(
+        id=7, name="Launch, v2; live", location="Hall 1",
+        start_time=datetime(2030, 1, 2, 3, 4, 5, 678000), end_time=datetime(2030, 1, 2, 5, 0),
+        created_at=datetime(2029, 6, 7, 8, 9, 10, 500),
+    )
+    body = ical.calendar([ical.render_event(event)])
+    assert body.startswith(b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+    assert body.endswith(b"END:VEVENT\r\nEND:VCALENDAR\r\n")
+    assert b"\r\nUID:event-7@event-management-system\r\n" in body
+    assert b"\r\nDTSTAMP:20290607T080910Z\r\nDTSTART:20300102T030405Z\r\nDTEND:20300102T050000Z\r\n" in body
+    assert b"\r\nSUMMARY:Launch\\, v2\\; live\r\n" in body
+    # Rendering depends only on the row, so every worker agrees on ETags.
+    assert ical.calendar([ical.render_event(event)]) == body
+    event.created_at = None
+    assert b"\r\nDTSTAMP:19700101T000000Z\r\n" in ical.render_event(event)
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import text
+
+from app.database import make_engine
+from app.metrics import POOL_CHECKOUT_WAIT, Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "/x")
+    lines = list(histogram.render())
+    assert 'test_seconds_bucket{route="/x",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{route="/x"} 4' in lines
+    assert 'test_seconds_sum{route="/x"} 6.05' in lines
+
+
+@pytest.mark.asyncio
+async def test_pool_checkout_wait_recorded(tmp_path):
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}")
+    before = POOL_CHECKOUT_WAIT.count("write")
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    assert POOL_CHECKOUT_WAIT.count("write") == before + 1
+    await engine.dispose()
@@ -0,0 +1,174 @@
+import inspect
+import re
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.database import Base
+from app.models import Attendee, Event
+
+# Runs every query issued by crud.py against a seeded database and fails if
+# SQLite plans any of them as a full table scan ("SCAN <table>" without an
+# index), or if a paged listing sorts its whole result instead of walking an
+# index in order. Add a driver below for every new public function in
+# crud.py; "name:variant" keys exercise another branch of the same function.
+
+TABLE_SCAN = re.compile(r"^SCAN (\w+)$")
+FULL_SORT = "USE TEMP B-TREE FOR ORDER BY"
+# Pages of these must cost the same at any depth, so no full sort.
+PAGED_LISTINGS = (
+    "get_upcoming_events", "get_attendees", "get_registrations_by_email",
+    "get_archived_events", "get_archived_attendees",
+)
+CTE = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\w+)$")
+
+def _upcoming_cursor():
+    return (datetime.utcnow() + timedelta(days=3), 150)
+
+DRIVERS = {
+    "create_event": lambda db: crud.create_event(db, schemas.EventCreate(
+        name="Plan Event",
+        location="Plan City",
+        start_time=datetime.now() + timedelta(days=1),
+        end_time=datetime.now() + timedelta(days=2),
+        max_capacity=10,
+        timezone="UTC",
+    )),
+    "create_events_bulk": lambda db: crud.create_events_bulk(db, [
+        schemas.EventCreate(
+            name=f"Plan Bulk {i}",
+            location="Plan City",
+            start_time=datetime.now() + timedelta(days=1),
+            end_time=datetime.now() + timedelta(days=2),
+            max_capacity=10,
+            timezone="UTC",
+        ) for i in range(5)
+    ]),
+    "get_upcoming_events": lambda db: crud.get_upcoming_events(db, skip=10, limit=20),
+    "get_upcoming_events:cursor": lambda db: crud.get_upcoming_events(db, limit=20, after=_upcoming_cursor()),
+    "get_upcoming_events:window": lambda db: crud.get_upcoming_events(
+        db, limit=20, start=datetime.utcnow() + timedelta(days=2), end=datetime.utcnow() + timedelta(days=4)),
+    "get_upcoming_events:seats": lambda db: crud.get_upcoming_events(db, limit=20, include_seats=True),
+    "get_upcoming_events:location": lambda db: crud.get_upcoming_events(db, limit=20, location="City 3"),
+    "get_upcoming_events:window_location_cursor": lambda db: crud.get_upcoming_events(
+        db, limit=20, after=_upcoming_cursor(), end=datetime.utcnow() + timedelta(days=7), location="City 3"),
+    "get_event_calendar": lambda db: crud.get_event_calendar(db, [
+        (day.date(), day, day + timedelta(days=1))
+        for day in (datetime(2030, 1, 1) + timedelta(days=i) for i in range(7))
+    ], location="City 3"),
+    "get_event_calendar:all_locations": lambda db: crud.get_event_calendar(db, [
+        (datetime.utcnow().date(), datetime.utcnow(), datetime.utcnow() + timedelta(days=1)),
+    ]),
+    "get_feed_events": lambda db: crud.get_feed_events(db, limit=50),
+    "next_event_end": lambda db: crud.next_event_end(db),
+    "search_events": lambda db: crud.search_events(db, "city 1", skip=5, limit=10),
+    "search_events:cursor": lambda db: _search_after(db, "event", (-0.5, 150)),
+    "register_attendee": lambda db: crud.register_attendee(db, 150, schemas.AttendeeCreate(name="P", email="plan@example.com")),
+    "register_attendee:missing_event": lambda db: crud.register_attendee(db, 999999, schemas.AttendeeCreate(name="P", email="plan@example.com")),
+    "register_attendees_batch": lambda db: crud.register_attendees_batch(db, 151, [
+        schemas.AttendeeCreate(name="P", email=f"batch{i}@example.com") for i in range(5)
+    ]),
+    "register_attendees_bulk": lambda db: crud.register_attendees_bulk(db, 152, [
+        schemas.AttendeeCreate(name="P", email=f"bulk{i}@example.com") for i in range(5)
+    ]),
+    "get_attendees": lambda db: crud.get_attendees(db, 150, skip=5, limit=10),
+    "get_attendees:cursor": lambda db: crud.get_attendees(db, 150, limit=10, after=100),
+    "get_registrations_by_email": lambda db: crud.get_registrations_by_email(db, "a150@example.com", skip=0, limit=10),
+    "get_registrations_by_email:cursor": lambda db: crud.get_registrations_by_email(db, "a150@example.com", limit=10, after=120),
+    "get_event": lambda db: crud.get_event(db, 150),
+    "stream_attendees": lambda db: _drain(crud.stream_attendees(db, 150, chunk_size=50)),
+    "archive_ended_events": lambda db: crud.archive_ended_events(db, datetime.utcnow(), max_events=50),
+    "get_archived_events": lambda db: crud.get_archived_events(db, skip=5, limit=10),
+    "get_archived_events:cursor": lambda db: crud.get_archived_events(db, limit=10, after=(datetime.utcnow() - timedelta(days=1), 50)),
+    "get_archived_event": lambda db: crud.get_archived_event(db, 50),
+    "get_archived_attendees": lambda db: crud.get_archived_attendees(db, 50, skip=5, limit=10),
+    "get_archived_attendees:cursor": lambda db: crud.get_archived_attendees(db, 50, limit=10, after=100),
+    "get_event_stats": lambda db: crud.get_event_stats(db, 150, hours=48),
+    "rebuild_event_stats": lambda db: crud.rebuild_event_stats(db, after_id=100, max_events=50),
+    "get_idempotency_record": lambda db: crud.get_idempotency_record(db, "POST /events k1", not_before=datetime.utcnow() - timedelta(days=1)),
+    "save_idempotency_record": lambda db: crud.save_idempotency_record(db, "POST /events k2", "{}", 201, b"{}", expired_before=datetime.utcnow() - timedelta(days=1)),
+    "purge_idempotency_records": lambda db: crud.purge_idempotency_records(db, before=datetime.utcnow() - timedelta(days=1)),
+}
+
+async def _search_after(db, q, after):
+    # A cursor issued against the current corpus, so the page query runs.
+    return await crud.search_events(db, q, limit=10, after=(*after, await crud._search_corpus_version(db)))
+
+async def _drain(iterator):
+    async for _ in iterator:
+        pass
+
+@pytest_asyncio.fixture
+async def seeded(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        now = datetime.utcnow()
+        await conn.execute(insert(Event), [
+            {
+                "id": i,
+                "name": f"Event {i}",
+                "location": f"City {i % 20}",
+                # Ids below 100 have already ended.
+                "start_time": now + timedelta(hours=i - 100),
+                "end_time": now + timedelta(hours=i - 99),
+                "max_capacity": 500,
+                "registered_count": 0,
+            }
+            for i in range(1, 301)
+        ])
+        await conn.execute(insert(Attendee), [
+            {"name": f"A{i}", "email": f"a{i}@example.com", "event_id": 100 + i % 100}
+            for i in range(5000)
+        ])
+        # Plan with statistics, as a long-running database has them; without
+        # them SQLite guesses row counts and can pick a different index.
+        await conn.exec_driver_sql("ANALYZE")
+    yield engine
+    await engine.dispose()
+
+def test_every_crud_function_has_a_driver():
+    public = {
+        name for name, fn in inspect.getmembers(crud, inspect.isfunction)
+        if not name.startswith("_") and fn.__module__ == crud.__name__
+        and (inspect.iscoroutinefunction(fn) or inspect.isasyncgenfunction(fn))
+    }
+    covered = {driver.split(":")[0] for driver in DRIVERS}
+    assert public <= covered, f"No query-plan driver for: {sorted(public - covered)}"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("driver", sorted(DRIVERS))
+async def test_crud_queries_use_indexes(seeded, driver):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")):
+            statements.append((statement, parameters))
+
+    event.listen(seeded.sync_engine, "before_cursor_execute", capture)
+    try:
+        session_factory = sessionmaker(bind=seeded, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as db:
+            await DRIVERS[driver](db)
+    finally:
+        event.remove(seeded.sync_engine, "before_cursor_execute", capture)
+    assert statements, f"{driver} issued no queries"
+
+    scans, sorts = [], []
+    async with seeded.connect() as conn:
+        for statement, parameters in statements:
+            plan = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+            details = [row[-1] for row in plan]
+            # Scanning a CTE of constant rows (e.g. the calendar's days) is fine.
+            ctes = {m.group(1) for m in map(CTE.match, details) if m}
+            if any((m := TABLE_SCAN.match(detail)) and m.group(1) not in ctes for detail in details):
+                scans.append(f"{statement}\n  -> {details}")
+            if driver.split(":")[0] in PAGED_LISTINGS and FULL_SORT in details:
+                sorts.append(f"{statement}\n  -> {details}")
+    assert not scans, "Table scans in hot queries:\n" + "\n".join(scans)
+    assert not sorts, "Listing pages sorted in full:\n" + "\n".join(sorts)
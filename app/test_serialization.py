@@ -0,0 +1,45 @@
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import schemas, serialization
+
+TRICKY = ["plain", "quote \" and \\ backslash", "tab\tnewline\n", "\x00\x1f\x7f", "Mumbaí 東京 😀", "  ", ""]
+
+
+def event_page():
+    return {
+        "total": 3,
+        "skip": 0,
+        "limit": 2,
+        "next_cursor": "eyJ2IjpbXX0",
+        "events": [
+            {"id": i, "name": name, "location": name[::-1], "start_time": "2030-01-01T10:00:00+05:30",
+             "end_time": "2030-01-01T12:00:00+05:30", "max_capacity": 10 ** 12}
+            for i, name in enumerate(TRICKY)
+        ],
+    }
+
+
+def attendee_page():
+    return {
+        "total": None,
+        "skip": 0,
+        "limit": 100,
+        "next_cursor": None,
+        "attendees": [
+            {"id": i, "name": name, "email": f"a{i}@example.com", "event_id": 1,
+             "event_start_time": "2030-01-01T04:30:00+00:00", "event_end_time": None}
+            for i, name in enumerate(TRICKY)
+        ],
+    }
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_matches_validated_response(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    for model, data in ((schemas.EventPagination, event_page()), (schemas.AttendeePagination, attendee_page())):
+        assert serialization.dumps(data) == JSONResponse(jsonable_encoder(model(**data))).body
@@ -0,0 +1,51 @@
+import multiprocessing
+
+from app.shared_seats import SharedSeats
+
+
+def _register_in_child(path: str) -> None:
+    table = SharedSeats(path, slots=64)
+    for registered in range(1, 6):
+        table.record(7, registered, 5)
+    table.note_events_changed()
+    table.close()
+
+
+def test_counts_are_shared_between_processes(tmp_path):
+    path = str(tmp_path / "seats.bin")
+    table = SharedSeats(path, slots=64)
+    assert table.get(7) is None and not table.is_full(7)
+    child = multiprocessing.get_context("fork").Process(target=_register_in_child, args=(path,))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+    assert table.get(7) == (5, 5)
+    assert table.is_full(7)
+    assert table.events_changed()
+    assert not table.events_changed()  # reported once
+    table.close()
+
+
+def test_counts_only_grow(tmp_path):
+    table = SharedSeats(str(tmp_path / "seats.bin"), slots=64)
+    table.record(3, 10, 50)
+    table.record(3, 4, 50)  # a late report from another worker
+    assert table.get(3) == (10, 50)
+    table.record(3, 0, 50)
+    assert table.get(3) == (10, 50)
+    table.forget([3])
+    assert table.get(3) is None
+    table.record(3, 0, 50)  # a known empty event is not "unknown"
+    assert table.get(3) == (0, 50)
+    table.close()
+
+
+def test_untracked_events(tmp_path):
+    table = SharedSeats(str(tmp_path / "seats.bin"), slots=64)
+    for event_id in (0, 64, 1000):
+        table.record(event_id, 1, 1)
+        assert table.get(event_id) is None
+    table.record(5, 1, 1 << 40)  # capacity too large to pack
+    assert table.get(5) is None
+    assert not table.events_changed()
+    table.close()
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+from pytz import UTC, timezone as pytz_timezone
+
+from app import timezones
+
+
+def test_is_valid_timezone():
+    assert timezones.is_valid_timezone("Asia/Kolkata")
+    assert timezones.is_valid_timezone("UTC")
+    assert not timezones.is_valid_timezone("Mars/Olympus_Mons")
+    assert not timezones.is_valid_timezone(None)
+
+
+def test_converter_matches_pytz_across_dst():
+    # Hourly steps across both 2025 US DST transitions, plus microseconds and
+    # a historic LMT offset with seconds.
+    start = datetime(2025, 3, 8, 0, 0, 0, 123456)
+    dts = [start + timedelta(hours=h) for h in range(24 * 250)] + [datetime(1850, 1, 1)]
+    for name in ["America/New_York", "Asia/Kolkata", "Europe/London", "UTC", "Etc/GMT+5"]:
+        tz = pytz_timezone(name)
+        expected = [UTC.localize(dt).astimezone(tz).isoformat() for dt in dts]
+        converter = timezones.get_converter(name)
+        assert converter.isoformat_many(dts) == expected
+        assert converter.isoformat_many(reversed(dts)) == expected[::-1]
+        assert [converter.isoformat(dt) for dt in dts] == expected
@@ -0,0 +1,73 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta, tzinfo
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+import pytz
+from pytz import UTC, all_timezones
+
+# Timezone helpers shared by the API, schemas and CRUD layers.
+
+# pytz.all_timezones is a lazy list, so `name in all_timezones` is a linear
+# scan; a frozenset makes validation O(1).
+VALID_TIMEZONES = frozenset(all_timezones)
+
+def is_valid_timezone(name: str) -> bool:
+    return name in VALID_TIMEZONES
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> tzinfo:
+    return pytz.timezone(name)
+
+class IsoConverter:
+    """Formats naive UTC datetimes as ISO strings in one timezone.
+
+    The output is identical to ``UTC.localize(dt).astimezone(tz).isoformat()``.
+    The UTC offset and its rendered suffix are computed once per DST
+    transition interval and reused for every datetime that falls into it.
+    """
+
+    def __init__(self, tz: tzinfo):
+        self.tz = tz
+        # Fixed-offset zones (UTC, Etc/GMT+5, ...) have a single interval.
+        self._transitions = getattr(tz, "_utc_transition_times", None) or []
+        self._intervals: Dict[int, Tuple[timedelta, str]] = {}
+
+    def _interval(self, dt: datetime) -> Tuple[timedelta, str]:
+        index = bisect_right(self._transitions, dt)
+        interval = self._intervals.get(index)
+        if interval is None:
+            local = UTC.localize(dt).astimezone(self.tz)
+            suffix = local.isoformat()[len(local.replace(tzinfo=None).isoformat()):]
+            interval = self._intervals[index] = (local.utcoffset(), suffix)
+        return interval
+
+    def isoformat(self, dt: datetime) -> str:
+        offset, suffix = self._interval(dt)
+        return (dt + offset).isoformat() + suffix
+
+    def isoformat_many(self, dts: Iterable[datetime]) -> List[str]:
+        # One pass over a column; rows in the same interval as the previous
+        # row skip the transition lookup entirely.
+        result = []
+        lo = hi = None
+        offset = suffix = None
+        for dt in dts:
+            if lo is None or not (lo <= dt < hi):
+                offset, suffix = self._interval(dt)
+                index = bisect_right(self._transitions, dt)
+                lo = self._transitions[index - 1] if index else datetime.min
+                hi = self._transitions[index] if index < len(self._transitions) else datetime.max
+            result.append((dt + offset).isoformat() + suffix)
+        return result
+
+def to_utc(dt: datetime, name: str) -> datetime:
+    # Naive datetimes are wall-clock times in `name`; aware ones keep their
+    # own offset. Returns naive UTC, as stored in the database.
+    if dt.tzinfo is None:
+        dt = get_timezone(name).localize(dt)
+    return dt.astimezone(UTC).replace(tzinfo=None)
+
+@lru_cache(maxsize=None)
+def get_converter(name: str) -> IsoConverter:
+    return IsoConverter(get_timezone(name))
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+
+from . import crud, models, schemas
+from .config import settings
+from .database import AsyncSessionLocal
+from .metrics import Histogram, register
+
+# Group commit for single registrations. SQLite has one writer at a time, so
+# during a ticket drop hundreds of register requests each opening their own
+# transaction mostly wait on the database lock. With WRITE_BATCHING on, the
+# register endpoint hands its request to one writer task instead; the task
+# collects whatever arrives within a short window (or max_batch items),
+# applies the capacity and duplicate rules for all of them in one
+# transaction via crud.register_attendees_batch, commits once and resolves
+# each caller with the same result crud.register_attendee would have given:
+# the Attendee, None (duplicate or unknown event) or False (event full).
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = register(Histogram(
+    "registration_writer_batch_size", "Registrations committed per group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+))
+
+Outcome = Union[models.Attendee, None, bool]
+_Pending = Tuple[int, schemas.AttendeeCreate, asyncio.Future]
+
+class RegistrationWriter:
+    def __init__(self, session_factory, max_batch: int = 256, window: float = 0.002):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.window = window
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        # Finishes everything already queued, then exits.
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def submit(self, event_id: int, attendee: schemas.AttendeeCreate) -> Outcome:
+        if not self.running:
+            raise RuntimeError("Registration writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((event_id, attendee, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        BATCH_SIZE.observe(len(batch))
+        # Keep arrival order within each event, so the earliest request wins
+        # the last seat or a contested email, as it would unbatched.
+        by_event: Dict[int, List[_Pending]] = {}
+        for pending in batch:
+            by_event.setdefault(pending[0], []).append(pending)
+        outcomes: List[Tuple[asyncio.Future, Outcome]] = []
+        try:
+            async with self.session_factory() as db:
+                for event_id, items in by_event.items():
+                    results = await crud.register_attendees_batch(db, event_id, [a for _, a, _ in items])
+                    if results is None:
+                        outcomes.extend((future, None) for _, _, future in items)
+                        continue
+                    for (_, _, future), (status, row) in zip(items, results):
+                        outcomes.append((future, row if status == "created" else (False if status == "full" else None)))
+                await db.commit()
+        except Exception:
+            # Don't let one bad request fail everyone it was batched with:
+            # fall back to registering each on its own.
+            logger.exception("Group commit of %d registrations failed; retrying individually", len(batch))
+            await self._flush_individually(batch)
+            return
+        for future, outcome in outcomes:
+            if not future.done():
+                future.set_result(outcome)
+
+    async def _flush_individually(self, batch: List[_Pending]) -> None:
+        for event_id, attendee, future in batch:
+            try:
+                async with self.session_factory() as db:
+                    outcome = await crud.register_attendee(db, event_id, attendee)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+                continue
+            if not future.done():
+                future.set_result(outcome)
+
+registration_writer = RegistrationWriter(
+    AsyncSessionLocal,
+    max_batch=settings.write_batch_max,
+    window=settings.write_batch_window_ms / 1000,
+)
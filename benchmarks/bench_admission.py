@@ -0,0 +1,114 @@
+"""Read latency during a registration surge, with and without admission control.
+
+Starts a uvicorn server on a seeded database, then offers an open-loop
+load: registrations for one event arriving at a fixed rate, whether or not
+earlier ones have finished, as during an on-sale, plus a steady trickle of reads (the /events listing and uncached
+attendee pages). Reports read latency and how registrations were answered.
+The run is repeated with admission control effectively off.
+
+    python -m benchmarks.bench_admission --rate 100 --seconds 8
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from .run import _free_port, percentile
+from .seed import seed
+
+OFF = {
+    "ADMISSION_MAX_CONCURRENCY": "1000000",
+    "ADMISSION_EVENT_CONCURRENCY": "1000000",
+    "ADMISSION_FULL_TTL_SECONDS": "0",
+}
+
+
+async def _offer(client, rate: float, seconds: float, send) -> list:
+    # Starts send(i) every 1/rate seconds without waiting for earlier ones.
+    tasks = []
+    start = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(i)))
+    return await asyncio.gather(*tasks)
+
+
+async def _timed(coro):
+    t0 = time.perf_counter()
+    try:
+        response = await coro
+        return time.perf_counter() - t0, response.status_code
+    except httpx.HTTPError as exc:
+        return time.perf_counter() - t0, type(exc).__name__
+
+
+async def _measure(port: int, info, rate: float, seconds: float, read_rate: float):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30, limits=limits) as client:
+        for _ in range(100):
+            try:
+                await client.get("/")
+                break
+            except httpx.HTTPError:
+                await asyncio.sleep(0.1)
+
+        def register(i):
+            return _timed(client.post(f"/events/{info.surge_event_id}/register", json={"name": "Fan", "email": f"fan{i}@example.com"}))
+
+        def read(i):
+            if i % 2:
+                return _timed(client.get("/events", params={"limit": 20, "skip": 20 * (i % 5)}))
+            return _timed(client.get(f"/events/{info.upcoming_ids[1 + i % 50]}/attendees", params={"limit": 20}))
+
+        idle_reads = await _offer(client, read_rate, 2, read)
+        writes, reads = await asyncio.gather(_offer(client, rate, seconds, register), _offer(client, read_rate, seconds, read))
+    return idle_reads, writes, reads
+
+
+def _line(label: str, results) -> str:
+    latencies = sorted(t for t, _ in results)
+    statuses = Counter(status for _, status in results)
+    return (f"{label:<26} p50 {percentile(latencies, 0.5) * 1000:>8.1f} ms  p95 {percentile(latencies, 0.95) * 1000:>8.1f} ms  "
+            f"p99 {percentile(latencies, 0.99) * 1000:>8.1f} ms  {dict(sorted(statuses.items(), key=str))}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=100, help="registrations offered per second")
+    parser.add_argument("--read-rate", type=float, default=20, help="reads per second")
+    parser.add_argument("--seconds", type=float, default=8)
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--attendees", type=int, default=200_000)
+    parser.add_argument("--seats", type=int, default=100_000, help="free seats on the surge event")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, overrides in (("admission control", {}), ("no admission control", OFF)):
+            info = seed(os.path.join(tmp, f"bench-{len(overrides)}.db"), args.events, args.attendees, surge_capacity=args.seats)
+            port = _free_port()
+            env = dict(os.environ, APP_ENV="prod", DATABASE_URL=f"sqlite+aiosqlite:///{info.path}", **overrides)
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+                env=env,
+            )
+            try:
+                idle_reads, writes, reads = asyncio.run(_measure(port, info, args.rate, args.seconds, args.read_rate))
+            finally:
+                server.terminate()
+                server.wait()
+            print(f"== {label}")
+            print(_line("reads, idle", idle_reads))
+            print(_line("reads during surge", reads))
+            print(_line("registrations", writes))
+
+
+if __name__ == "__main__":
+    main()
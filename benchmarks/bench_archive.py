@@ -0,0 +1,121 @@
+"""Archiving throughput and its effect on live registrations.
+
+Seeds a throwaway SQLite file with ended events (with attendees) and a set
+of upcoming ones, then archives everything while a client keeps
+registering for upcoming events. Reports archive throughput, registration
+latency with and without the archiver running, and the hot table sizes
+before and after.
+
+    python -m benchmarks.bench_archive --ended 20000 --attendees-per-event 50
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.archive import Archiver
+
+from .seed import create_schema, insert_rows
+
+UPCOMING = 1000
+
+
+def _seed(path: str, ended: int, per_event: int) -> None:
+    now = datetime.utcnow()
+    conn = sqlite3.connect(path)
+    insert_rows(
+        conn, models.Event.__table__,
+        ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"),
+        [
+            (i, f"Event {i}", "City", now - timedelta(days=400 - i * 365 / ended, hours=2),
+             now - timedelta(days=400 - i * 365 / ended), per_event, per_event)
+            for i in range(1, ended + 1)
+        ] + [
+            (i, f"Event {i}", "City", now + timedelta(days=1 + i % 60),
+             now + timedelta(days=1 + i % 60, hours=2), 10 ** 6, 0)
+            for i in range(ended + 1, ended + UPCOMING + 1)
+        ],
+    )
+    insert_rows(
+        conn, models.Attendee.__table__, ("name", "email", "event_id"),
+        (("A", f"a{j}@example.com", i) for i in range(1, ended + 1) for j in range(per_event)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _counts(path: str):
+    conn = sqlite3.connect(path)
+    counts = [conn.execute(f"SELECT count(*) FROM {t}").fetchone()[0] for t in ("events", "attendees", "events_archive", "attendees_archive")]
+    conn.close()
+    return counts
+
+
+async def _register(factory, first_upcoming: int, stop: asyncio.Event, latencies: list) -> None:
+    n = 0
+    while not stop.is_set():
+        n += 1
+        async with factory() as db:
+            t0 = time.perf_counter()
+            await crud.register_attendee(db, first_upcoming + n % UPCOMING, schemas.AttendeeCreate(name="Live", email=f"live{n}@example.com"))
+            latencies.append(time.perf_counter() - t0)
+
+
+def _summary(latencies) -> str:
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    return f"p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {latencies[-1] * 1000:.2f} ms ({len(latencies)} registrations)"
+
+
+async def run(ended: int, per_event: int, batch_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        url = await create_schema(path)
+        _seed(path, ended, per_event)
+        engine = create_async_engine(url, connect_args={"timeout": 30})
+        factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        print(f"before:  events {{}} attendees {{}} | archive: events {{}} attendees {{}}".format(*_counts(path)))
+
+        stop = asyncio.Event()
+        baseline = []
+        task = asyncio.create_task(_register(factory, ended + 1, stop, baseline))
+        await asyncio.sleep(2)
+        stop.set()
+        await task
+        print(f"registrations alone:          {_summary(baseline)}")
+
+        stop = asyncio.Event()
+        during = []
+        task = asyncio.create_task(_register(factory, ended + 1, stop, during))
+        archiver = Archiver(factory, after=timedelta(0), max_rows=batch_rows, pause=0.01)
+        t0 = time.perf_counter()
+        moved = await archiver.run_once()
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        await task
+        print(f"registrations while archiving: {_summary(during)}")
+        print(f"archived {moved} events in {elapsed:.1f} s ({moved * (per_event + 1) / elapsed:,.0f} rows/s)")
+        print(f"after:   events {{}} attendees {{}} | archive: events {{}} attendees {{}}".format(*_counts(path)))
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ended", type=int, default=20000)
+    parser.add_argument("--attendees-per-event", type=int, default=50)
+    parser.add_argument("--batch-rows", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.ended, args.attendees_per_event, args.batch_rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Fan-out cost of availability streams as the number of watchers grows.
+
+Opens N in-process SSE streams on one event (each consumed by its own task,
+as uvicorn would), then publishes a burst of registrations, one every 2 ms,
+the way crud does after each commit. Reports the CPU time spent on the
+burst and while idle, and how many messages each watcher received; both
+should stay flat per watcher, with messages bounded by the flush interval
+rather than the number of registrations.
+
+    python -m benchmarks.bench_availability --watchers 1000 5000 10000
+"""
+import argparse
+import asyncio
+import time
+
+from app.availability import Availability, AvailabilityHub
+from app import availability
+
+EVENT_ID = 1
+
+
+async def _watch(current: Availability, received: list) -> None:
+    async for chunk in availability.sse_stream(current):
+        received.append(len(chunk))
+
+
+async def run(watchers, registrations: int, interval_ms: float) -> None:
+    print(f"{'watchers':>9} {'burst CPU ms':>13} {'us/watcher':>11} {'idle CPU ms':>12} {'msgs/watcher':>13}")
+    for n in watchers:
+        hub = availability.hub = AvailabilityHub(interval=interval_ms / 1000, queue_size=16, heartbeat=15.0)
+        current = Availability(EVENT_ID, 0, registrations)
+        received = [[] for _ in range(n)]
+        tasks = [asyncio.create_task(_watch(current, r)) for r in received]
+        await asyncio.sleep(0.1)
+        for r in received:
+            r.clear()  # the initial snapshot
+
+        cpu = time.process_time()
+        for registered in range(1, registrations + 1):
+            hub.publish(Availability(EVENT_ID, registered, registrations))
+            await asyncio.sleep(0.002)
+        await asyncio.sleep(2 * interval_ms / 1000)
+        burst = time.process_time() - cpu
+
+        cpu = time.process_time()
+        await asyncio.sleep(1.0)
+        idle = time.process_time() - cpu
+
+        messages = sum(len(r) for r in received) / n
+        print(f"{n:>9} {burst * 1000:>13.1f} {burst / n * 1e6:>11.1f} {idle * 1000:>12.1f} {messages:>13.1f}")
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--watchers", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--registrations", type=int, default=500)
+    parser.add_argument("--interval-ms", type=float, default=250.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.watchers, args.registrations, args.interval_ms))
+
+
+if __name__ == "__main__":
+    main()
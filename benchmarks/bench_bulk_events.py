@@ -0,0 +1,89 @@
+"""Event import throughput: one POST /events per event against POST /events/bulk.
+
+Creates the same season of events (spread over several timezones) both
+ways through the ASGI app in-process, each into a fresh SQLite file, and
+reports events per second and SQL statements per event. A second bulk
+pass re-posts the season to time the all-duplicates path.
+
+    python -m benchmarks.bench_bulk_events --total 20000 --batch 1000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.metrics import instrument_engine
+
+ZONES = ["UTC", "Asia/Kolkata", "Europe/London", "America/New_York"]
+
+
+def _season(total: int) -> list:
+    start = datetime.utcnow() + timedelta(days=1)
+    return [
+        {
+            "name": f"Season Event {i}",
+            "location": f"City {i % 50}",
+            "start_time": (start + timedelta(hours=i)).isoformat(),
+            "end_time": (start + timedelta(hours=i + 2)).isoformat(),
+            "max_capacity": 100,
+            "timezone": ZONES[i % len(ZONES)],
+        }
+        for i in range(total)
+    ]
+
+
+async def _import(events: list, batch: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        instrument_engine(engine, "bench")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_db():
+            async with factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            passes = [("single", None)] if batch == 0 else [("bulk", "created"), ("bulk, again", "duplicates")]
+            for label, field in passes:
+                t0 = time.perf_counter()
+                statements = done = 0
+                if batch == 0:
+                    for event in events:
+                        response = await client.post("/events", json=event)
+                        statements += int(response.headers.get("x-db-statements", 0))
+                        done += response.status_code == 201
+                else:
+                    for offset in range(0, len(events), batch):
+                        response = await client.post("/events/bulk", json=events[offset:offset + batch])
+                        statements += int(response.headers.get("x-db-statements", 0))
+                        done += response.json()[field]
+                elapsed = time.perf_counter() - t0
+                print(f"{label:<12} {done:>7} events in {elapsed:6.2f}s -> {len(events) / elapsed:>9,.0f} events/s, "
+                      f"{statements / len(events):.3f} statements/event")
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--total", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=1_000)
+    args = parser.parse_args()
+    events = _season(args.total)
+    asyncio.run(_import(events, 0))
+    asyncio.run(_import(events, args.batch))
+
+
+if __name__ == "__main__":
+    main()
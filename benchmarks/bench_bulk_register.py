@@ -0,0 +1,71 @@
+"""Bulk registration throughput into SQLite.
+
+Posts batches to ``POST /events/{event_id}/register/bulk`` through the ASGI
+app in-process (request parsing and validation included) and reports
+registrations per second.
+
+    python -m benchmarks.bench_bulk_register --total 100000 --batch 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+
+
+async def run(total: int, batch: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def override_get_db():
+            async with factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = override_get_db
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+            start = datetime.utcnow() + timedelta(days=1)
+            response = await client.post("/events", json={
+                "name": "Bulk Bench",
+                "location": "Mumbai",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(hours=3)).isoformat(),
+                "max_capacity": total,
+                "timezone": "UTC",
+            })
+            event_id = response.json()["id"]
+            payloads = [
+                [{"name": f"User {i}", "email": f"user{i}@example.com"} for i in range(offset, min(offset + batch, total))]
+                for offset in range(0, total, batch)
+            ]
+            t0 = time.perf_counter()
+            created = 0
+            for payload in payloads:
+                response = await client.post(f"/events/{event_id}/register/bulk", json=payload)
+                created += response.json()["created"]
+            elapsed = time.perf_counter() - t0
+        app.dependency_overrides.clear()
+        await engine.dispose()
+    print(f"{created} registrations in {elapsed:.2f}s -> {created / elapsed:,.0f} registrations/s (batch={batch})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--total", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=5_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.total, args.batch))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Time-window, location and calendar query latency as the table grows.
+
+Seeds a throwaway SQLite file per size with events spread evenly over two
+years across a fixed set of cities, then times one-week windows and
+calendars through ``crud``. Events per week and city grow with the table,
+so the "rows" column shows how much each query returns; latency should
+follow it, not the table size.
+
+    python -m benchmarks.bench_calendar --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+
+from .seed import create_schema, insert_rows, median_ms
+
+CITIES = 500
+SPAN_DAYS = 730
+
+
+def _seed(path: str, events: int, origin: datetime) -> None:
+    rng = random.Random(3)
+    conn = sqlite3.connect(path)
+    rows = []
+    for i in range(1, events + 1):
+        start = origin + timedelta(minutes=rng.randrange(SPAN_DAYS * 24 * 60))
+        # Mostly short events, with a rare multi-day festival.
+        hours = rng.choice((1, 2, 3, 4)) if rng.random() > 0.001 else rng.randint(24, 24 * 7)
+        rows.append((i, f"Event {i}", f"City {rng.randrange(CITIES)}", start, start + timedelta(hours=hours), 100, 0))
+    insert_rows(conn, models.Event.__table__,
+                ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"), rows)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def run(sizes, repeat: int) -> None:
+    origin = (datetime.utcnow() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = origin + timedelta(days=300)
+    week_end = week_start + timedelta(days=7)
+    month = [(d.date(), d, d + timedelta(days=1)) for d in (week_start + timedelta(days=i) for i in range(31))]
+    queries = {
+        "week, city": lambda db: crud.get_upcoming_events(db, limit=100, start=week_start, end=week_end, location="City 7"),
+        "week, all": lambda db: crud.get_upcoming_events(db, limit=100, start=week_start, end=week_end),
+        "calendar 31d, city": lambda db: crud.get_event_calendar(db, month, location="City 7"),
+        "calendar 31d, all": lambda db: crud.get_event_calendar(db, month),
+    }
+    print(f"{'events':>9} | " + " | ".join(f"{name:>18} {'rows':>6}" for name in queries) + "   (p50 ms)")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            url = await create_schema(path)
+            _seed(path, size, origin)
+            engine = create_async_engine(url)
+            factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            cells = []
+            for fn in queries.values():
+                ms, result = await median_ms(factory, fn, repeat)
+                rows = result["total"] if isinstance(result, dict) else sum(day["count"] for day in result)
+                cells.append(f"{ms:>18.2f} {rows:>6}")
+            await engine.dispose()
+        print(f"{size:>9} | " + " | ".join(cells))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Mixed read/write throughput: original engine setup vs the tuned profile.
+
+"old" is the original app/database.py: one engine, echo=True, default
+rollback journal. "new" uses app.database.make_engine: WAL and tuned pragmas,
+with a separate read engine for the list queries. Readers page through
+upcoming events and an attendee list, and writers register attendees,
+concurrently for --seconds.
+
+    python -m benchmarks.bench_db_config --readers 16 --writers 4 --seconds 5
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.database import Base, make_engine
+from app.models import Event
+
+
+async def _seed(engine) -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as db:
+        now = datetime.utcnow()
+        db.add_all(
+            Event(name=f"Event {i}", location="Mumbai", start_time=now + timedelta(days=1, minutes=i),
+                  end_time=now + timedelta(days=2), max_capacity=1_000_000)
+            for i in range(200)
+        )
+        await db.commit()
+    return 1
+
+
+async def _load(write_engine, read_engine, readers: int, writers: int, seconds: float) -> dict:
+    write_factory = sessionmaker(bind=write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_factory = sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def reader():
+        while time.perf_counter() < deadline:
+            try:
+                async with read_factory() as db:
+                    await crud.get_upcoming_events(db, limit=20)
+                    await crud.get_attendees(db, 1, limit=20)
+                counts["reads"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+
+    async def writer(w):
+        i = 0
+        while time.perf_counter() < deadline:
+            i += 1
+            try:
+                async with write_factory() as db:
+                    await crud.register_attendee(db, 1, schemas.AttendeeCreate(name="W", email=f"w{w}-{i}@example.com"))
+                counts["writes"] += 1
+            except OperationalError:
+                counts["errors"] += 1
+
+    await asyncio.gather(*(reader() for _ in range(readers)), *(writer(w) for w in range(writers)))
+    return {k: v / seconds if k != "errors" else v for k, v in counts.items()}
+
+
+async def run(readers: int, writers: int, seconds: float, old_echo: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            old = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'old.db')}", echo=old_echo, future=True)
+            await _seed(old)
+            old_result = await _load(old, old, readers, writers, seconds)
+            await old.dispose()
+        new_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'new.db')}"
+        new_write = make_engine(new_url)
+        new_read = make_engine(new_url, read_only=True)
+        new_write.echo = new_read.echo = False
+        await _seed(new_write)
+        new_result = await _load(new_write, new_read, readers, writers, seconds)
+        await new_write.dispose()
+        await new_read.dispose()
+    print(f"{'config':<6} {'reads/s':>9} {'writes/s':>9} {'errors':>7}")
+    for name, result in (("old", old_result), ("new", new_result)):
+        print(f"{name:<6} {result['reads']:>9.0f} {result['writes']:>9.0f} {result['errors']:>7}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--no-old-echo", dest="old_echo", action="store_false",
+                        help="Disable echo for the old engine to compare journal/pool settings alone")
+    args = parser.parse_args()
+    asyncio.run(run(args.readers, args.writers, args.seconds, args.old_echo))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Per-email registrations lookup latency as the tables grow.
+
+Seeds a throwaway SQLite file per size (events with 20 attendees each, a
+fixed "fan" email registered for 50 of them) and times
+``crud.get_registrations_by_email`` for the first page and a cursor page,
+next to the same query with the email-leading index dropped, which is what
+the lookup cost before it existed.
+
+    python -m benchmarks.bench_email_lookup --sizes 10000 100000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+
+from .seed import create_schema, insert_rows, median_ms
+
+PER_EVENT = 20
+FAN_EVENTS = 50
+FAN = "fan@example.com"
+
+
+def _seed(path: str, events: int) -> None:
+    now = datetime.utcnow()
+    conn = sqlite3.connect(path)
+    insert_rows(
+        conn, models.Event.__table__,
+        ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"),
+        (
+            (i, f"Event {i}", "City", now + timedelta(hours=i % 5000), now + timedelta(hours=i % 5000 + 2), 100, PER_EVENT)
+            for i in range(1, events + 1)
+        ),
+    )
+    step = events // FAN_EVENTS
+    insert_rows(
+        conn, models.Attendee.__table__, ("name", "email", "event_id"),
+        (
+            ("A", FAN if j == 0 and i % step == 0 else f"user{i * PER_EVENT + j}@example.com", i)
+            for i in range(1, events + 1) for j in range(PER_EVENT)
+        ),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def _time(factory, repeat: int, **kwargs) -> float:
+    p50, page = await median_ms(
+        factory, lambda db: crud.get_registrations_by_email(db, FAN, limit=20, user_tz="Asia/Kolkata", **kwargs), repeat)
+    assert page["events"], "fan has no registrations"
+    return p50
+
+
+async def run(sizes, repeat: int) -> None:
+    print(f"{'events':>9} {'attendees':>10} {'first page':>11} {'cursor page':>12} {'no index':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            url = await create_schema(path)
+            _seed(path, size)
+            engine = create_async_engine(url)
+            factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            first = await _time(factory, repeat)
+            cursor = await _time(factory, repeat, after=size // 2, include_total=False)
+            await engine.dispose()
+
+            conn = sqlite3.connect(path)
+            conn.execute("DROP INDEX ix_attendees_email_event_id")
+            conn.close()
+            engine = create_async_engine(url)
+            factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            unindexed = await _time(factory, max(1, repeat // 10))
+            await engine.dispose()
+        print(f"{size:>9,} {size * PER_EVENT:>10,} {first:>8.2f} ms {cursor:>9.2f} ms {unindexed:>7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
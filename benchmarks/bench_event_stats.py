@@ -0,0 +1,92 @@
+"""Per-event registration stats latency as an event's attendee list grows.
+
+Seeds a throwaway SQLite file per size with one event of that many
+attendees (registered over the past week) plus the matching rollup, built
+with ``crud.rebuild_event_stats``, and times ``crud.get_event_stats`` next
+to computing the same numbers from the attendee rows, which is what stats
+cost before the rollup existed. Also times ``crud.register_attendee``,
+which now writes the hourly bucket too.
+
+    python -m benchmarks.bench_event_stats --sizes 1000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+
+from .seed import create_schema, insert_rows, median_ms
+
+HOURS = 168
+
+
+def _seed(path: str, attendees: int) -> None:
+    now = datetime.utcnow()
+    conn = sqlite3.connect(path)
+    insert_rows(conn, models.Event.__table__,
+                ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"),
+                [(1, "Big", "City", now + timedelta(days=7), now + timedelta(days=8), attendees * 2, 0)])
+    step = timedelta(hours=HOURS) / attendees
+    insert_rows(
+        conn, models.Attendee.__table__, ("name", "email", "event_id", "registered_at"),
+        (("A", f"user{i}@example.com", 1, now - step * i) for i in range(attendees)),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+
+
+async def _from_attendees(db: AsyncSession) -> dict:
+    # The same answer without the rollup: count and bucket the rows.
+    event = await crud.get_event(db, 1)
+    since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=HOURS - 1)
+    hour = func.strftime("%Y-%m-%d %H:00:00", models.Attendee.registered_at)
+    registered = await db.scalar(select(func.count()).where(models.Attendee.event_id == 1))
+    buckets = (await db.execute(
+        select(hour, func.count())
+        .where(models.Attendee.event_id == 1, models.Attendee.registered_at >= since)
+        .group_by(hour).order_by(hour)
+    )).all()
+    return {"registered": registered, "max_capacity": event.max_capacity, "buckets": buckets}
+
+
+async def run(sizes, repeat: int) -> None:
+    print(f"{'attendees':>10} {'stats (rollup)':>15} {'from attendees':>15} {'register':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            url = await create_schema(path)
+            _seed(path, size)
+            engine = create_async_engine(url)
+            factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            async with factory() as db:
+                await crud.rebuild_event_stats(db)
+            rollup, _ = await median_ms(factory, lambda db: crud.get_event_stats(db, 1, user_tz="Asia/Kolkata", hours=HOURS), repeat)
+            scan, _ = await median_ms(factory, _from_attendees, max(1, repeat // 10))
+            emails = iter(range(repeat))
+            register, _ = await median_ms(factory, lambda db: crud.register_attendee(
+                db, 1, schemas.AttendeeCreate(name="New", email=f"new{next(emails)}@example.com")), repeat)
+            async with factory() as db:
+                stats = await crud.get_event_stats(db, 1, hours=HOURS)
+            assert stats["registered"] == size + repeat, stats["registered"]
+            await engine.dispose()
+        print(f"{size:>10,} {rollup:>12.2f} ms {scan:>12.1f} ms {register:>7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
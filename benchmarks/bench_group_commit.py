@@ -0,0 +1,49 @@
+"""Group-commit writer against per-request transactions under a ticket drop.
+
+Runs the registration_surge scenario of benchmarks.run in fresh processes
+with WRITE_BATCHING=false and =true at each concurrency level, alternating
+for --rounds, and compares median throughput and p50/p99 latency.
+
+    python -m benchmarks.bench_group_commit --concurrency 32 128 512
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+def _run(batching: bool, requests: int, concurrency: int) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as out:
+        env = dict(os.environ, APP_ENV="prod", WRITE_BATCHING=str(batching).lower())
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--scenarios", "registration_surge",
+             "--events", "200", "--attendees", "10000", "--requests", str(requests),
+             "--concurrency", str(concurrency), "--output", out.name],
+            env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        with open(out.name) as f:
+            return json.load(f)["scenarios"]["registration_surge"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=4_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[32, 128, 512])
+    args = parser.parse_args()
+    print(f"{'clients':>8} {'batching':<9} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        runs = {False: [], True: []}
+        for _ in range(args.rounds):
+            for batching in (False, True):
+                runs[batching].append(_run(batching, args.requests, concurrency))
+        for batching, results in runs.items():
+            s = {key: statistics.median(r[key] for r in results) for key in ("throughput_rps", "p50_ms", "p99_ms")}
+            print(f"{concurrency:>8} {'on' if batching else 'off':<9} {s['throughput_rps']:>8.1f} {s['p50_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Cost of the iCalendar feeds per kind of poll.
+
+Seeds a SQLite file and drives the app in-process. Times GET /events.ics
+with nothing cached, after an event was created (the feed is rebuilt but
+unchanged events' VEVENT blocks come from the cache), served from the cache,
+and as a conditional poll that ends in a 304, next to GET /events with the
+same number of events, which is what feed scrapers polled before. Reports
+the median latency and SQL statements per request.
+
+    python -m benchmarks.bench_ical --events 20000 --feed-events 1000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from .seed import seed
+
+
+async def run(path: str, feed_events: int, repeat: int) -> None:
+    os.environ["ICS_FEED_MAX_EVENTS"] = str(feed_events)
+    from app.cache import events_cache, ics_cache, ics_event_cache
+    from app.database import get_db, get_read_db, make_engine
+    from app.main import app
+
+    url = f"sqlite+aiosqlite:///{path}"
+    write_engine = make_engine(url)
+    read_engine = make_engine(url, read_only=True)
+    write_engine.echo = read_engine.echo = False
+    write_factory = sessionmaker(bind=write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_factory = sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with write_factory() as session:
+            yield session
+
+    async def override_get_read_db():
+        async with read_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    created = iter(range(repeat * 10))
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+        async def timed(label, path, before=None, **kwargs):
+            timings, statements = [], []
+            for _ in range(repeat):
+                if before:
+                    await before()
+                t0 = time.perf_counter()
+                response = await client.get(path, **kwargs)
+                timings.append(time.perf_counter() - t0)
+                statements.append(int(response.headers.get("x-db-statements", 0)))
+                assert response.status_code in (200, 304), response.status_code
+            print(f"{label:<32} {response.status_code:>6} {len(response.content):>10,} "
+                  f"{statistics.median(timings) * 1000:>9.2f} {statistics.mean(statements):>8.1f}")
+            return response
+
+        async def cold():
+            ics_cache.clear()
+            ics_event_cache.clear()
+
+        async def cold_listing():
+            events_cache.clear()
+
+        async def new_event():
+            n = next(created)
+            await client.post("/events", json={
+                "name": f"Bench Feed {n}", "location": "Bench", "start_time": "2099-01-01T10:00:00",
+                "end_time": "2099-01-01T12:00:00", "max_capacity": 10, "timezone": "UTC",
+            })
+
+        print(f"{'request':<32} {'status':>6} {'bytes':>10} {'p50 ms':>9} {'sql/req':>8}")
+        await timed("/events.ics (cold)", "/events.ics", before=cold)
+        await timed("/events.ics (after a new event)", "/events.ics", before=new_event)
+        feed = await timed("/events.ics (cached)", "/events.ics")
+        await timed("/events.ics (If-None-Match)", "/events.ics", headers={"If-None-Match": feed.headers["etag"]})
+        events_cache.clear()
+        await timed("/events JSON (cached)", f"/events?limit={feed_events}&timezone=UTC")
+        await timed("/events JSON (cold)", f"/events?limit={feed_events}&timezone=UTC", before=cold_listing)
+    await write_engine.dispose()
+    await read_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--feed-events", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        info = seed(os.path.join(tmp, "bench.db"), args.events, args.events)
+        asyncio.run(run(info.path, args.feed_events, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""CPU per row of the list endpoints' fetch-and-encode path.
+
+Compares, on 1,000-item pages of a seeded database:
+  legacy - ORM entities, dicts re-validated into EventPagination /
+           AttendeePagination, jsonable_encoder, then stdlib json
+           (what the endpoints did before app/serialization.py);
+  fast   - column tuples from crud, encoded once by serialization.dumps.
+Both produce the same bytes, which the benchmark checks.
+
+    python -m benchmarks.bench_json_lists --limit 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas, serialization, timezones
+
+from .seed import seed
+
+
+async def legacy_events(db, limit):
+    rows = (await db.execute(
+        select(models.Event).where(models.Event.end_time > datetime.utcnow())
+        .order_by(models.Event.start_time, models.Event.id).limit(limit + 1)
+    )).scalars().all()[:limit]
+    converter = timezones.get_converter("Asia/Kolkata")
+    events = [{
+        "id": e.id, "name": e.name, "location": e.location,
+        "start_time": converter.isoformat(e.start_time), "end_time": converter.isoformat(e.end_time),
+        "max_capacity": e.max_capacity,
+    } for e in rows]
+    data = {"total": None, "skip": 0, "limit": limit, "next_cursor": None, "events": events}
+    return JSONResponse(jsonable_encoder(schemas.EventPagination(**data))).body
+
+
+async def fast_events(db, limit):
+    data = await crud.get_upcoming_events(db, "Asia/Kolkata", limit=limit, include_total=False)
+    data["next_cursor"] = None
+    return serialization.dumps(data)
+
+
+async def legacy_attendees(db, event_id, limit):
+    rows = (await db.execute(
+        select(models.Attendee).where(models.Attendee.event_id == event_id).order_by(models.Attendee.id).limit(limit + 1)
+    )).scalars().all()[:limit]
+    event = await db.get(models.Event, event_id)
+    start, end = timezones.get_converter("UTC").isoformat_many([event.start_time, event.end_time])
+    attendees = [{
+        "id": a.id, "name": a.name, "email": a.email, "event_id": a.event_id,
+        "event_start_time": start, "event_end_time": end,
+    } for a in rows]
+    data = {"total": None, "skip": 0, "limit": limit, "next_cursor": None, "attendees": attendees}
+    return JSONResponse(jsonable_encoder(schemas.AttendeePagination(**data))).body
+
+
+async def fast_attendees(db, event_id, limit):
+    data = await crud.get_attendees(db, event_id, limit=limit, include_total=False)
+    data["next_cursor"] = None
+    return serialization.dumps(data)
+
+
+async def _cpu_us_per_row(factory, fn, rows, repeat):
+    async with factory() as db:
+        body = await fn(db)  # warm up
+    start = time.process_time()
+    for _ in range(repeat):
+        async with factory() as db:
+            await fn(db)
+    return (time.process_time() - start) / repeat / rows * 1e6, body
+
+
+async def run(info, limit: int, repeat: int) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{info.path}")
+    factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    cases = {
+        "events": (lambda db: legacy_events(db, limit), lambda db: fast_events(db, limit)),
+        "attendees": (lambda db: legacy_attendees(db, info.hot_event_id, limit),
+                      lambda db: fast_attendees(db, info.hot_event_id, limit)),
+    }
+    print(f"encoder: {'orjson' if serialization.orjson else 'json'}, {limit} rows per page")
+    print(f"{'endpoint':<10} {'legacy us/row':>14} {'fast us/row':>12} {'speedup':>8}")
+    for name, (legacy, fast) in cases.items():
+        legacy_cpu, legacy_body = await _cpu_us_per_row(factory, legacy, limit, repeat)
+        fast_cpu, fast_body = await _cpu_us_per_row(factory, fast, limit, repeat)
+        assert legacy_body == fast_body, f"{name}: bodies differ"
+        print(f"{name:<10} {legacy_cpu:>14.2f} {fast_cpu:>12.2f} {legacy_cpu / fast_cpu:>7.1f}x")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=1_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        info = seed(os.path.join(tmp, "bench.db"), events=max(2 * args.limit, 2000), attendees=20 * args.limit)
+        asyncio.run(run(info, args.limit, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""List latency and peak memory as an event's attendee count grows.
+
+Seeds a throwaway SQLite file per size and times one page of
+``crud.get_attendees`` and ``crud.get_upcoming_events``. With totals served
+by COUNT / the registered_count counter, both columns should stay flat.
+
+    python -m benchmarks.bench_list_totals --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+
+from .seed import create_schema, insert_rows, median_ms
+
+
+def _seed(path: str, attendees: int) -> None:
+    conn = sqlite3.connect(path)
+    start = datetime.utcnow() + timedelta(days=1)
+    insert_rows(conn, models.Event.__table__,
+                ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"),
+                [(1, "Bench", "Mumbai", start, start + timedelta(hours=3), attendees, attendees)])
+    insert_rows(conn, models.Attendee.__table__, ("name", "email", "event_id"),
+                ((f"User {i}", f"user{i}@example.com", 1) for i in range(attendees)))
+    conn.commit()
+    conn.close()
+
+
+async def _measure(session_factory, fn, repeat: int):
+    p50, _ = await median_ms(session_factory, fn, repeat)
+    async with session_factory() as db:
+        tracemalloc.start()
+        await fn(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return p50, peak / 1024
+
+
+async def run(sizes, repeat: int, limit: int) -> None:
+    print(f"{'attendees':>10} | {'attendees p50 ms':>16} {'peak KiB':>9} | {'events p50 ms':>13} {'peak KiB':>9}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            url = await create_schema(path)
+            _seed(path, size)
+            engine = create_async_engine(url)
+            factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            att = await _measure(factory, lambda db: crud.get_attendees(db, 1, limit=limit), repeat)
+            ev = await _measure(factory, lambda db: crud.get_upcoming_events(db, limit=limit), repeat)
+            await engine.dispose()
+        print(f"{size:>10} | {att[0]:>16.2f} {att[1]:>9.0f} | {ev[0]:>13.2f} {ev[1]:>9.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat, args.limit))
+
+
+if __name__ == "__main__":
+    main()
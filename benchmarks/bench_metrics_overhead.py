@@ -0,0 +1,53 @@
+"""Overhead of the metrics middleware and SQL hooks on the register path.
+
+Runs the registration_surge scenario of benchmarks.run in fresh processes
+with METRICS_ENABLED=false and =true, alternating for --rounds, and compares
+median throughput and p50/p99 latency.
+
+    python -m benchmarks.bench_metrics_overhead --rounds 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+def _run(enabled: bool, requests: int, concurrency: int) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json") as out:
+        env = dict(os.environ, APP_ENV="prod", METRICS_ENABLED=str(enabled).lower())
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--scenarios", "registration_surge",
+             "--events", "200", "--attendees", "10000", "--requests", str(requests),
+             "--concurrency", str(concurrency), "--output", out.name],
+            env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        with open(out.name) as f:
+            return json.load(f)["scenarios"]["registration_surge"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    results = {False: [], True: []}
+    for _ in range(args.rounds):
+        for enabled in (False, True):
+            results[enabled].append(_run(enabled, args.requests, args.concurrency))
+    summary = {}
+    for enabled, runs in results.items():
+        summary[enabled] = {key: statistics.median(r[key] for r in runs) for key in ("throughput_rps", "p50_ms", "p99_ms")}
+    off, on = summary[False], summary[True]
+    print(f"{'metrics':<8} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, s in (("off", off), ("on", on)):
+        print(f"{label:<8} {s['throughput_rps']:>8.1f} {s['p50_ms']:>8.2f} {s['p99_ms']:>8.2f}")
+    print(f"overhead: {(1 - on['throughput_rps'] / off['throughput_rps']) * 100:.1f}% throughput, "
+          f"{(on['p50_ms'] / off['p50_ms'] - 1) * 100:.1f}% p50")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Event search latency as the events table grows.
+
+Seeds a throwaway SQLite file per size and times ``crud.search_events``
+for a few query shapes, next to a LIKE '%...%' scan for comparison. The
+vocabulary grows with the table, so a word matches about the same number of
+events (~100) at every size. With the FTS5 index, latency tracks the number
+of matches rather than the table size; a word that matches a fixed share of
+a huge table costs roughly 3 us per matching event.
+
+    python -m benchmarks.bench_search --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import string
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+
+from .seed import create_schema, insert_rows, median_ms
+
+EVENTS_PER_WORD = 100
+QUERY_SHAPES = ("one word", "prefix", "two words", "location")
+
+
+def _vocabulary(size: int, rng: random.Random):
+    # Random 8-letter words, so prefixes of one word rarely match another.
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(8)) for _ in range(size)]
+
+
+def _queries(names, places):
+    return {
+        "one word": names[17],
+        "prefix": names[17][:5],
+        "two words": f"{names[17]} {places[3]}",
+        "location": places[42],
+    }
+
+def _seed(path: str, events: int):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    names = _vocabulary(max(100, events // EVENTS_PER_WORD), rng)
+    places = _vocabulary(max(100, events // EVENTS_PER_WORD), rng)
+    conn = sqlite3.connect(path)
+    # The insert trigger fills events_fts as rows go in.
+    insert_rows(
+        conn, models.Event.__table__,
+        ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"),
+        (
+            (i, f"{rng.choice(names)} night {i}", rng.choice(places),
+             now + timedelta(hours=rng.randint(1, 24 * 365)), now + timedelta(hours=24 * 366), 100, 0)
+            for i in range(1, events + 1)
+        ),
+    )
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return _queries(names, places)
+
+
+def _like_ms(path: str, q: str, repeat: int) -> float:
+    conn = sqlite3.connect(path)
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        conn.execute(
+            "SELECT id FROM events WHERE (name LIKE ? OR location LIKE ?) AND end_time > ? ORDER BY id LIMIT 20",
+            (f"%{q}%", f"%{q}%", datetime.utcnow().isoformat(" ")),
+        ).fetchall()
+        timings.append(time.perf_counter() - t0)
+    conn.close()
+    return statistics.median(timings) * 1000
+
+
+async def _p50_ms(factory, q: str, include_total: bool, repeat: int) -> float:
+    p50, _ = await median_ms(factory, lambda db: crud.search_events(db, q, limit=20, include_total=include_total), repeat)
+    return p50
+
+
+async def run(sizes, repeat: int) -> None:
+    header = " ".join(f"{name:>10}" for name in QUERY_SHAPES)
+    print(f"{'events':>9} {'total':>6} | {header} | {'LIKE scan':>10}   (p50 ms, limit=20)")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "bench.db")
+            url = await create_schema(path)
+            queries = _seed(path, size)
+            engine = create_async_engine(url)
+            factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+            like = _like_ms(path, queries["one word"], max(3, repeat // 5))
+            for include_total in (False, True):
+                cells = [await _p50_ms(factory, q, include_total, repeat) for q in queries.values()]
+                print(f"{size:>9} {str(include_total).lower():>6} | " + " ".join(f"{c:>10.2f}" for c in cells) + f" | {like:>10.2f}")
+            await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
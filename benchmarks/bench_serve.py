@@ -0,0 +1,114 @@
+"""Throughput of `python -m app.serve` as the worker count grows.
+
+Seeds a SQLite file, then for each worker count starts the launcher and
+drives it from several client processes (so the load generator is not
+the bottleneck) with a CPU-bound mix: attendee pages (row-to-dict
+building), registration attempts for a full event (validation, refused
+from the shared seat table) and availability lookups. Reports requests
+per second and latency per worker count. Throughput can only scale up to
+the number of cores left over by the clients.
+
+    python -m benchmarks.bench_serve --workers 1 2 4 --clients 4 --seconds 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from .run import _free_port, percentile
+from .seed import seed
+
+
+async def _client(port: int, surge_id: int, event_ids: list, seconds: float, concurrency: int, seed_value: int):
+    rng = random.Random(seed_value)
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30, limits=limits) as client:
+        async def worker(n: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                i += 1
+                roll = rng.random()
+                t0 = time.perf_counter()
+                if roll < 0.5:
+                    response = await client.get(f"/events/{rng.choice(event_ids)}/attendees", params={"limit": 100, "timezone": "Asia/Kolkata"})
+                elif roll < 0.8:
+                    response = await client.post(f"/events/{surge_id}/register", json={"name": "Fan", "email": f"fan{seed_value}-{n}-{i}@example.com"})
+                else:
+                    response = await client.get(f"/events/{surge_id}/availability")
+                latencies.append(time.perf_counter() - t0)
+                statuses[response.status_code] += 1
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return latencies, statuses
+
+
+def _client_process(args) -> tuple:
+    return asyncio.run(_client(*args))
+
+
+def _wait_ready(port: int) -> None:
+    for _ in range(200):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/events/1/availability", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def _fill(port: int, event_id: int) -> None:
+    # Fill the surge event, so registrations for it are refused from memory.
+    for i in range(1_000_000):
+        response = httpx.post(f"http://127.0.0.1:{port}/events/{event_id}/register", json={"name": "Early", "email": f"early{i}@example.com"})
+        if response.status_code == 400:
+            return
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=4, help="load-generating processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="connections per client process")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--attendees", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        info = seed(os.path.join(tmp, "bench.db"), args.events, args.attendees, surge_capacity=50)
+        event_ids = info.upcoming_ids[:200]
+        print(f"{'workers':>7} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8}  statuses")
+        for workers in args.workers:
+            port = _free_port()
+            env = dict(os.environ, APP_ENV="prod", DATABASE_URL=f"sqlite+aiosqlite:///{info.path}")
+            server = subprocess.Popen(
+                [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port), "--log-level", "warning"],
+                env=env,
+            )
+            try:
+                _wait_ready(port)
+                _fill(port, info.surge_event_id)
+                jobs = [(port, info.surge_event_id, event_ids, args.seconds, args.concurrency, n) for n in range(args.clients)]
+                with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+                    results = pool.map(_client_process, jobs)
+            finally:
+                server.terminate()
+                server.wait()
+            latencies = sorted(t for lats, _ in results for t in lats)
+            statuses = sum((s for _, s in results), Counter())
+            print(f"{workers:>7} {len(latencies) / args.seconds:>8.0f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+                  f"{percentile(latencies, 0.99) * 1000:>8.1f}  {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
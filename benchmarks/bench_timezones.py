@@ -0,0 +1,45 @@
+"""Per-row timezone conversion cost: pytz localize/astimezone vs IsoConverter.
+
+    python -m benchmarks.bench_timezones --rows 100000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from pytz import UTC, all_timezones, timezone as pytz_timezone
+
+from app import timezones
+
+
+def _per_row_ns(fn, rows: int) -> float:
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) / rows * 1e9
+
+
+def run(rows: int) -> None:
+    start = datetime(2025, 1, 1)
+    # Spread over a year so DST zones cross both transitions.
+    dts = [start + timedelta(minutes=5 * i * 105120 // rows) for i in range(rows)]
+    print(f"{'timezone':<20} {'pytz ns/row':>12} {'converter ns/row':>17} {'speedup':>8}")
+    for name in ["UTC", "Asia/Kolkata", "America/New_York"]:
+        tz = pytz_timezone(name)
+        old = _per_row_ns(lambda: [UTC.localize(dt).astimezone(tz).isoformat() for dt in dts], rows)
+        converter = timezones.get_converter(name)
+        new = _per_row_ns(lambda: converter.isoformat_many(dts), rows)
+        print(f"{name:<20} {old:>12.0f} {new:>17.0f} {old / new:>7.1f}x")
+    names = ["Asia/Kolkata", "America/New_York", "Nope/Invalid"] * 1000
+    old = _per_row_ns(lambda: [n in all_timezones for n in names], len(names))
+    new = _per_row_ns(lambda: [timezones.is_valid_timezone(n) for n in names], len(names))
+    print(f"{'name validation':<20} {old:>12.0f} {new:>17.0f} {old / new:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
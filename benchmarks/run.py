@@ -0,0 +1,265 @@
+"""In-process load-test suite for every endpoint.
+
+Seeds a SQLite database, then runs each scenario with a fixed number of
+concurrent clients against the ASGI app in-process (httpx.ASGITransport),
+or against a real uvicorn server with --mode uvicorn. Reports throughput,
+p50/p95/p99 latency and SQL statements per request, writes JSON results,
+and can compare them with a saved baseline.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --output results.json
+    python -m benchmarks.run --mode uvicorn --scenarios list_browsing mixed
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from .scenarios import SCENARIOS
+from .seed import SeedInfo, seed
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class StatementCounter:
+    def __init__(self, *engines):
+        self.count = 0
+        self._engines = [e.sync_engine for e in dict.fromkeys(engines)]
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        for engine in self._engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        for engine in self._engines:
+            event.remove(engine, "before_cursor_execute", self._on_execute)
+
+
+async def run_scenario(client: AsyncClient, scenario, concurrency: int, requests: int, counter: Optional[StatementCounter], seed_value: int) -> dict:
+    latencies: List[float] = []
+    read_latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    shed = 0
+    remaining = iter(range(requests))
+
+    async def worker(worker_id: int):
+        nonlocal errors, shed
+        rng = random.Random(seed_value * 1000 + worker_id)
+        state: dict = {}
+        for _ in remaining:
+            t0 = time.perf_counter()
+            try:
+                response = await scenario.step(client, state, rng)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - t0)
+            if response.request.method == "GET":
+                read_latencies.append(latencies[-1])
+            if response.status_code == 429:
+                shed += 1
+            bucket = f"{response.status_code // 100}xx"
+            statuses[bucket] = statuses.get(bucket, 0) + 1
+
+    statements_before = counter.count if counter else 0
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    read_latencies.sort()
+    completed = len(latencies)
+    return {
+        "description": scenario.description,
+        "requests": completed,
+        "errors": errors + statuses.get("5xx", 0),
+        "statuses": statuses,
+        "shed": shed,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        # Reads on their own, for scenarios that mix them with writes.
+        "read_p95_ms": round(percentile(read_latencies, 0.95) * 1000, 3) if read_latencies else None,
+        "sql_per_request": round((counter.count - statements_before) / completed, 2) if counter and completed else None,
+    }
+
+
+async def _run_asgi(info: SeedInfo, names: List[str], concurrency: int, requests: int) -> Dict[str, dict]:
+    from app.cache import CACHES
+    from app.database import get_db, get_read_db, make_engine
+    from app.config import settings
+    from app.main import app
+    from app.writer import registration_writer
+
+    url = f"sqlite+aiosqlite:///{info.path}"
+    write_engine = make_engine(url)
+    read_engine = make_engine(url, read_only=True)
+    write_engine.echo = read_engine.echo = False
+    write_factory = sessionmaker(bind=write_engine, class_=AsyncSession, expire_on_commit=False)
+    read_factory = sessionmaker(bind=read_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_db():
+        async with write_factory() as session:
+            yield session
+
+    async def override_get_read_db():
+        async with read_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    # ASGITransport does not run the lifespan, so start the writer here.
+    if settings.write_batching:
+        registration_writer.session_factory = write_factory
+        await registration_writer.start()
+    results = {}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            with StatementCounter(write_engine, read_engine) as counter:
+                for i, name in enumerate(names):
+                    for cache in CACHES.values():
+                        cache.clear()
+                    results[name] = await run_scenario(client, SCENARIOS[name](info), concurrency, requests, counter, i)
+    finally:
+        await registration_writer.stop()
+        app.dependency_overrides.clear()
+        await write_engine.dispose()
+        await read_engine.dispose()
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _run_uvicorn(info: SeedInfo, names: List[str], concurrency: int, requests: int, workers: int) -> Dict[str, dict]:
+    port = _free_port()
+    env = dict(os.environ, APP_ENV="prod", DATABASE_URL=f"sqlite+aiosqlite:///{info.path}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    results = {}
+    try:
+        async with AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/")
+                    break
+                except Exception:
+                    await asyncio.sleep(0.1)
+            for i, name in enumerate(names):
+                results[name] = await run_scenario(client, SCENARIOS[name](info), concurrency, requests, None, i)
+    finally:
+        server.terminate()
+        server.wait()
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {current['throughput_rps']} rps < baseline {base['throughput_rps']} rps")
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms > baseline {base['p95_ms']} ms")
+        base_sql, sql = base.get("sql_per_request"), current.get("sql_per_request")
+        if base_sql is not None and sql is not None and sql > base_sql + 0.01:
+            regressions.append(f"{name}: {sql} SQL statements/request > baseline {base_sql}")
+    return regressions
+
+
+def print_table(results: Dict[str, dict]) -> None:
+    print(f"{'scenario':<20} {'reqs':>6} {'err':>4} {'429':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'read p95':>9} {'sql/req':>8}")
+    for name, r in results.items():
+        sql = "-" if r["sql_per_request"] is None else f"{r['sql_per_request']:.2f}"
+        read_p95 = "-" if r.get("read_p95_ms") is None else f"{r['read_p95_ms']:.2f}"
+        print(f"{name:<20} {r['requests']:>6} {r['errors']:>4} {r.get('shed', 0):>5} {r['throughput_rps']:>8.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} {read_p95:>9} {sql:>8}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (uvicorn mode)")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--attendees", type=int, default=200_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2_000, help="requests per scenario")
+    parser.add_argument("--output", help="write JSON results here")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (default 20%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        info = seed(os.path.join(tmp, "bench.db"), args.events, args.attendees)
+        if args.mode == "asgi":
+            results = asyncio.run(_run_asgi(info, args.scenarios, args.concurrency, args.requests))
+        else:
+            results = asyncio.run(_run_uvicorn(info, args.scenarios, args.concurrency, args.requests, args.workers))
+
+    print_table(results)
+    report = {
+        "meta": {
+            "mode": args.mode,
+            "workers": args.workers,
+            "events": args.events,
+            "attendees": args.attendees,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_report = json.load(f)
+        mismatched = [k for k in ("mode", "workers", "events", "attendees", "concurrency", "requests")
+                      if baseline_report["meta"].get(k) != report["meta"][k]]
+        if mismatched:
+            print(f"\nWarning: baseline was recorded with different {', '.join(mismatched)}; results may not be comparable.")
+        regressions = compare(results, baseline_report["scenarios"], args.tolerance)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
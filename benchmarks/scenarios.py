@@ -0,0 +1,141 @@
+"""Benchmark scenarios.
+
+A scenario makes one HTTP request per ``step`` call. ``state`` is private to
+one simulated client, so stateful walks (cursor pagination) work under
+concurrency.
+"""
+import itertools
+import random
+from typing import Callable, Dict
+
+from httpx import AsyncClient, Response
+
+from .seed import SeedInfo
+
+TIMEZONES = ["UTC", "Asia/Kolkata", "America/New_York", "Europe/London"]
+
+_emails = itertools.count()
+
+
+class Scenario:
+    name = ""
+    description = ""
+
+    def __init__(self, info: SeedInfo):
+        self.info = info
+
+    async def step(self, client: AsyncClient, state: dict, rng: random.Random) -> Response:
+        raise NotImplementedError
+
+
+class ListBrowsing(Scenario):
+    name = "list_browsing"
+    description = "First pages of /events and of busy events' attendee lists"
+
+    async def step(self, client, state, rng):
+        if rng.random() < 0.6:
+            return await client.get("/events", params={"timezone": rng.choice(TIMEZONES), "limit": 20, "skip": 20 * rng.randrange(5)})
+        event_id = self.info.upcoming_ids[min(int(rng.paretovariate(1.2)) - 1, len(self.info.upcoming_ids) - 1)]
+        return await client.get(f"/events/{event_id}/attendees", params={"limit": 20})
+
+
+class DeepPagination(Scenario):
+    name = "deep_pagination"
+    description = "Walk the busiest event's attendees 100 at a time with cursors"
+
+    async def step(self, client, state, rng):
+        params = {"limit": 100, "include_total": "false"}
+        if state.get("cursor"):
+            params["cursor"] = state["cursor"]
+        response = await client.get(f"/events/{self.info.hot_event_id}/attendees", params=params)
+        state["cursor"] = response.json().get("next_cursor") if response.status_code == 200 else None
+        return response
+
+
+class RegistrationSurge(Scenario):
+    name = "registration_surge"
+    description = "Everyone registers for one event with a few hundred free seats"
+
+    async def step(self, client, state, rng):
+        n = next(_emails)
+        return await client.post(
+            f"/events/{self.info.surge_event_id}/register",
+            json={"name": f"Surge {n}", "email": f"surge{n}@example.com"},
+        )
+
+
+class HoldSurge(Scenario):
+    name = "hold_surge"
+    description = "Registration surge through seat holds: hold, then confirm"
+
+    async def step(self, client, state, rng):
+        hold_id = state.pop("hold_id", None)
+        if hold_id is None:
+            response = await client.post(f"/events/{self.info.surge_event_id}/holds")
+            if response.status_code == 201:
+                state["hold_id"] = response.json()["hold_id"]
+            return response
+        n = next(_emails)
+        return await client.post(
+            f"/events/{self.info.surge_event_id}/holds/{hold_id}/confirm",
+            json={"name": f"Held {n}", "email": f"held{n}@example.com"},
+        )
+
+
+class RetryStorm(Scenario):
+    name = "retry_storm"
+    description = "Registrations where every request is retried 4 times with the same Idempotency-Key"
+
+    retries = 4
+
+    async def step(self, client, state, rng):
+        if not state.get("left"):
+            n = next(_emails)
+            state["left"] = self.retries + 1
+            state["key"] = f"retry-{n}"
+            state["attendee"] = {"name": f"Retry {n}", "email": f"retry{n}@example.com"}
+        state["left"] -= 1
+        return await client.post(
+            f"/events/{self.info.surge_event_id}/register",
+            json=state["attendee"],
+            headers={"Idempotency-Key": state["key"]},
+        )
+
+
+class CelebritySurge(Scenario):
+    name = "celebrity_surge"
+    description = "75% register for one event until well past full, 25% list /events; read p95 must hold"
+
+    async def step(self, client, state, rng):
+        if rng.random() < 0.25:
+            return await client.get("/events", params={"timezone": rng.choice(TIMEZONES), "limit": 20, "skip": 20 * rng.randrange(5)})
+        n = next(_emails)
+        return await client.post(
+            f"/events/{self.info.surge_event_id}/register",
+            json={"name": f"Fan {n}", "email": f"fan{n}@example.com"},
+        )
+
+
+class MixedTraffic(Scenario):
+    name = "mixed"
+    description = "90% browsing, 5% deep pagination, 5% registrations across events"
+
+    def __init__(self, info: SeedInfo):
+        super().__init__(info)
+        self.browse = ListBrowsing(info)
+        self.deep = DeepPagination(info)
+
+    async def step(self, client, state, rng):
+        roll = rng.random()
+        if roll < 0.90:
+            return await self.browse.step(client, state, rng)
+        if roll < 0.95:
+            return await self.deep.step(client, state, rng)
+        n = next(_emails)
+        event_id = rng.choice(self.info.upcoming_ids)
+        return await client.post(f"/events/{event_id}/register", json={"name": f"Mixed {n}", "email": f"mixed{n}@example.com"})
+
+
+SCENARIOS: Dict[str, Callable[[SeedInfo], Scenario]] = {
+    cls.name: cls for cls in (ListBrowsing, DeepPagination, RegistrationSurge, HoldSurge, RetryStorm, CelebritySurge, MixedTraffic)
+}
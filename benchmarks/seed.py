@@ -0,0 +1,145 @@
+"""Synthetic data for benchmarks.
+
+Creates N events and M attendees in a SQLite file. Attendee counts follow a
+Zipf-like skew, so a few headline events hold most registrations and the
+long tail has a handful each, as in real traffic. About 10% of events have
+already ended.
+
+    python -m benchmarks.seed bench.db --events 2000 --attendees 200000
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import models
+from app.database import Base
+
+
+@dataclass
+class SeedInfo:
+    path: str
+    events: int
+    attendees: int
+    # Upcoming event ids, the busiest first.
+    upcoming_ids: List[int] = field(default_factory=list)
+    # A large upcoming event with exactly `surge_capacity` free seats.
+    surge_event_id: int = 0
+    surge_capacity: int = 0
+
+    @property
+    def hot_event_id(self) -> int:
+        return self.upcoming_ids[0]
+
+
+async def create_schema(path: str) -> str:
+    # The app's tables, indexes and triggers, from the models' metadata.
+    # Returns the database URL.
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+    return url
+
+
+def insert_rows(conn: sqlite3.Connection, table: Table, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    # Raw sqlite3 executemany keeps seeding millions of rows to seconds. The
+    # statement is built from the model's table (an unknown column is a
+    # KeyError) and values go through the columns' SQLite bind processors,
+    # so rows are stored as the app stores them (e.g. DateTime's format).
+    dialect = sqlite.dialect()
+    processors = [table.c[name].type.dialect_impl(dialect).bind_processor(dialect) for name in columns]
+    statement = f"INSERT INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    if any(processors):
+        converters = [(i, fn) for i, fn in enumerate(processors) if fn]
+
+        def converted(rows):
+            for row in rows:
+                row = list(row)
+                for i, fn in converters:
+                    row[i] = fn(row[i])
+                yield row
+
+        rows = converted(rows)
+    conn.executemany(statement, rows)
+
+
+async def median_ms(session_factory, fn: Callable[[Any], Awaitable], repeat: int) -> Tuple[float, Any]:
+    # Median latency of fn(db) over `repeat` calls, each in its own session
+    # as a request's would be, and the last call's result.
+    timings = []
+    for _ in range(repeat):
+        async with session_factory() as db:
+            t0 = time.perf_counter()
+            result = await fn(db)
+            timings.append(time.perf_counter() - t0)
+    return statistics.median(timings) * 1000, result
+
+
+def _attendee_counts(events: int, attendees: int, skew: float, rng: random.Random) -> List[int]:
+    weights = [1 / (rank ** skew) for rank in range(1, events + 1)]
+    total = sum(weights)
+    counts = [int(attendees * w / total) for w in weights]
+    # Hand out the rounding remainder across the tail.
+    for _ in range(attendees - sum(counts)):
+        counts[rng.randrange(events)] += 1
+    return counts
+
+
+def seed(path: str, events: int, attendees: int, skew: float = 1.1, surge_capacity: int = 500, random_seed: int = 42) -> SeedInfo:
+    asyncio.run(create_schema(path))
+    rng = random.Random(random_seed)
+    counts = _attendee_counts(events, attendees, skew, rng)
+    now = datetime.utcnow().replace(microsecond=0)
+    info = SeedInfo(path=path, events=events, attendees=attendees)
+    event_rows = []
+    for event_id, count in enumerate(counts, start=1):
+        ended = rng.random() < 0.1 and event_id != 1
+        start = now + timedelta(hours=rng.randint(-24 * 60, -2) if ended else rng.randint(1, 24 * 180))
+        end = start + timedelta(hours=rng.randint(1, 48)) if not ended else now - timedelta(hours=1)
+        capacity = count + (surge_capacity if event_id == 1 else rng.randint(0, 50) + 1)
+        event_rows.append((event_id, f"Event {event_id}", f"City {rng.randrange(50)}", start, end, capacity, count))
+        if not ended:
+            info.upcoming_ids.append(event_id)
+    info.surge_event_id = 1
+    info.surge_capacity = surge_capacity
+
+    conn = sqlite3.connect(path)
+    insert_rows(conn, models.Event.__table__,
+                ("id", "name", "location", "start_time", "end_time", "max_capacity", "registered_count"), event_rows)
+
+    def attendee_rows():
+        for event_id, count in enumerate(counts, start=1):
+            for i in range(count):
+                yield (f"Attendee {event_id}-{i}", f"a{event_id}-{i}@example.com", event_id)
+
+    insert_rows(conn, models.Attendee.__table__, ("name", "email", "event_id"), attendee_rows())
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return info
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--attendees", type=int, default=200_000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    args = parser.parse_args()
+    info = seed(args.path, args.events, args.attendees, args.skew)
+    print(f"Seeded {info.events} events ({len(info.upcoming_ids)} upcoming) and {info.attendees} attendees into {info.path}")
+
+
+if __name__ == "__main__":
+    main()